@@ -1,9 +1,14 @@
 from typing import Union, Any, List, Set, Dict, Tuple, Optional
 import json
 import math
+import re
 
 from prosto.utils import *
 from prosto.resolve import *
+from prosto.aggregation import *
+from prosto.WindowIndexer import *
+from prosto.rolling import *
+from prosto.discretization import *
 
 import prosto as pr  # To resolve circular imports
 from prosto.Prosto import *
@@ -18,6 +23,18 @@ class ColumnOperation(Operation):
     def __init__(self, prosto, definition):
         super(ColumnOperation, self).__init__(prosto, definition)
 
+        # Accumulated aggregation: data objects and versions of the input columns for which the aggregated values were computed,
+        # and the folded value of each group which has facts (other groups start from the initial value)
+        self.accumulated = None
+
+        # Rolling aggregation: data object and versions of the input columns for which the rolling values were computed
+        self.rolled = None
+        # Rolling aggregation without windows (ewm): group values and the state of each group after its last row
+        self.roll_state = None
+
+        # Link column: versions of the linked (target) columns for which the links were found
+        self.linked_versions = None
+
     def get_dependencies_names(self) -> dict:
         """
         Get all dependencies represented by names like table names and column names as they are specified in the definition.
@@ -85,12 +102,26 @@ def get_dependencies_names(self) -> dict:
             if link_column_name:
                 dependencies[output_table_name].append(link_column_name)
 
+            # Timestamp column of time windows
+            on_column_name = definition.get("on")
+            if on_column_name:
+                dependencies[output_table_name].append(on_column_name)
+
             # Linked table (if any) has to be populated. (Yet, it will be added to dependency by the link column.)
             if link_column_name:
                 linked_table_name = self.prosto.get_type_table(output_table_name, link_column_name)
                 if linked_table_name:
                     dependencies[linked_table_name] = []
 
+        elif operation.lower().startswith("accu"):
+            # Columns to be accumulated
+            dependencies[output_table_name].extend(columns)
+
+            # Link (group) column
+            link_column_name = definition.get("link")
+            if link_column_name:
+                dependencies[output_table_name].append(link_column_name)
+
         elif operation.lower().startswith("aggr"):
             # The fact table has to be already populated
             tables = self.get_tables()
@@ -104,15 +135,49 @@ def get_dependencies_names(self) -> dict:
             link_column_name = definition.get("link")
             dependencies[source_table_name].append(link_column_name)
 
+            # Columns of the predicate selecting facts to be aggregated
+            dependencies[source_table_name].extend(self.get_where_columns())
+
         elif operation.lower().startswith("disc"):
             # Input column objects for which we need to find definitions
             dependencies[output_table_name].extend(columns)
 
+        elif operation.lower().startswith("buck"):
+            # Input column with values to be discretized
+            dependencies[output_table_name].extend(columns)
+
+            # Bucket table has to be populated with all buckets
+            linked_table_name = self.prosto.get_type_table(output_table_name, output_column_name)
+            dependencies[linked_table_name] = list(definition.get("linked_columns") or [])
+
         else:
             raise ValueError("Unknown operation type '{}' in the definition of column '{}'.".format(operation, self.id))
 
         return dependencies
 
+    def get_where_columns(self) -> List[str]:
+        """
+        Aggregate column. Return names of the fact table columns used by the where predicate.
+        The predicate is either a column name or an expression and then its identifiers which are columns or attributes are returned.
+        """
+        where = self.definition.get("where")
+        if not where:
+            return []
+
+        source_table_name = self.get_tables()[0]
+
+        # String literals are removed so that their contents are not treated as names
+        names = re.findall(r"[A-Za-z_][A-Za-z0-9_]*", re.sub(r"'[^']*'|\"[^\"]*\"", "", where))
+
+        columns = []
+        for name in names:
+            if name in columns:
+                continue
+            if name == where or self.prosto.get_column(source_table_name, name) or self.prosto.has_attribute(source_table_name, name):
+                columns.append(name)
+
+        return columns
+
     def evaluate(self) -> None:
         """
         Execute this column operation and evaluate the output column(s).
@@ -149,11 +214,38 @@ def evaluate(self) -> None:
         # Operations without UDF
         #
 
+        # Several aggregations of the same facts fused into one operation which has its own definition format (with member operations)
+        if operation.lower().startswith("aggr") and definition.get("operations"):
+            out, range = self._evaluate_aggregate_batch()
+
+            self._impose_output_columns(out, range)
+
+            return
+
         # Link columns use their own definition format different from computational (functional) definitions
         if operation.lower().startswith("link"):
-            out = self._evaluate_link()
+            columns = self.get_columns()
 
-            self._impose_output_columns(out)
+            # Slice input keys according to the change status
+            if self.prosto.incremental:
+                data = output_table.data.get_added_slice(columns)
+                range = output_table.data.added_range
+            else:
+                data = output_table.data.get_full_slice(columns)
+                range = output_table.data.id_range()
+
+            out = self._evaluate_link(data)
+
+            self._impose_output_columns(out, range)
+
+            # Old rows are linked again only if they are not linked and the target table has changed
+            if self.prosto.incremental:
+                data = self._get_unresolved_slice(columns)
+                if data is not None and len(data) > 0:
+                    out = self._evaluate_link(data)
+                    output_table.data.set_column_values_for_ids(pd.DataFrame(out))
+
+            self.linked_versions = self._get_linked_versions()
 
             return
 
@@ -192,6 +284,24 @@ def evaluate(self) -> None:
 
             return
 
+        # Bucket columns link rows to their buckets which are computed in the same way as for discretize columns
+        if operation.lower().startswith("buck"):
+            columns = self.get_columns()
+
+            # Buckets of the added rows are added to the bucket table so old rows always remain linked
+            if self.prosto.incremental:
+                data = output_table.data.get_added_slice(columns)
+                range = output_table.data.added_range
+            else:
+                data = output_table.data.get_full_slice(columns)
+                range = output_table.data.id_range()
+
+            out = self._evaluate_bucket(data, model)
+
+            self._impose_output_columns(out, range)
+
+            return
+
         #
         # Operations with UDF
         #
@@ -200,7 +310,15 @@ def evaluate(self) -> None:
         if not func_name:
             raise ValueError("Column function '{}' is not specified. Skip column definition.".format(func_name))
 
-        func = resolve_full_name(func_name)
+        # Built-in aggregate functions are referenced by their names, and aggregators are objects with mergeable states
+        if operation.lower().startswith("aggr") and input_length == "column" and get_aggregator(func_name, model) is not None:
+            func = get_aggregator(func_name, model)
+        elif operation.lower().startswith("roll") and is_window_function(func_name):
+            func = func_name
+        elif operation.lower().startswith("accu") and is_cumulative_function(func_name):
+            func = func_name
+        else:
+            func = resolve_full_name(func_name)
         if not func:
             raise ValueError("Cannot resolve user-defined function '{}'. Skip column definition.".format(func_name))
 
@@ -244,18 +362,69 @@ def evaluate(self) -> None:
             # It exists only for rolling aggregation with grouping
             link_column_name = definition.get("link")
 
-            # Slice input according to the change status (incremental not implemented)
-            data = output_table.data.get_full_slice(columns)
-            range = output_table.data.id_range()
+            # It exists only for time windows
+            on_column_name = definition.get("on")
+            names = columns + ([on_column_name] if on_column_name and on_column_name not in columns else [])
 
             if input_length == "value":
                 raise NotImplementedError("Accumulation is not implemented.".format())
-            elif input_length == "column":
-                gb = output_table._get_or_create_groupby(link_column_name) if link_column_name else None
-                out = self._evaluate_roll(func, gb, data, data_type, model)
-            else:
+            elif input_length != "column":
                 raise ValueError("Unknown input_type parameter '{}'.".format(input_length))
 
+            index = output_table.get_group_index(link_column_name) if link_column_name else None
+
+            # Exponentially weighted mean does not have windows and new rows continue the state of their groups
+            if func == "ewm":
+                def kernel(frame, offsets, state):
+                    if state is None:
+                        return ewm_roll(frame[columns[0]].values, offsets, model)
+                    return ewm_update(frame[columns[0]].values, offsets, state, model)
+
+                if len(columns) != 1:
+                    raise ValueError("Window function '{}' can be applied to only one column.".format(func))
+                out, range = self._evaluate_group_state(kernel, columns, link_column_name, index, (np.nan, 1.0, 0))
+
+            # Slice input according to the change status
+            # Windows of added rows are computed from these rows and the preceding rows of their windows (in the same group)
+            else:
+                if self._can_roll_change(names, link_column_name):
+                    data, offsets = self._get_roll_change_slice(names, index)
+                    range = output_table.data.added_range
+                else:
+                    data = output_table.data.get_full_slice(names)
+                    range = output_table.data.id_range()
+                    offsets = None
+                    if index is not None:
+                        keys, data, offsets = index.get_sorted_groups(data)
+
+                bounds = self._get_window_bounds(len(data), offsets, data[on_column_name] if on_column_name else None)
+
+                out = self._evaluate_roll(func, bounds, data[columns], data_type, model)
+                out = out[out.index >= range.start]  # Preceding rows are used only as windows and their values are not changed
+
+            self._set_rolled(names, link_column_name)
+
+        elif operation.lower().startswith("accu"):
+            # Determine input columns
+            columns = self.get_columns()
+            columns = get_columns(columns, data)
+            if columns is None:
+                raise ValueError("Error reading input column list. Skip column definition.")
+
+            # Validation: check if all explicitly specified columns available
+            if not all_columns_exist(columns, data):
+                raise ValueError("Not all input columns available. Skip column definition.".format())
+
+            # It exists only for accumulation with grouping
+            link_column_name = definition.get("link")
+
+            index = output_table.get_group_index(link_column_name) if link_column_name else None
+
+            # In incremental mode, only added rows are processed and they continue the last cumulative values of their groups
+            out, range = self._evaluate_cumulative(func, columns, link_column_name, index, model)
+
+            self._set_rolled(columns, link_column_name)
+
         elif operation.lower().startswith("aggr"):
             #
             # Get parameters
@@ -273,9 +442,9 @@ def evaluate(self) -> None:
 
             data = source_table.get_df()  # Data (to be processed) is a (source) table which is different from the output table
 
-            # Determine input columns
+            # Determine input columns (rows are counted without input columns, and otherwise no columns means all columns)
             columns = self.get_columns()
-            columns = get_columns(columns, data)
+            columns = get_columns(columns, data) if columns or not isinstance(func, CountAggregator) else []
             if columns is None:
                 raise ValueError("Error reading input column list. Skip column definition.")
 
@@ -283,18 +452,37 @@ def evaluate(self) -> None:
             if not all_columns_exist(columns, data):
                 raise ValueError("Not all input columns available. Skip column definition.".format())
 
-            data = data[columns]  # Select only the specified *input* columns
+            data = source_table.data.get_full_slice(columns)  # Select only the specified *input* columns
 
             data_type = definition.get("data_type")
 
             # No incremental. Select full *output* range
             range = output_table.data.id_range()
 
+            # Facts which do not satisfy the predicate are skipped during aggregation
+            mask = self._get_where_mask(source_table)
+
             if input_length == "value":
-                raise NotImplementedError("Accumulation is not implemented.".format())
+                retract_name = definition.get("retract")
+                retract = resolve_full_name(retract_name) if retract_name else None
+                if retract_name and not retract:
+                    raise ValueError("Cannot resolve user-defined function '{}'. Skip column definition.".format(retract_name))
+
+                # Only added (and removed) fact rows are folded into the existing aggregated values
+                if self._can_accumulate(source_table, link_column_name, columns, retract):
+                    values = self._evaluate_accumulate_change(func, retract, source_table, link_column_name, columns, model)
+                    self._set_accumulated(source_table, link_column_name, columns, values)
+                    return
+
+                index = source_table.get_group_index(link_column_name)
+                out = self._evaluate_accumulate(func, index, data, model, mask)
+                self._set_accumulated(source_table, link_column_name, columns, out.to_dict())
+            elif input_length == "column" and is_aggregator(func):
+                codes = self._get_aggregate_codes(source_table, link_column_name, mask)
+                out = self._evaluate_aggregate_kernel(func, source_table, link_column_name, codes, data)
             elif input_length == "column":
-                gb = source_table._get_or_create_groupby(link_column_name)
-                out = self._evaluate_aggregate(func, gb, data, data_type, model)
+                index = source_table.get_group_index(link_column_name)
+                out = self._evaluate_aggregate(func, index, data, data_type, model, mask)
             else:
                 raise ValueError("Unknown input_type parameter '{}'.".format(input_length))
 
@@ -360,6 +548,17 @@ def _evaluate_calculate(self, func, data, data_type, model):
             else:
                 out = pd.DataFrame.apply(data_arg, func, axis=1, raw=raw_arg, args=(model,))  # Model as an arbitrary object
 
+        #
+        # Multiple outputs: UDF returns several values (tuple or dict) for each row which are expanded into columns
+        #
+        if len(self.get_outputs()) > 1:
+            if isinstance(out, pd.DataFrame):
+                pass  # UDF returned a series for each row which was already expanded
+            elif len(out) == 0:
+                out = pd.DataFrame(columns=self.get_outputs(), index=data.index)
+            else:
+                out = pd.DataFrame(out.tolist(), index=data.index)  # Tuples produce positional columns and dicts produce named columns
+
         return out
 
     def _evaluate_compute(self, func, data, data_type, model):
@@ -388,10 +587,23 @@ def _evaluate_compute(self, func, data, data_type, model):
         else:
             out = func(data_arg, model)  # Model as an arbitrary object
 
+        #
+        # Convert the result to a series or data frame with the input index (UDF may return several columns in different formats)
+        #
+        if isinstance(out, np.ndarray):
+            if out.ndim == 1:
+                out = pd.Series(out, index=data.index)
+            else:
+                out = pd.DataFrame(out, index=data.index)  # One column for each output
+        elif isinstance(out, dict):
+            out = pd.DataFrame(out, index=data.index)  # Dict keys are output names
+        elif isinstance(out, (list, tuple)):
+            out = pd.DataFrame({i: x.values if isinstance(x, pd.Series) else x for i, x in enumerate(out)}, index=data.index)
+
         return out
 
-    def _evaluate_link(self):
-        """Link column. Output column will store ids (indexes) of the target table rows."""
+    def _evaluate_link(self, data):
+        """Link column. Output column will store ids (indexes) of the target table rows for the key values in the input data."""
         definition = self.definition
 
         #
@@ -420,48 +632,148 @@ def _evaluate_link(self):
         if not all_columns_exist(linked_columns, linked_table.get_df()):
             raise ValueError("Not all linked key columns available in the link column definition.".format())
 
-        #
-        # 1. In the target (linked) table, convert its index into a normal column
-        # The reason is that we can only merge normal columns and not index.
-        # The values of this index column will be copied to our new link column and hence will reference the linked rows
-        #
-        index_column_name = "__row_id__" # It could be "id", "index" or whatever other convention
-        linked_table.get_df()[index_column_name] = linked_table.get_df().index
-        # df.reset_index(inplace=True).set_index("index", drop=False, inplace=True)  ä Alternative 1: reset will convert index to column, and then again create index
-        # df = df.rename_axis("index1").reset_index() # Alternative 2: New index1 column will be created
+        match = definition.get("match") or "exact"
 
-        #
-        # 2. Create left join on the specified keys
-        #
+        if match.lower() == "exact":
+            if len(linked_columns) != len(main_keys):
+                raise ValueError("Link column '{}' must have equal number of key columns and linked columns.".format(column_name))
 
-        linked_prefix = column_name + pr.Prosto.column_path_separator  # It will be prepended to each linked (secondary) column name
+            #
+            # 1. Find (or build) an index of the target (linked) table which maps its key values to its row ids
+            # The index is maintained by the table and is reused by all evaluations of links to this table
+            #
+            index = linked_table.get_key_index(linked_columns)
 
-        out_df = pd.merge(
-            main_table.get_df(),  # This table
-            linked_table.get_df().rename(columns=lambda x: linked_prefix + x, inplace=False),  # Target table to link to. We rename columns (not in place - the original frame preserves column names)
-            how="left",  # This (main) table is not changed - we attach target records
-            left_on=main_keys,  # List of main table key columns
-            right_on= [linked_prefix + x for x in linked_columns],  # List of target table key columns. Note that we renamed them above so we use modified names
-            left_index=False,
-            right_index=False,
-            #suffixes=("", linked_suffix),  # We do not use suffixes because they cannot be enforced (they are used only in the case of equal column names)
-            sort=False  # Sorting decreases performance
-        )
+            #
+            # 2. Probe the index using only the key columns of this (main) table
+            # The result stores the ids of the matching target rows and will be stored in our new link column
+            # If both tables share the key encoder (e.g., the target is a projection of this table), then cached codes of this table are used
+            #
+            if main_table.key_encoder.get(tuple(main_keys)) is index.encoder:
+                codes = main_table.get_key_codes(main_keys).loc[data.index].values
+                out = index.probe(data[main_keys], codes)
+            else:
+                out = index.probe(data[main_keys])
 
-        # We do not need this column anymore - it was merged (copied) to the result as a link column
-        linked_table.get_df().drop(columns=[index_column_name], inplace=True)
+        elif match.lower() == "asof":
+            if len(linked_columns) != len(main_keys):
+                raise ValueError("As-of link column '{}' must have equal number of key columns and linked columns.".format(column_name))
 
-        #
-        # 3. Rename according to our convention and store the result
-        #
+            # Target rows are sorted by the last (ordered) column within partitions defined by all other (equality) columns
+            index = linked_table.get_sorted_index(linked_columns[:-1], linked_columns[-1])
 
-        # Rename our link column by using only specified column name
-        out_df.rename({column_name + pr.Prosto.column_path_separator + index_column_name: column_name}, axis="columns", inplace=True)
+            # Binary search of the last target row with the value less than or equal to the value of this row
+            out = index.probe(data[main_keys])
 
-        out = out_df[column_name]  # We need only one column from the result data frame
+        elif match.lower() == "interval":
+            if len(linked_columns) != len(main_keys) + 1:
+                raise ValueError("Interval link column '{}' must have two linked columns (start and end) for the last key column.".format(column_name))
+
+            # Target rows are sorted by the interval start within partitions defined by equality columns
+            index = linked_table.get_sorted_index(linked_columns[:-2], linked_columns[-2])
+
+            # Find the last interval which starts before the value and ends after it (the innermost one if intervals overlap)
+            out = index.probe_interval(data[main_keys], linked_columns[-1])
+
+        else:
+            raise ValueError("Unknown match type '{}' in the definition of link column '{}'.".format(match, column_name))
+
+        out.name = column_name
 
         return out
 
+    def _evaluate_bucket(self, data, model):
+        """Bucket column. Output column will store ids of the bucket table rows for the discretized values of the input column."""
+        definition = self.definition
+
+        main_table_name = definition.get("table")
+
+        outputs = self.get_outputs()
+        column_name = outputs[0]
+
+        columns = self.get_columns()
+        if len(columns) != 1:
+            raise ValueError("Bucket column '{}' expects only one input column to be discretized.".format(column_name))
+
+        linked_table_name = self.prosto.get_type_table(main_table_name, column_name)
+        linked_table = self.prosto.get_table(linked_table_name)
+        if not linked_table:
+            raise ValueError("Bucket table '{}' cannot be found in the bucket column definition.".format(linked_table_name))
+
+        linked_columns = definition.get("linked_columns") or linked_table.definition.get("attributes", [])
+
+        # Buckets are found for the values and then their ids are looked up in the key index of the bucket table (without joins)
+        values = discretize_values(data[columns[0]], model)
+
+        index = linked_table.get_key_index(linked_columns)
+        out = index.probe(pd.DataFrame({linked_columns[0]: values}, index=data.index))
+
+        out.name = column_name
+
+        return out
+
+    def _get_unresolved_slice(self, columns):
+        """
+        Link column (incremental). Return a slice with the specified columns for old (not added) rows which have to be linked again.
+        These are rows which do not reference valid target rows, that is, they were not linked before or their target rows have been removed.
+        They have to be linked again only if the target table has changed, and otherwise None is returned.
+        For as-of and interval links, any old row can be linked to a new target row so all of them are returned.
+        If key values of old target rows have been rewritten, then all old rows are returned.
+        """
+        definition = self.definition
+
+        main_table_name = definition.get("table")
+        main_table = self.prosto.get_table(main_table_name)
+
+        outputs = self.get_outputs()
+        column_name = outputs[0]
+
+        linked_table_name = self.prosto.get_type_table(main_table_name, column_name)
+        linked_table = self.prosto.get_table(linked_table_name)
+
+        linked_data = linked_table.data
+
+        # Target keys of old rows could have been rewritten since the links were found
+        rewritten = False
+        if self.linked_versions is not None:
+            for column, version in self._get_linked_versions().items():
+                start = linked_data.get_column_write_start(column, self.linked_versions.get(column))
+                if start is not None and start < linked_data.added_range.start:
+                    rewritten = True
+
+        if linked_data.added_length() == 0 and linked_data.removed_length() == 0 and not rewritten:
+            return None  # Target table has not changed
+
+        # Old rows which existed before the added rows
+        start_id = main_table.data.id_range().start
+        end_id = main_table.data.added_range.start
+        if end_id <= start_id:
+            return None
+
+        links = pd.to_numeric(main_table.data.get_values(column_name).loc[start_id:end_id - 1], errors="coerce")
+
+        match = definition.get("match") or "exact"
+        if match.lower() != "exact" or rewritten:
+            return main_table.get_df().loc[links.index, columns]
+
+        target_range = linked_data.id_range()
+        unresolved = links.isna() | (links < target_range.start) | (links >= target_range.end)
+
+        ids = links.index[unresolved.values]
+
+        return main_table.get_df().loc[ids, columns]
+
+    def _get_linked_versions(self) -> dict:
+        """Link column. Return versions of the linked (target) columns."""
+        definition = self.definition
+
+        linked_table_name = self.prosto.get_type_table(definition.get("table"), self.get_outputs()[0])
+        linked_table = self.prosto.get_table(linked_table_name)
+
+        linked_columns = definition.get("linked_columns") or linked_table.definition.get("attributes", [])
+
+        return {column: linked_table.data.get_column_version(column) for column in linked_columns}
+
     def _evaluate_merge(self):
         """Merge column. Materialize a complex column path which is sequence of link columns ending with some target column."""
         definition = self.definition
@@ -471,7 +783,6 @@ def _evaluate_merge(self):
         #
         output_table_name = definition.get("table")
         output_table = self.prosto.get_table(output_table_name)
-        output_table_data = output_table.get_df()
 
         outputs = self.get_outputs()
         output_column_name = outputs[0]
@@ -488,76 +799,55 @@ def _evaluate_merge(self):
             column_segments = column_name.split(pr.Prosto.column_path_separator)
             segments.extend(column_segments)
 
-        link_column_path = ""  # Column path composed of several separated column segment names
-        df = output_table_data
-        main_table_name = output_table_name
-        for i, link_column_name in enumerate(segments):
-            #
-            # Build link column path by appending a new column segment name
-            # Note that this path is a name of the column in the data frame and it does not have a definition
-            #
-            if i == 0:
-                link_column_path = link_column_name
-            else:
-                link_column_path += pr.Prosto.column_path_separator + link_column_name
+        # Tables which store the segments: the first segment is in this table and each next one is in the type table of the previous segment
+        tables = [output_table] + self.prosto.get_tables_for_path(output_table_name, segments[:-1])
 
-            #
-            # Stop condition if there is no further segment to merge.
-            #
-            if i == len(segments) - 1:
-                # Rename the last merged column path to the desired column name as specified in the definition
-                df.rename(columns={link_column_path: output_column_name}, inplace=True)
-                out = df[output_column_name]
+        #
+        # Start from the longest (shared) prefix of the link path which has been already composed and cached
+        #
+        start = 0
+        for k in range(len(segments) - 1, 1, -1):
+            cached = output_table.get_link_path_ids(segments[:k], self._get_link_path_signature(tables, segments, k))
+            if cached is not None:
+                values = cached.values
+                index = cached.index
+                start = k
                 break
 
-            #
-            # Find the linked table
-            #
-            linked_table_name = self.prosto.get_type_table(main_table_name, link_column_name)
-            linked_table = self.prosto.get_table(linked_table_name)
-            linked_table_data = linked_table.get_df()
+        #
+        # Values of the first segment are read from this table and they are links (row ids) for the next segment
+        #
+        if start == 0:
+            values = output_table.data.get_full_slice([segments[0]])[segments[0]]
+            index = values.index
+            values = values.values
+            start = 1
 
+        for i in range(start, len(segments)):
             #
-            # Find the target linked column in the linked table
+            # Gather values of the next segment using the row ids from the previous segment
+            # No intermediate frames are created - each hop is an array lookup by position
             #
-            linked_column_name = segments[i+1]
-            #linked_column = linked_table.get_column(linked_column_name)
+            values = tables[i].data.get_values_for_ids(segments[i], values)
 
-            #
-            # Do merge
-            #
-            df = self._merge_two_columns(
-                df,
-                link_column_path,
-                linked_table_data,
-                linked_column_name
-            )
+            # Cache the composed ids if this link path is shared with other merge operations
+            if i < len(segments) - 1:
+                signature = self._get_link_path_signature(tables, segments, i + 1)
+                output_table.set_link_path_ids(segments[:i+1], signature, pd.Series(values, index=index))
 
-            # Iterate
-            main_table_name = linked_table_name
-            main_table = linked_table
+        out = pd.Series(values, index=index, name=output_column_name)
 
         return out
 
-    def _merge_two_columns(self, source_df, link_column_name, target_df, linked_column_name):
-        """Given source and target tables with link and linked columns, return a new column with the source table index and target column values."""
-
-        linked_prefix = link_column_name + pr.Prosto.column_path_separator  # It will prepended to each linked (secondary) column name
-
-        out_df = pd.merge(
-            source_df[[link_column_name]],
-            target_df[[linked_column_name]].rename(columns=lambda x: linked_prefix + x, inplace=False),  # We rename target columns to avoid conflicts (not in place - the original frame preserves column names)
-            how="left",  # This (source) table is not changed - we want to attach target records
-            left_on=link_column_name,  # Its values are row ids stored in the linked table index
-            right_on=None,
-            left_index=False,
-            right_index=True,  # Use index because link column stores index values
-            #suffixes=("", linked_suffix),  # We do not use suffixes because they cannot be enforced (they are used only in the case of equal column names)
-            sort=False  # Sorting decreases performance
-        )
-        # Here we get linked column names like "Prefix::OriginalName"
-
-        return out_df
+    def _get_link_path_signature(self, tables, segments, length) -> tuple:
+        """
+        Signature of a (prefix of a) link path which changes if any link column in it changes.
+        It consists of the id range of the first table as well as data objects and column versions of all links.
+        """
+        signature = (tables[0].data.id, tables[0].data.id_range())
+        for j in range(length):
+            signature += ((tables[j].data.id, tables[j].data.get_column_version(segments[j])),)
+        return signature
 
     def _evaluate_discretize(self, data, model):
         """Discretize column. Apply discretization function to each row of the table."""
@@ -576,243 +866,758 @@ def _evaluate_discretize(self, data, model):
         else:
             raise ValueError("Discretize expects only one column as input")
 
-        # Discretization functions
-        # Model example: {
-        #   "origin/base/ancor": 1, (default is 0) - value the steps are started from (also negative). it is always label no 0 (but can represent left/negative or right/positive interval).
-        #   "step/freq/rule": 10, - length of one whole interval (unit of the raster)
-        #   "label/label_end/border": "left/right" (return left or right border as id, default is left),
-        #   "closed": "left/right" (default left),
-        #   "label_value": "step/border" (default step_no, interval_no) - return intervla number or border value (note that returning float value is a bad idea because floats are bad representatives for discrete groups, also step/interval_no are continuous)
-        #   }
-        def disc_numeric_fn(value, **model):
-            # How many whole steps from origin till this point (including or excluding) and what is the remainder
-            # How many whole (integer) steps are from origin to this value (in both directions)
-            #   What is origin - label number 0? If so, then we determine which, left or righ interval it represents with left-right borders, and it is a basis of further computations.
-            #   It is (value - origin) // step OR float division and then round by removing after dot (which is remainder)
-            #   int() rounds down so 1.9 will be 1,
-            #   math.floor(-0.5) = -1, 1.2 -> 1,
-
-            # ----0---------1---------2---------3--- label_no
-            #    )[        )[        )[        )[ closed left - either left or right label
-            #     ](        ](        ](        ]( closed right - either left or right label
+        return discretize_values(ser, model)
 
-            # Get parameters
-            origin = model.get("origin", 0)
-            step = model.get("step", 1)
-            label = model.get("label", "left")
-            closed = model.get("closed", "left")
-            label_value = model.get("label_value", "interval")
-
-            steps = (value - origin) / step
-            left_border_no = math.floor(steps)  # floor: the largest integer less than or equal to x, floor(-0.5) = -1
-            right_border_no = math.ceil(steps)  # ceil: the smallest integer greater than or equal to x
-            # Alternatively, use math.modf(x) - Return the fractional and integer parts of x
-            # Alternatively, use int()
+    def _evaluate_roll(self, func, bounds, data, data_type, model):
+        """
+        Roll column. Apply aggregate function to each window defined on this same table for every record.
+        Windows are specified by their bounds (start and end positions of the window of each row) and the minimum number of rows
+        in one window. Rows without a complete window get null values.
+        """
+        starts, ends, min_periods = bounds
 
-            #
-            # Determine borders of the interval the value belongs to
-            #
-            if left_border_no == right_border_no:  # Value is exactly on the border - interval is not known (either left or right)
-                if closed == "left":  # Interval on the right
-                    right_border_no += 1
-                else:  # Interval on the left
-                    left_border_no -= 1
+        #
+        # Built-in window functions are computed by rolling kernels
+        #
+        if is_window_function(func):
+            if len(data.columns) != 1:
+                raise ValueError("Window function '{}' can be applied to only one column.".format(func))
+            return roll_kernel(func, data[data.columns[0]], bounds, model)
 
-            #
-            # Determine label for this interval
-            #
-            if label == "left":
-                label_no = left_border_no
+        #
+        # Single input. UDF will get a window sub-series as a data argument
+        #
+        elif len(data.columns) == 1 and data_type != "tensor":
+
+            in_column = data.columns.to_list()[0]
+
+            if data_type == "ndarray":
+                raw_arg = True
             else:
-                label_no = right_border_no
+                raw_arg = False
+
+            # Create a rolling object with explicitly specified windows (within groups or time intervals)
+            rl = data[in_column].rolling(WindowIndexer(starts, ends), min_periods=min_periods)
 
-            if label_value == "interval":
-                return label_no
+            # Invoke depending on the model type
+            if model is None:
+                out = rl.apply(func, raw=raw_arg)  # No model
+            elif isinstance(model, (list, tuple)):
+                out = rl.apply(func, raw=raw_arg, args=model)  # Model as positional arguments
+            elif isinstance(model, dict):
+                out = rl.apply(func, raw=raw_arg, kwargs=model)  # Model as keyword arguments
             else:
-                return label_no * step
+                out = rl.apply(func, raw=raw_arg, args=(model,))  # Model as an arbitrary object
 
-        if model is None:
-            raise ValueError("Discretize expects non-empty model.")
-        elif isinstance(model, (list, tuple)):
-            out = pd.Series.apply(ser, disc_numeric_fn, args=model)  # Model as positional arguments
-        elif isinstance(model, dict):
-            # Pass model by flattening dict (alternative: arbitrary Python object as positional or key argument). UDF has to declare the expected arguments
-            out = pd.Series.apply(ser, disc_numeric_fn, **model)  # Model as keyword arguments
+        #
+        # Multiple inputs. UDF will get a window sub-dataframe as a data argument
+        #
         else:
-            out = pd.Series.apply(ser, disc_numeric_fn, args=(model,))  # Model as an arbitrary object
+            # Windows are views of the input values (without copying) which are passed to UDF one by one,
+            # or all windows are passed as one 3-d tensor (windows, rows, columns) to a vectorized UDF
+            out = self._roll_windows(func, data, bounds, data_type, model)
 
+        # The results have original ids in the index so they can be directly imposed on the frame (rows without group remain null)
         return out
 
-    def _evaluate_roll(self, func, gb, data, data_type, model):
-        """Roll column. Apply aggregate function to each window defined on this same table for every record."""
-        definition = self.definition
+    def _evaluate_group_state(self, kernel, columns, link_column_name, index, defaults) -> tuple:
+        """
+        Roll or accumulate column without windows (like exponentially weighted mean or cumulative sum).
+        The kernel computes the results of all rows in one pass over rows sorted by group, and returns them along with
+        the state of each group after its last row (tuple of arrays). The state is stored and in incremental mode,
+        the kernel gets only added rows and continues the stored states of their groups (new groups get the default state).
+        Return the results and the range of the rows.
+        """
+        data = self.prosto.get_table(self.definition.get("table")).data
+        id_range = data.id_range()
 
         #
-        # Determine window size. The window parameter can be string, number or object (many arguments for rolling object)
+        # Only added rows are processed by updating the states of their groups
         #
-        window = definition.get("window")
-        window_size = int(window)
-        rolling_args = {"window": window_size}
-        # TODO: try/catch with exception if cannot get window size
+        if self.roll_state is not None and self._can_roll_change(columns, link_column_name):
+            start = data.added_range.start
+            if index is None:
+                keys = pd.Index([0])
+                frame = data.get_df().loc[start:id_range.end - 1, columns]
+                offsets = np.array([0, len(frame)], dtype=np.int64)
+            else:
+                added = np.arange(len(index.codes)) >= start - id_range.start
+                keys, frame, offsets = index.get_sorted_groups(data.get_df().loc[id_range.start:id_range.end - 1], added)
+                frame = frame[columns]
+
+            keys = keys if keys is not None else pd.Index([])
+
+            # New groups (all groups if there were no rows before) start from the default state
+            old_keys, old_state = self.roll_state
+            positions = old_keys.get_indexer(keys) if len(old_keys) > 0 else np.full(len(keys), -1, dtype=np.int64)
+            exists = positions >= 0
+            state = tuple(self._get_group_state(x, positions, exists, default) for x, default in zip(old_state, defaults))
+
+            out, state = kernel(frame, offsets, state)
+
+            new_state = tuple(np.concatenate([x, y[~exists]]) for x, y in zip(old_state, state))
+            for x, y in zip(new_state, state):
+                x[positions[exists]] = y[exists]
+            self.roll_state = (old_keys.append(keys[~exists]), new_state)
+
+            return pd.Series(out, index=frame.index), data.added_range
 
         #
-        # Single input. UDF will get a window sub-series as a data argument
+        # All rows are processed
         #
-        if len(data.columns) == 1:
+        frame = data.get_full_slice(columns)
+        if index is None:
+            keys = pd.Index([0])
+            offsets = np.array([0, len(frame)], dtype=np.int64)
+        else:
+            keys, frame, offsets = index.get_sorted_groups(frame)
+            keys = keys if keys is not None else pd.Index([])
 
-            in_column = data.columns.to_list()[0]
+        out, state = kernel(frame, offsets, None)
+        self.roll_state = (keys, state)
 
-            if data_type == "ndarray":
-                raw_arg = True
+        return pd.Series(out, index=frame.index), id_range
+
+    @staticmethod
+    def _get_group_state(values, positions, exists, default) -> np.ndarray:
+        """Return the stored state values at the specified positions, or the default value for groups which do not exist."""
+        out = np.empty(len(positions), dtype=object)
+        for i in np.flatnonzero(~exists):
+            out[i] = default  # Assigned one by one because the default can be an arbitrary object like a list
+        out[exists] = values[positions[exists]]
+
+        return out if values.dtype == object else out.astype(values.dtype)
+
+    def _evaluate_cumulative(self, func, columns, link_column_name, index, model) -> tuple:
+        """
+        Accumulate column. Compute the cumulative value of each row from the values of the preceding rows (in its group).
+        The function is either a name of a built-in cumulative function or an update function which gets the cumulative value
+        of the previous row (initial value for the first row) and the value (row) of this row, and returns the new cumulative value.
+        """
+        if is_cumulative_function(func):
+            if len(columns) != 1:
+                raise ValueError("Cumulative function '{}' can be applied to only one column.".format(func))
+
+            def kernel(frame, offsets, state):
+                out, last = accumulate_kernel(func, frame[columns[0]].values, offsets, state[0] if state is not None else None)
+                return out, (last,)
+
+            return self._evaluate_group_state(kernel, columns, link_column_name, index, (np.nan,))
+
+        initial_value = self.definition.get("initial_value")
+
+        def kernel(frame, offsets, state):
+            # UDF gets a value (one column) or a row (several columns)
+            rows = frame[columns[0]].values if len(columns) == 1 else [row for _, row in frame.iterrows()]
+            last = np.array(state[0], dtype=object) if state is not None else np.full(len(offsets) - 1, None, dtype=object)
+
+            out = np.empty(len(rows), dtype=object)
+            for g in range(len(offsets) - 1):
+                value = initial_value if last[g] is None else last[g]
+                for i in range(offsets[g], offsets[g + 1]):
+                    # Invoke depending on the model type
+                    if model is None:
+                        value = func(value, rows[i])  # No model
+                    elif isinstance(model, (list, tuple)):
+                        value = func(value, rows[i], *model)  # Model as positional arguments
+                    elif isinstance(model, dict):
+                        value = func(value, rows[i], **model)  # Model as keyword arguments
+                    else:
+                        value = func(value, rows[i], model)  # Model as an arbitrary object
+                    out[i] = value
+                last[g] = value
+
+            return out, (last,)
+
+        return self._evaluate_group_state(kernel, columns, link_column_name, index, (None,))
+
+    def _roll_windows(self, func, data, bounds, data_type, model) -> pd.Series:
+        """
+        Roll column (multiple inputs). Apply UDF to windows of the frame represented by views of its values.
+        Depending on the data type, UDF gets each window as a data frame (default) or an array (ndarray),
+        or one 3-d array with all windows (tensor) and then it returns the values for all windows.
+        Rows without a complete window get null values.
+        """
+        starts, ends, min_periods = bounds
+        columns = data.columns
+        values = data.to_numpy()
+
+        # Windows to be computed
+        selected = np.flatnonzero(ends - starts >= min_periods)
+        starts, ends = starts[selected], ends[selected]
+
+        def invoke(data_arg):
+            # Invoke depending on the model type
+            if model is None:
+                return func(data_arg)  # No model
+            elif isinstance(model, (list, tuple)):
+                return func(data_arg, *model)  # Model as positional arguments
+            elif isinstance(model, dict):
+                return func(data_arg, **model)  # Model as keyword arguments
             else:
-                raw_arg = False
+                return func(data_arg, model)  # Model as an arbitrary object
+
+        if data_type == "tensor" and len(selected) == 0:
+            results = []
+        elif data_type == "tensor":
+            # All windows must have the same length and they are selected from strided views of (windows, rows, columns)
+            window_size = ends[0] - starts[0]
+            if ((ends - starts) != window_size).any():
+                raise ValueError("Windows of different length cannot be passed as one tensor in column '{}'.".format(self.get_outputs()[0]))
+            windows = sliding_windows(values, window_size)
+            results = list(invoke(windows[starts]))
+            if len(results) != len(selected):
+                raise ValueError("Rolling function returned {} values for {} windows.".format(len(results), len(selected)))
+        elif data_type == "ndarray":
+            results = [invoke(values[start:end]) for start, end in zip(starts, ends)]
+        else:
+            index = data.index
+            results = [invoke(pd.DataFrame(values[start:end], columns=columns, index=index[start:end], copy=False)) for start, end in zip(starts, ends)]
 
-            if gb is None:  # single column without link/grouping
+        out = pd.Series(results, index=data.index[selected], dtype=None if results else float)
 
-                # Create a rolling object with windowing (row-based windowing independent of the number of columns)
-                rl = pd.DataFrame.rolling(data, **rolling_args)  # as_index=False - aggregations will produce flat DataFrame instead of Series with index
+        return out.reindex(data.index)
 
-                # Invoke depending on the model type
-                if model is None:
-                    out = rl[in_column].apply(func, raw=raw_arg)  # No model
-                elif isinstance(model, (list, tuple)):
-                    out = rl[in_column].apply(func, raw=raw_arg, args=model)  # Model as positional arguments
-                elif isinstance(model, dict):
-                    out = rl[in_column].apply(func, raw=raw_arg, **model)  # Model as keyword arguments
-                else:
-                    out = rl[in_column].apply(func, raw=raw_arg, args=(model,))  # Model as an arbitrary object
+    def _get_window(self):
+        """
+        Roll column. Return the window which is either the number of rows (int) or the time interval (timedelta)
+        specified as a pandas offset like "15min" (and then the timestamp column has to be specified).
+        """
+        definition = self.definition
+        window = definition.get("window")
 
-            else:  # single column with link/grouping
+        try:
+            return int(window)
+        except (TypeError, ValueError):
+            pass
 
-                def groll_fn(g):
-                    rl = pd.DataFrame.rolling(g, **rolling_args)
-                    out = rl.apply(func, **model)  # TODO: Pass model to the function
-                    return out
+        try:
+            window = pd.Timedelta(pd.tseries.frequencies.to_offset(window))
+        except (TypeError, ValueError):
+            raise ValueError("Cannot get window size from '{}' in the definition of column '{}'.".format(window, self.get_outputs()[0]))
 
-                # Apply rolling function to each group
-                # NOTE: "Groupby preserves the order of rows within each group" and therefore rolling should be correct when applied to individual groups
-                out = gb[in_column].apply(groll_fn)
+        if not definition.get("on"):
+            raise ValueError("Time window '{}' requires a timestamp column in the definition of column '{}'.".format(definition.get("window"), self.get_outputs()[0]))
 
-                # The result is a series with aggregated values but it has MultiIndex: first level group, second level original id. Therefore, we cannot directly add it to the original frame
-                # Example for two devices and 6 rows: MultiIndex(levels=[[0, 1], [0, 1, 2, 3, 4, 5]], labels=[[0, 0, 0, 1, 1, 1], [0, 2, 4, 1, 3, 5]])
-                # Remove first level of index (group numbers). The labels of the second level will be then converted to a normal index with original ids corresponding to the frame index
-                out.reset_index(level=0, drop=True, inplace=True)
+        return window
 
-        #
-        # Multiple inputs. UDF will get a window sub-dataframe as a data argument
-        #
+    def _get_window_bounds(self, size, offsets=None, times=None) -> tuple:
+        """
+        Roll column. Return start and end positions of the window of each row, and the minimum number of rows in one window.
+        If offsets are specified, then rows are sorted by group and windows do not cross group borders.
+        A window with the number of rows includes this row and the preceding rows, and it is complete only if it has all rows.
+        A time window includes this row and the preceding rows with timestamps later than the timestamp of this row minus the interval.
+        """
+        window = self._get_window()
+
+        if offsets is None:
+            offsets = np.array([0, size], dtype=np.int64)
+        sizes = np.diff(offsets)
+
+        positions = np.arange(size, dtype=np.int64)
+        ends = positions + 1
+
+        if isinstance(window, int):
+            group_starts = np.repeat(offsets[:-1], sizes)
+            starts = np.maximum(group_starts, positions - window + 1)
+            return starts, ends, window
+
+        if pd.isna(times).any():
+            raise ValueError("Timestamp column '{}' of time windows has null values.".format(self.definition.get("on")))
+        times = pd.to_datetime(times).values.astype("datetime64[ns]").view(np.int64)
+
+        # Timestamps and window start times are converted to ranks which are then combined with group numbers
+        ranks, uniques = pd.factorize(np.concatenate([times, times - window.value]), sort=True)
+        groups = np.repeat(np.arange(len(sizes), dtype=np.int64), sizes)
+        keys = groups * (len(uniques) + 1) + ranks[:size]
+        probes = groups * (len(uniques) + 1) + ranks[size:]
+
+        if (np.diff(keys) < 0).any():
+            raise ValueError("Rows have to be sorted by the timestamp column '{}' (within groups) for time windows.".format(self.definition.get("on")))
+
+        starts = np.searchsorted(keys, probes, side="right")
+
+        return starts, ends, 1
+
+    def _get_roll_change_slice(self, columns, index) -> tuple:
+        """
+        Roll column. Return input rows needed to compute windows of the added rows: the added rows and the rows preceding
+        each of them in its window (in the same group if the index is specified). For groups, rows are sorted by group and their offsets are returned.
+        """
+        data = self.prosto.get_table(self.definition.get("table")).data
+        id_range = data.id_range()
+        start = data.added_range.start
+
+        window = self._get_window()
+        on_column_name = self.definition.get("on")
+
+        if index is None and isinstance(window, int):
+            context_start = max(id_range.start, start - (window - 1))
+            return data.get_df().loc[context_start:id_range.end - 1, columns], None
+
+        df = data.get_df().loc[id_range.start:id_range.end - 1]
+
+        # Positions of rows sorted by group
+        if index is None:
+            order = np.arange(len(df), dtype=np.int64)
+            offsets = np.array([0, len(df)], dtype=np.int64)
         else:
-            #
-            # Problem (of pandas): rolling apply passes only a series to UDF - we are not able to pass a frame (with multiple columns)
-            # Workaround: create a new temporary data frame with all row ids, create a rolling object over it, apply auxiliary function to it, it will get a window/group of row ids which can be then used to access this window rows from the main data frame:
-            # Link: https://stackoverflow.com/questions/45928761/rolling-pca-on-pandas-dataframe
-            #
+            order = index.order
+            offsets = index.offsets
 
-            # Auxiliary function
-            # It gets a window as a series of row ids and an aggregate function
-            # It will select a sub-dataframe using these ids and pass it to UDF for aggregation and return the value
-            # Note that it selects data from a well known variable and uses a model defined outside
-            def window_fn(ids, user_fn):
-                df_window = data.loc[ids]  # Select rows of the window with the necessary ids
+        times = df[on_column_name].iloc[order] if on_column_name else None
+        starts, ends, min_periods = self._get_window_bounds(len(order), offsets, times)
 
-                # Determine format/type of representation
-                if data_type == "ndarray":
-                    data_arg = df_window.values
-                else:
-                    data_arg = df_window
-
-                # Apply UDF to this window by invoking depending on the model type
-                if model is None:
-                    out = user_fn(data_arg)  # No model
-                elif isinstance(model, (list, tuple)):
-                    out = user_fn(data_arg, *model)  # Model as positional arguments
-                elif isinstance(model, dict):
-                    out = user_fn(data_arg, **model)  # Model as keyword arguments
-                else:
-                    out = user_fn(data_arg, model)  # Model as an arbitrary object
+        # Added rows are the last rows of their groups, and their windows start from the window start of the first of them
+        groups = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        added = order >= start - id_range.start
+        first = np.full(len(offsets) - 1, len(order), dtype=np.int64)
+        np.minimum.at(first, groups[added], starts[added])
+        needed = np.arange(len(order)) >= first[groups]
 
-                return out
+        if index is None:
+            context_start = id_range.start + (np.flatnonzero(needed)[0] if needed.any() else len(order))
+            return data.get_df().loc[context_start:id_range.end - 1, columns], None
 
-            if gb is None:  # multiple columns without link/grouping
+        mask = np.zeros(len(index.codes), dtype=bool)
+        mask[order[needed]] = True
 
-                # Generate sequential row ids like 0,1,2,...
-                # NOTE: Why not to re-use existing integer index?
-                # NOTE: We should add a datetime column if it is used in the window definition
-                df_idx = pd.DataFrame(data=data.index, index=data.index)
-                #df_idx = pd.DataFrame(np.arange(data.shape[0]))
+        keys, frame, offsets = index.get_sorted_groups(df, mask)
 
-                # Create rolling object from ids-frame
-                # NOTE: We can use only row-based windows (not custom column based windows like timestamps with duration as a window parameter)
-                rl_idx = df_idx.rolling(**rolling_args)
+        return frame[columns], offsets
 
-                # Apply UDF for rolling aggregation
-                out = rl_idx.apply(lambda x: window_fn(x, func), raw=False)
+    def _can_roll_change(self, columns, link_column_name) -> bool:
+        """
+        Roll (or accumulate) column. Determine if only windows of added rows can be computed.
+        It is possible in incremental mode if the rolling values were computed for the same data object
+        and old rows have not been changed or removed (which would change windows of the following rows).
+        """
+        if not self.prosto.incremental or self.rolled is None:
+            return False
 
-            else:  # multiple columns with link/grouping
+        output_table = self.prosto.get_table(self.definition.get("table"))
+        data = output_table.data
 
-                out = pd.Series(index=data.index)
-                out.values[:] = None  # We need to assign default value which should be a parameter of column or operation
+        data_id, versions = self.rolled
+        if data_id != data.id:
+            return False
 
-                # Perform rolling aggregation for each group independently in the loop and then merge all the results
-                # The body is logically equivalent to rolling aggregation without grouping (see above)
-                for n, df_g in gb:
-                    # g is a data frame with all records belonging to one group
+        if self.get_outputs()[0] not in output_table.get_df().columns:
+            return False
 
-                    # Generate row ids for this group
-                    df_idx = pd.DataFrame(data=df_g.index, index=df_g.index)
+        if data.removed_range.start < data.removed_range.end:
+            return False
 
-                    # Create rolling object for these ids (of this group only)
-                    rl_idx = df_idx.rolling(**rolling_args)
+        # Old rows have to be unchanged, that is, only added rows could have been written
+        if set(versions) != set(columns + ([link_column_name] if link_column_name else [])):
+            return False
+        for column, version in versions.items():
+            start = data.get_column_write_start(column, version)
+            if start is not None and start < data.added_range.start:
+                return False
 
-                    # Apply UDF for rolling aggregation by sending window ids, all data with all ids and function
-                    # Produce output for this group only (for indexes of this group)
-                    out_g = rl_idx.apply(lambda x: window_fn(x, func), raw=False)
+        return True
 
-                    # Append results of aggregation for this group to the final result by index-based imposing (update)
-                    out.update(out_g[0])
+    def _set_rolled(self, columns, link_column_name) -> None:
+        """Roll (or accumulate) column. Remember the state of the input data the rolling values have been computed for."""
+        data = self.prosto.get_table(self.definition.get("table")).data
 
-        return out
+        names = columns + ([link_column_name] if link_column_name else [])
+        self.rolled = (data.id, {column: data.get_column_version(column) for column in names})
 
-    def _evaluate_aggregate(self, func, gb, data, data_type, model):
-        """Link (group) column. Apply aggregate function to each group of records of the fact table."""
+    def _evaluate_aggregate(self, func, index, data, data_type, model, mask=None):
+        """
+        Link (group) column. Apply aggregate function to each group of records of the fact table.
+        If the mask is specified, then only the selected records are aggregated.
+        """
         definition = self.definition
 
         #
         # Special case: no input columns (or function is size()
         #
-        if len(data.columns) == 0:
-            out = gb.size()
+        if len(data.columns) == 0 and mask is None:
+            return index.get_sizes()
+        elif len(data.columns) == 0:
+            keys, data, offsets = index.get_sorted_groups(data, mask)
+            return pd.Series(np.diff(offsets), index=keys)
 
         #
-        # Single input. UDF will get a window sub-series as a data argument
+        # Single input. UDF will get a group sub-series as a data argument
+        # Multiple inputs. UDF will get a group sub-dataframe as a data argument
         #
-        elif len(data.columns) == 1:
-            in_column = data.columns.to_list()[0]
-            # Invoke depending on the model type
-            if model is None:
-                out = gb[in_column].agg(func)  # No model
-            elif isinstance(model, (list, tuple)):
-                out = gb[in_column].agg(func, args=model)  # Model as positional arguments
-            elif isinstance(model, dict):
-                out = gb[in_column].agg(func, **model)  # Model as keyword arguments
-            else:
-                out = gb[in_column].agg(func, args=(model,))  # Model as an arbitrary object
+        if len(data.columns) == 1:
+            data = data[data.columns[0]]
+
+        keys, data, offsets = index.get_sorted_groups(data, mask)
+        if keys is None or len(keys) == 0:
+            return pd.Series([], dtype=float)
+
+        shards = max(1, min(definition.get("shards") or 1, len(keys)))
+        executor = definition.get("executor") or "thread"
+
+        if shards == 1:
+            values = aggregate_groups(func, keys, data, offsets, model)
+        else:
+            # Groups are split into shards with (almost) equal number of rows and each shard is processed in parallel
+            bounds = np.searchsorted(offsets, np.linspace(0, offsets[-1], shards + 1)).clip(0, len(keys))
+            bounds = np.unique(np.concatenate([[0], bounds, [len(keys)]]))
+
+            # Processes get the function definition (rather than object) which is resolved again in the process
+            func_arg = definition.get("function") if executor == "process" else func
+
+            pool = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+            with pool(max_workers=shards) as ex:
+                futures = [
+                    ex.submit(aggregate_groups, func_arg, keys[start:end], data.iloc[offsets[start]:offsets[end]], offsets[start:end + 1], model)
+                    for start, end in zip(bounds[:-1], bounds[1:])
+                ]
+                values = [value for f in futures for value in f.result()]
+
+        out = pd.Series(values, index=keys)
+
+        return out
+
+    def _evaluate_aggregate_kernel(self, aggregator, source_table, link_column_name, codes, data):
+        """
+        Aggregate column (built-in function or aggregator). Group codes of the fact rows are positions of the target rows
+        in the vectorized aggregation. The result has a value for each row of this (group) table.
+        In incremental mode, the state of the aggregator is stored by this table and then updated only with new fact rows.
+        """
+        definition = self.definition
+
+        shards = definition.get("shards") or 1
+        executor = definition.get("executor") or "thread"
+
+        outputs = self.get_outputs()
+        output_table = self.prosto.get_table(definition.get("table"))
+        id_range = output_table.data.id_range()
+        size = id_range.end - id_range.start
+
+        if len(data.columns) > 1:
+            raise ValueError("Aggregate function '{}' can be applied to only one column.".format(definition.get("function")))
+
+        if len(data.columns) == 0:
+            values = None
+        elif getattr(aggregator, "numeric", True):
+            values = pd.to_numeric(data[data.columns[0]], errors="coerce").values
+        else:
+            values = data[data.columns[0]].values
 
         #
-        # Multiple inputs. UDF will get a window sub-dataframe as a data argument
+        # Aggregate all facts or only facts added after the stored state was computed
         #
+        columns = data.columns.to_list() + [x for x in self.get_where_columns() if x not in data.columns]
+        start = self._get_aggregate_state_start(source_table, link_column_name, columns)
+        if start is None:
+            rows, state = aggregate_state(aggregator, codes, values, size, shards, executor)
         else:
+            offset = start - source_table.data.id_range().start
+            rows, state = aggregate_state(aggregator, codes[offset:], values[offset:] if values is not None else None, size, shards, executor)
+
+            old_rows, old_state = resize_state(aggregator, *output_table.aggregate_state[outputs[0]][1:], size)
+            rows = old_rows + rows
+            state = aggregator.merge(old_state, state)
+
+        if self.prosto.incremental:
+            signature = self._get_aggregate_state_signature(source_table, link_column_name, columns)
+            output_table.aggregate_state[outputs[0]] = (signature, rows, state)
+
+        out = finalize_state(aggregator, rows, state)
+
+        return pd.Series(out, index=pd.RangeIndex(id_range.start, id_range.end))
+
+    def _get_aggregate_state_signature(self, source_table, link_column_name, columns) -> tuple:
+        """Aggregate column (aggregator). Describe the input data the state of the aggregator is computed for."""
+        output_table = self.prosto.get_table(self.definition.get("table"))
+
+        source_data = source_table.data
+        versions = {column: source_data.get_column_version(column) for column in columns + [link_column_name]}
+
+        return source_data.id, output_table.data.id, output_table.data.id_range().start, source_data.id_range(), versions
+
+    def _get_aggregate_state_start(self, source_table, link_column_name, columns) -> Optional[int]:
+        """
+        Aggregate column (aggregator). Return the first id of the fact rows which have to be added to the stored state of the aggregator,
+        or None if the state cannot be updated and all facts have to be aggregated again.
+        It is possible in incremental mode if old facts have not been changed or removed and old groups have not been removed.
+        """
+        output_table = self.prosto.get_table(self.definition.get("table"))
+
+        entry = output_table.aggregate_state.get(self.get_outputs()[0])
+        if not self.prosto.incremental or entry is None:
+            return None
+
+        source_data = source_table.data
+        (source_id, output_id, output_start, source_range, versions), rows, state = entry
+
+        if (source_id, output_id, output_start) != (source_data.id, output_table.data.id, output_table.data.id_range().start):
+            return None
+        if len(rows) > output_table.data.length():
+            return None
+        if source_data.id_range().start != source_range.start or source_data.id_range().end < source_range.end:
+            return None
+
+        # Old facts have to be unchanged, that is, only new rows could have been written
+        if set(versions) != set(columns + [link_column_name]):
+            return None
+        for column, version in versions.items():
+            start = source_data.get_column_write_start(column, version)
+            if start is not None and start < source_range.end:
+                return None
+
+        return source_range.end
+
+    def _get_aggregate_codes(self, source_table, link_column_name, mask=None) -> np.ndarray:
+        """
+        Convert link values of all fact rows to positions of the target rows in this table (-1 for null or removed targets).
+        Fact rows which are not selected by the mask also get -1 and hence they are not aggregated.
+        """
+        output_table = self.prosto.get_table(self.definition.get("table"))
+        id_range = output_table.data.id_range()
+
+        links = pd.to_numeric(source_table.data.get_full_slice([link_column_name])[link_column_name], errors="coerce")
+        codes = np.nan_to_num(links.values - id_range.start, nan=-1).astype(np.int64)
+
+        if mask is not None:
+            codes[~mask] = -1
+
+        return codes
+
+    def _get_where_mask(self, source_table, range=None) -> Optional[np.ndarray]:
+        """
+        Aggregate column. Evaluate the where predicate for the fact rows of the range (all rows by default)
+        and return a boolean array where null values are false, or None if the predicate is not specified.
+        """
+        where = self.definition.get("where")
+        if not where:
+            return None
+
+        source_data = source_table.data
+        if range is None:
+            range = source_data.id_range()
+
+        df = source_table.get_df()
+        if where in df.columns:
+            values = df[where]
+        else:
+            try:
+                values = df.eval(where)
+            except Exception as e:
+                raise ValueError("Cannot evaluate the where predicate '{}' of the aggregate column '{}': {}".format(where, self.get_outputs()[0], e))
+
+        values = values.loc[range.start:range.end - 1]
+
+        return values.fillna(False).astype(bool).values
+
+    def _evaluate_aggregate_batch(self):
+        """
+        Aggregate columns fused into one operation. The fact table is read once for all (member) aggregations,
+        and group codes (for built-in functions) and group index (for UDFs) are also computed once.
+        Return a frame with one column for each member operation and the output range.
+        """
+        definition = self.definition
+
+        output_table = self.prosto.get_table(definition.get("table"))
+
+        source_table = self.prosto.get_table(self.get_tables()[0])
+        if source_table is None:
+            raise ValueError("Cannot find the fact table '{}'.".format(self.get_tables()[0]))
+
+        link_column_name = definition.get("link")
+        if source_table.get_column(link_column_name) is None:
+            raise ValueError("Cannot find the link column '{}'.".format(link_column_name))
+
+        # All input columns of all member operations are read in one slice
+        members = definition.get("operations")
+        member_columns = [
+            get_columns(op.get_columns(), source_table.get_df())
+            if op.get_columns() or not isinstance(get_aggregator(op.definition.get("function"), op.definition.get("model")), CountAggregator) else []
+            for op in members
+        ]
+        member_masks = [op._get_where_mask(source_table) for op in members]
+
+        columns = []
+        for names in member_columns:
+            columns.extend([x for x in names if x not in columns])
+        data = source_table.data.get_full_slice(columns)
+
+        codes = None
+        index = None
+
+        outs = []
+        for op, columns, mask in zip(members, member_columns, member_masks):
+            func_name = op.definition.get("function")
+            model = op.definition.get("model")
+            data_type = op.definition.get("data_type")
+
+            aggregator = get_aggregator(func_name, model)
+            if aggregator is not None:
+                if codes is None:
+                    codes = self._get_aggregate_codes(source_table, link_column_name)
+                member_codes = np.where(mask, codes, -1) if mask is not None else codes
+                out = op._evaluate_aggregate_kernel(aggregator, source_table, link_column_name, member_codes, data[columns])
+            else:
+                func = resolve_full_name(func_name)
+                if not func:
+                    raise ValueError("Cannot resolve user-defined function '{}'. Skip column definition.".format(func_name))
+                if index is None:
+                    index = source_table.get_group_index(link_column_name)
+                out = op._evaluate_aggregate(func, index, data[columns], data_type, model, mask)
+
+            outs.append(out.rename(op.get_outputs()[0]))
+
+        out = pd.concat(outs, axis=1)
+
+        return out, output_table.data.id_range()
+
+    def _evaluate_accumulate(self, func, index, data, model, mask=None):
+        """
+        Aggregate column (accumulation). Fold all rows of each group into one value by applying the update function to each row.
+        If the mask is specified, then only the selected rows are folded.
+        """
+        definition = self.definition
+
+        initial_value = definition.get("initial_value")
+
+        if len(data.columns) == 1:
+            data = data[data.columns[0]]
+
+        keys, data, offsets = index.get_sorted_groups(data, mask)
+        if keys is None:
+            keys = []
+
+        values = []
+        for i in range(len(keys)):
+            values.append(self._fold(func, initial_value, data.iloc[offsets[i]:offsets[i + 1]], model))
+        keys = list(keys)
+
+        out = pd.Series(values, index=keys, dtype=None if values else float)
+
+        return out
+
+    def _evaluate_accumulate_change(self, func, retract, source_table, link_column_name, columns, model):
+        """
+        Aggregate column (accumulation). Update the existing aggregated values of the groups by folding added fact rows
+        with the update function and removed fact rows with the retract function. Only values of the changed groups are written.
+        Return the folded values of all groups which have been folded (rather than the output values where other groups have the default value).
+        """
+        definition = self.definition
+
+        outputs = self.get_outputs()
+        output_table = self.prosto.get_table(definition.get("table"))
+        output_data = output_table.data
+
+        initial_value = definition.get("initial_value")
+
+        source_data = source_table.data
+
+        # Rows which were aggregated before and now removed, and rows which were added (and not removed)
+        removed = Range(source_data.removed_range.start, min(source_data.removed_range.end, source_data.added_range.start))
+        added = Range(max(source_data.added_range.start, source_data.removed_range.end), source_data.added_range.end)
+
+        # Folded values of the groups (groups without facts start from the initial value)
+        current = self.accumulated[2]
+        values = {}
+
+        for fn, range in [(retract, removed), (func, added)]:
+            if range.end <= range.start:
+                continue
+
+            frame = source_data.get_df().loc[range.start:range.end - 1, columns + [link_column_name]]
+            mask = self._get_where_mask(source_table, range)
+            if mask is not None:
+                frame = frame[mask]
+            links = frame.pop(link_column_name)
+            if len(frame.columns) == 1:
+                frame = frame[frame.columns[0]]
+
+            groups = pd.DataFrame({"link": pd.to_numeric(links, errors="coerce")}, index=frame.index)
+            groups = groups[groups["link"].notna()]
+
+            for key, ids in groups.groupby("link", sort=False).groups.items():
+                key = int(key)
+                if key not in values:
+                    values[key] = current.get(key, initial_value)
+                values[key] = self._fold(fn, values[key], frame.loc[ids], model)
+
+        # Groups which do not exist anymore are ignored
+        id_range = output_data.id_range()
+        out = pd.Series(values, name=outputs[0], dtype=float if not values else None)
+        out = out[(out.index >= id_range.start) & (out.index < id_range.end)]
+
+        # New groups get their values (or the default value if they do not have any rows) and old groups are updated
+        new = out.index >= output_data.added_range.start
+        self._impose_output_columns(out[new], output_data.added_range)
+        if (~new).any():
+            output_data.set_column_values_for_ids(pd.DataFrame(out[~new]))
+
+        current.update(values)
+
+        return current
+
+    def _fold(self, func, value, data, model):
+        """Apply the update function to the current value and each value (or row) of the data in their order and return the final value."""
+        if isinstance(data, pd.Series):
+            rows = data.values
+        else:
+            rows = (row for _, row in data.iterrows())
+
+        for x in rows:
             # Invoke depending on the model type
             if model is None:
-                out = gb.apply(func)  # No model
+                value = func(value, x)  # No model
             elif isinstance(model, (list, tuple)):
-                out = gb.apply(func, args=model)  # Model as positional arguments
+                value = func(value, x, *model)  # Model as positional arguments
             elif isinstance(model, dict):
-                out = gb.apply(func, **model)  # Model as keyword arguments
+                value = func(value, x, **model)  # Model as keyword arguments
             else:
-                out = gb.apply(func, args=(model,))  # Model as an arbitrary object
+                value = func(value, x, model)  # Model as an arbitrary object
 
-        return out
+        return value
+
+    def _can_accumulate(self, source_table, link_column_name, columns, retract) -> bool:
+        """
+        Accumulation. Determine if the aggregated values can be updated by folding only changed fact rows.
+        It is possible in incremental mode if the values were computed for the same data objects,
+        old fact rows have not been changed (only appended), and removed rows can be retracted.
+        """
+        if not self.prosto.incremental or self.accumulated is None:
+            return False
+
+        definition = self.definition
+        output_table = self.prosto.get_table(definition.get("table"))
+
+        source_data = source_table.data
+        data_ids, versions, _ = self.accumulated
+        if data_ids != (source_data.id, output_table.data.id):
+            return False
+
+        if self.get_outputs()[0] not in output_table.get_df().columns:
+            return False
+
+        # Old rows have to be unchanged, that is, only added rows could have been written
+        if set(versions) != set(columns + [link_column_name] + self.get_where_columns()):
+            return False
+        for column, version in versions.items():
+            start = source_data.get_column_write_start(column, version)
+            if start is not None and start < source_data.added_range.start:
+                return False
+
+        # Removed rows which were aggregated before can be subtracted only by the retract function
+        if retract is None and source_data.removed_range.start < min(source_data.removed_range.end, source_data.added_range.start):
+            return False
+
+        return True
+
+    def _set_accumulated(self, source_table, link_column_name, columns, values) -> None:
+        """Accumulation. Remember the state of the input data the aggregated values have been computed for, and the folded values of the groups."""
+        output_table = self.prosto.get_table(self.definition.get("table"))
+
+        source_data = source_table.data
+        data_ids = (source_data.id, output_table.data.id)
+        versions = {column: source_data.get_column_version(column) for column in columns + [link_column_name] + self.get_where_columns()}
+
+        self.accumulated = (data_ids, versions, values)
 
     def _impose_output_columns(self, out, range=None):
         """
@@ -853,6 +1658,9 @@ def _impose_output_columns(self, out, range=None):
         if len(out.columns) < len(outputs):
             raise ValueError("Operation returned {} columns, which is less than specified in its definition for its output.".format(len(out.columns)))
 
+        if len(outputs) > 1 and set(out.columns) == set(outputs):
+            out = out[outputs]  # Columns are named by the operation (e.g., dict keys) and hence they are matched by name rather than position
+
         out.columns = outputs[0:len(out.columns)]
 
         #
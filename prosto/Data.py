@@ -19,6 +19,10 @@ class Data:
 
     data_no = 0
 
+    version_no = 0
+
+    max_column_writes = 16
+
     def __init__(self, table):
         """
         Create a new table object using name and attributes.
@@ -50,6 +54,11 @@ def __init__(self, table):
         self.removed_range = Range(0, 0)
         self.added_range = Range(0, 0)
 
+        # Version of each column which is changed every time its values are written
+        self.column_versions = {}
+        # Recent writes of each column as a list of (version, first written id) which is used to find unchanged rows
+        self.column_writes = {}
+
     def __repr__(self):
         return "["+self.id+"]"
 
@@ -77,6 +86,22 @@ def get_values(self, column_name) -> pd.Series:
         """Read column values"""
         return self.df[column_name]
 
+    def get_values_for_ids(self, column_name, ids) -> np.ndarray:
+        """
+        Read column values for the specified row ids by converting them to physical positions (gather).
+        Null ids and ids of rows which do not physically exist produce null values.
+        """
+        values = self.df[column_name].values
+
+        ids = pd.to_numeric(np.asarray(ids), errors="coerce")  # Link columns may store ids as objects with None for nulls
+        positions = ids - self._get_start_offset()
+
+        valid = ~pd.isna(positions) & (positions >= 0) & (positions < len(values))
+        positions = np.where(valid, positions, -1).astype(np.int64)
+
+        # Position -1 means no value and will produce null in the output
+        return pd.api.extensions.take(values, positions, allow_fill=True)
+
     def get_full_slice(self, columns) -> pd.DataFrame:
         """Get a slice with all rows (without removed) and specified columns"""
 
@@ -119,7 +144,10 @@ def set_column_values_for_range(self, update, range, default_value) -> int:
         #
         for col in update.columns.to_list():
             if col not in self.df.columns.to_list():
-                self.df[col] = default_value
+                if pd.api.types.is_datetime64_any_dtype(update[col]) and pd.isna(default_value):
+                    self.df[col] = pd.Series(pd.NaT, index=self.df.index, dtype=update[col].dtype)  # Keep timestamps rather than objects
+                else:
+                    self.df[col] = default_value
 
         #
         # Update values
@@ -130,7 +158,11 @@ def set_column_values_for_range(self, update, range, default_value) -> int:
 
         # Approach 1:
         # 1) Assign default value to the data in the specified full range (essentially do reset)
-        self.df.loc[range.start:range.end, update.columns.to_list()] = default_value
+        for col in update.columns.to_list():
+            if pd.api.types.is_datetime64_any_dtype(self.df[col]) and pd.isna(default_value):
+                self.df.loc[range.start:range.end, col] = pd.NaT  # Null objects would convert timestamps to integers
+            else:
+                self.df.loc[range.start:range.end, col] = default_value
         # 2) Impose values from the update frame on the data. Missing values will not be changed and hence will be equal to default value.
         self.df.update(update, overwrite=True)
         # INFO: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.update.html
@@ -143,11 +175,28 @@ def set_column_values_for_range(self, update, range, default_value) -> int:
 
         #
         # Theoretically, since we change the values, we need to mark this range as changed/dirty
-        # Yet, tracking value updates is currently not supported
+        # Yet, tracking value updates is currently not supported, and we only change the column versions
         #
+        self._update_column_versions(update.columns.to_list(), range.start)
 
         return range.end - range.start
 
+    def set_column_values_for_ids(self, update) -> int:
+        """
+        Impose columns from the specified data frame onto this data by overwriting cells of the rows (ids) which are in its index.
+        In contrast to range updates, all values including nulls are copied and values of other rows are not changed.
+        If a column is absent in the target then, it will be added.
+        """
+        for col in update.columns.to_list():
+            if col not in self.df.columns.to_list():
+                self.df[col] = None
+
+        self.df.loc[update.index, update.columns.to_list()] = update
+
+        self._update_column_versions(update.columns.to_list(), update.index.min() if len(update) else None)
+
+        return len(update)
+
     #
     # Add rows
     #
@@ -214,7 +263,10 @@ def add(self, table) -> int:
         # Data frame with new (added) row ids in the index and data to be appended
         count = len(table)
         new_ids = range(first_id, first_id + count)
-        table = pd.DataFrame(table, index=new_ids)  # Even if it is already a data frame, we want to explicitly set its index
+        if isinstance(table, pd.DataFrame):
+            table = table.set_axis(new_ids, axis=0)  # Replace (rather than reindex) the existing index of the frame
+        else:
+            table = pd.DataFrame(table, index=new_ids)  # Other structures are converted to a frame with new ids in the index
 
         # Approach 1
         self.df = self.df.append(table, sort=False)
@@ -224,6 +276,7 @@ def add(self, table) -> int:
 
         # Track changes
         self.extend_added(count)
+        self._update_column_versions(table.columns.to_list(), first_id)
 
         return first_id
 
@@ -253,6 +306,7 @@ def reset(self) -> None:
         # Track changes
         self.added_range = Range(0, 0)
         self.removed_range = Range(0, 0)
+        self._update_column_versions(self.df.columns.to_list())
 
     #
     # Track changes
@@ -290,6 +344,39 @@ def clear_change_status(self) -> None:
         added = self.shrink_added()
         removed = self.shrink_removed()
 
+    def get_column_version(self, column_name) -> int:
+        """Version of the column values. It is changed every time the column is written and is 0 if it has never been written."""
+        return self.column_versions.get(column_name, 0)
+
+    def get_column_write_start(self, column_name, version) -> Optional[int]:
+        """
+        Return the first row id which could have been written in the column after the specified version.
+        All rows with smaller ids have the same values as in that version. None means that the column has not been changed.
+        """
+        if self.get_column_version(column_name) == version:
+            return None
+
+        writes = self.column_writes.get(column_name, [])
+
+        # Older writes could have been forgotten and then any row could have been changed
+        if not writes or (len(writes) == Data.max_column_writes and writes[0][0] > version):
+            return 0
+
+        return min((write_start for write_version, write_start in writes if write_version > version), default=0)
+
+    def _update_column_versions(self, columns, start=None) -> None:
+        """
+        Assign new (globally unique) versions to the specified columns because their values have been changed.
+        The start is the first written row id (None if any row could have been written).
+        """
+        Data.version_no += 1
+        for col in columns:
+            self.column_versions[col] = Data.version_no
+
+            writes = self.column_writes.setdefault(col, [])
+            writes.append((Data.version_no, start if start is not None else 0))
+            del writes[:-Data.max_column_writes]
+
     #
     # Remove rows (mark for removal)
     #
@@ -327,12 +414,14 @@ def _get_next_id(self)  -> int:
         return self.added_range.end
 
     def _get_start_offset(self) -> int:
-        """Physically existing records"""
-        return 0
+        """Id of the first physically existing record which is stored at position 0"""
+        if len(self.df) == 0:
+            return self.added_range.end
+        return self.df.index[0]
 
     def _get_end_offset(self) -> int:
-        """Physically existing records"""
-        return len(self.df)
+        """Id following the last physically existing record"""
+        return self._get_start_offset() + len(self.df)
 
 
 if __name__ == "__main__":
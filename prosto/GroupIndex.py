@@ -0,0 +1,188 @@
+from typing import Union, Any, List, Set, Dict, Tuple, Optional
+
+from prosto.utils import *
+
+from prosto.Data import *
+
+
+class GroupIndex:
+    """
+    The class represents groups of rows of one table which have the same value of a (link) column.
+    Rows are sorted by their group using a stable sort so that each group is a contiguous range of rows in their original order.
+    The index is tagged with the version of the column and is extended when new rows are appended (without changing old rows),
+    and otherwise it is rebuilt. It is used by aggregation and rolling aggregation with grouping.
+    """
+
+    def __init__(self, table, column):
+        """
+        Create a new (empty) group index.
+
+        :param table: Table object the grouped rows belong to
+        :param column: Name of the column with group values (normally, a link column)
+        """
+
+        self.table = table
+        self.column = column
+
+        # Data object, id range and column version the index currently reflects
+        self.data_id = None
+        self.range = Range(0, 0)
+        self.version = None
+
+        # Distinct group values where position is the group code
+        self.groups = None
+        # Group code of each row of the range (-1 for null values which do not belong to any group)
+        self.codes = np.empty(0, dtype=np.int64)
+
+        # Positions of rows (in the range) sorted by group, and start positions of each group in this order (the last element is the end)
+        self.order = np.empty(0, dtype=np.int64)
+        self.offsets = np.zeros(1, dtype=np.int64)
+
+    def __repr__(self):
+        return "[" + self.table.id + "(" + self.column + ")]"
+
+    def update(self) -> None:
+        """Synchronize the index with the table data by appending new rows or by rebuilding it if old rows have changed."""
+        data = self.table.data
+        id_range = data.id_range()
+        version = data.get_column_version(self.column)
+
+        if self.data_id == data.id and self.range == id_range and self.version == version:
+            return
+
+        # Old rows can be retained only if they have not been removed and their group values have not been written
+        start = None
+        if self.data_id == data.id and self.range.start == id_range.start and self.range.end <= id_range.end:
+            start = data.get_column_write_start(self.column, self.version)
+            if start is None:
+                start = self.range.end
+
+        rebuild = start is None or start < self.range.end
+        if rebuild:
+            self.reset()
+            self.data_id = data.id
+            self.range = Range(id_range.start, id_range.start)
+
+        count = len(self.codes)
+        if id_range.end > self.range.end:
+            values = data.get_df().loc[self.range.end:id_range.end - 1, self.column]
+            self._add(values)
+
+        self.range = id_range
+        self.version = version
+
+        # New rows are merged into the existing order rather than sorting all rows again
+        if rebuild:
+            self._sort()
+        else:
+            self._merge(count)
+
+    def reset(self) -> None:
+        """Remove all groups from the index."""
+        self.data_id = None
+        self.range = Range(0, 0)
+        self.version = None
+        self.groups = None
+        self.codes = np.empty(0, dtype=np.int64)
+        self.order = np.empty(0, dtype=np.int64)
+        self.offsets = np.zeros(1, dtype=np.int64)
+
+    def get_sizes(self) -> pd.Series:
+        """Return the number of rows in each (non-empty) group with group values in the index."""
+        sizes = np.diff(self.offsets)
+        if self.groups is None:
+            return pd.Series([], dtype=np.int64)
+        return pd.Series(sizes, index=self.groups)[sizes > 0]
+
+    def get_groups(self, data):
+        """
+        Iterate through all (non-empty) groups and return their values and the rows of the specified data which belong to them.
+        The data (series or data frame) must have the rows of the indexed range in the same order.
+        """
+        if self.groups is None:
+            return
+
+        data = data.iloc[self.order]
+
+        for code in range(len(self.groups)):
+            start, end = self.offsets[code], self.offsets[code + 1]
+            if start == end:
+                continue
+            yield self.groups[code], data.iloc[start:end]
+
+    def get_sorted_groups(self, data, mask=None) -> tuple:
+        """
+        Return values of all (non-empty) groups, the rows of the specified data sorted by group, and start positions of the groups
+        in the sorted data (the last element is the end). The data must have the rows of the indexed range in the same order.
+        If a boolean mask of the rows is specified, then only the selected rows are returned (and groups without them are skipped).
+        """
+        if self.groups is None:
+            return self.groups, data.iloc[0:0], np.zeros(1, dtype=np.int64)
+
+        order = self.order
+        sizes = np.diff(self.offsets)
+        if mask is not None:
+            order = order[np.asarray(mask, dtype=bool)[order]]
+            sizes = np.bincount(self.codes[order], minlength=len(self.groups))
+
+        offsets = np.concatenate([[0], np.cumsum(sizes[sizes > 0])]).astype(np.int64)
+
+        return self.groups[sizes > 0], data.iloc[order], offsets
+
+    def _add(self, values) -> None:
+        """Append group codes for the specified values of new rows by adding new groups if necessary."""
+        nulls = pd.isna(values).values
+
+        if self.groups is None or len(self.groups) == 0:
+            codes = np.full(len(values), -1, dtype=np.int64)
+        else:
+            codes = self.groups.get_indexer(values).astype(np.int64)
+
+        new = ~nulls & (codes < 0)
+        if new.any():
+            new_groups = pd.Index(pd.unique(values.values[new]))
+            if self.groups is None or len(self.groups) == 0:
+                self.groups = new_groups
+            else:
+                self.groups = self.groups.append(new_groups)
+            codes[new] = self.groups.get_indexer(values.values[new])
+
+        codes[nulls] = -1
+
+        self.codes = np.concatenate([self.codes, codes])
+
+    def _sort(self) -> None:
+        """Find positions of rows sorted by group (stable) and start positions of the groups."""
+        size = len(self.groups) if self.groups is not None else 0
+
+        order = np.argsort(self.codes, kind="stable")
+        self.order = order[np.count_nonzero(self.codes < 0):]  # Null codes are sorted first and they are excluded
+
+        counts = np.bincount(self.codes[self.codes >= 0], minlength=size)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    def _merge(self, start) -> None:
+        """
+        Insert rows starting from the specified position (appended rows) into the sorted order and update start positions of the groups.
+        Only the new rows are sorted and each of them is inserted after all old rows of its group so that the order remains stable.
+        """
+        size = len(self.groups) if self.groups is not None else 0
+
+        codes = self.codes[start:]
+        positions = start + np.flatnonzero(codes >= 0)  # Null codes are excluded
+        codes = self.codes[positions]
+
+        order = np.argsort(codes, kind="stable")
+        positions, codes = positions[order], codes[order]
+
+        # New groups are empty groups at the end of the old order
+        offsets = np.concatenate([self.offsets, np.full(size + 1 - len(self.offsets), self.offsets[-1])])
+
+        self.order = np.insert(self.order, offsets[codes + 1], positions).astype(np.int64)
+
+        counts = np.bincount(codes, minlength=size)
+        self.offsets = (offsets + np.concatenate([[0], np.cumsum(counts)])).astype(np.int64)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,100 @@
+from typing import Union, Any, List, Set, Dict, Tuple, Optional
+
+from prosto.utils import *
+
+
+class KeyEncoder:
+    """
+    The class represents an encoding of (composite) key values as integers.
+    Each key column is factorized into codes using its own (append-only) list of distinct values (level),
+    and then the codes of all columns are packed into one int64 value.
+    If the codes do not fit into 62 bits, then the key is represented by a multi-index of (integer) codes.
+    The same encoder can be shared by several tables with the same key values, for example, a project table and its source table.
+    """
+
+    max_bits = 62
+
+    def __init__(self, size):
+        """
+        Create a new (empty) key encoder.
+
+        :param size: Number of key columns
+        """
+
+        # Distinct values of each key column where position is the code of the value
+        self.levels = [None] * size
+
+        # Number of bits used by each key column code in the packed key
+        self.bits = [1] * size
+
+        # It is incremented each time the packed representation changes and then all keys encoded before have to be combined again
+        self.layout_no = 0
+
+    def __repr__(self):
+        return "[" + ", ".join(str(len(x)) if x is not None else "0" for x in self.levels) + "]"
+
+    def encode(self, frame, extend=True) -> pd.Index:
+        """Encode each row of the frame (one column for each key column in the same order)."""
+        return self.combine(self.encode_columns(frame, extend))
+
+    def encode_columns(self, frame, extend=True) -> np.ndarray:
+        """
+        Return a 2-d array with codes of the values of each key column of the frame.
+        New values are added to the levels if extend is true, and otherwise they get code -1.
+        """
+        if len(frame.columns) != len(self.levels):
+            raise ValueError("Number of key columns {} is not equal to the number of encoder columns {}.".format(len(frame.columns), len(self.levels)))
+
+        codes = np.empty((len(frame), len(self.levels)), dtype=np.int64)
+
+        for i, column in enumerate(frame.columns):
+            values = frame[column]
+            level = self.levels[i]
+
+            if level is None or len(level) == 0:
+                column_codes = np.full(len(values), -1, dtype=np.int64)
+            else:
+                column_codes = level.get_indexer(values).astype(np.int64)
+
+            if extend and (column_codes < 0).any():
+                new_values = pd.unique(values.values[column_codes < 0])
+                if level is None or len(level) == 0:
+                    level = pd.Index(new_values)
+                else:
+                    level = level.append(pd.Index(new_values))
+                self.levels[i] = level
+                column_codes = level.get_indexer(values).astype(np.int64)
+
+                self._update_bits(i)
+
+            codes[:, i] = column_codes
+
+        return codes
+
+    def combine(self, codes) -> pd.Index:
+        """
+        Combine codes of all key columns into one key for each row.
+        Unknown codes (-1) produce keys which are not equal to any key of known values.
+        """
+        if sum(self.bits) > KeyEncoder.max_bits:
+            return pd.MultiIndex.from_arrays([codes[:, i] for i in range(codes.shape[1])])
+
+        keys = np.zeros(len(codes), dtype=np.int64)
+        shift = 0
+        for i in range(codes.shape[1]):
+            keys |= (codes[:, i] + 1) << shift  # Code 0 is reserved for unknown values
+            shift += self.bits[i]
+
+        return pd.Index(keys)
+
+    def _update_bits(self, i) -> None:
+        """Allocate more bits for the codes of the column if its level has grown (with space for future growth)."""
+        if len(self.levels[i]) + 1 < (1 << self.bits[i]):
+            return
+
+        self.bits[i] = (2 * (len(self.levels[i]) + 1)).bit_length()
+        self.layout_no += 1
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,180 @@
+from typing import Union, Any, List, Set, Dict, Tuple, Optional
+
+from prosto.utils import *
+
+from prosto.Data import *
+from prosto.KeyEncoder import *
+
+
+class KeyIndex:
+    """
+    The class represents a hash index which maps values of key columns to row ids of one table.
+    Key values are encoded as integers by the key encoder of the table so that lookups do not hash (composite) object values.
+    The index is built once and then updated incrementally when rows are added or removed.
+    It is used to find target rows for key values, for example, when link columns are evaluated.
+    """
+
+    def __init__(self, table, columns):
+        """
+        Create a new (empty) key index.
+
+        :param table: Table object the indexed rows belong to
+        :param columns: List of key column names
+        """
+
+        self.table = table
+        self.columns = list(columns)
+
+        # Data object, id range and versions of the key columns the index currently reflects (data object is replaced when the table is reset)
+        self.data_id = None
+        self.range = Range(0, 0)
+        self.versions = None
+
+        # Encoder of key values and the layout of the keys stored in the index
+        self.encoder = None
+        self.layout_no = None
+
+        # Unique (encoded) key values, codes of their columns and row ids they are mapped to
+        self.keys = None
+        self.codes = np.empty((0, len(self.columns)), dtype=np.int64)
+        self.row_ids = np.empty(0, dtype=np.int64)
+
+        # Some key values were skipped because they already exist. Removing rows then requires rebuilding the index
+        self.has_duplicates = False
+
+    def __repr__(self):
+        return "[" + self.table.id + "(" + ", ".join(self.columns) + ")]"
+
+    def update(self) -> None:
+        """Synchronize the index with the table data by removing deleted rows, adding new rows and adding again rows with rewritten keys."""
+        data = self.table.data
+        id_range = data.id_range()
+        encoder = self.table.get_key_encoder(self.columns)
+        versions = [data.get_column_version(x) for x in self.columns]
+
+        # Data object was replaced or reset (or another encoder is used), so the index has to be rebuilt
+        if self.data_id != data.id or self.encoder is not encoder or id_range.start < self.range.start or id_range.end < self.range.end:
+            self.reset()
+            self.data_id = data.id
+            self.encoder = encoder
+            self.range = Range(id_range.start, id_range.start)
+
+        #
+        # Rows starting from the first rewritten key are removed from the index and then added again
+        #
+        if self.versions is not None and self.versions != versions and self.range.end > self.range.start:
+            starts = [data.get_column_write_start(x, v) for x, v in zip(self.columns, self.versions)]
+            starts = [x for x in starts if x is not None]
+            start = min(starts) if starts else None
+            if start is not None and start < self.range.end:
+                if start <= self.range.start:
+                    self.reset()
+                    self.data_id = data.id
+                    self.encoder = encoder
+                    self.range = Range(id_range.start, id_range.start)
+                elif self.keys is not None:
+                    keep = self.row_ids < start
+                    self.keys = self.keys[keep]
+                    self.codes = self.codes[keep]
+                    self.row_ids = self.row_ids[keep]
+                    self.range = Range(self.range.start, start)
+
+        #
+        # Remove rows with ids less than the start of the table range
+        #
+        if id_range.start > self.range.start:
+            if self.has_duplicates:
+                # Removed keys could have duplicates in later rows which have to become visible
+                self.reset()
+                self.data_id = data.id
+                self.encoder = encoder
+                self.range = Range(id_range.start, id_range.start)
+            elif self.keys is not None:
+                keep = self.row_ids >= id_range.start
+                self.keys = self.keys[keep]
+                self.codes = self.codes[keep]
+                self.row_ids = self.row_ids[keep]
+            self.range = Range(id_range.start, max(self.range.end, id_range.start))
+
+        #
+        # Add rows with ids greater than the end of the indexed range
+        #
+        if id_range.end > self.range.end:
+            start = max(self.range.end, id_range.start)
+            frame = data.get_df().loc[start:id_range.end - 1, self.columns]
+            self._add(frame)
+            self.range = Range(self.range.start, id_range.end)
+
+        self.versions = versions
+
+    def reset(self) -> None:
+        """Remove all entries from the index."""
+        self.data_id = None
+        self.range = Range(0, 0)
+        self.versions = None
+        self.encoder = None
+        self.layout_no = None
+        self.keys = None
+        self.codes = np.empty((0, len(self.columns)), dtype=np.int64)
+        self.row_ids = np.empty(0, dtype=np.int64)
+        self.has_duplicates = False
+
+    def probe(self, frame, codes=None) -> pd.Series:
+        """
+        Find row ids for the key values in the specified frame which has one column for each key column (in the same order).
+        Codes of the key values can be provided if they have been already computed by the same encoder.
+        Return a series with the index of the frame and ids of the matching rows or NaN if there is no match.
+        """
+        if len(frame.columns) != len(self.columns):
+            raise ValueError("Number of probe columns {} is not equal to the number of index columns {}.".format(len(frame.columns), len(self.columns)))
+
+        if self.keys is None or len(self.keys) == 0 or len(frame) == 0:
+            return pd.Series(np.nan, index=frame.index, dtype=float)
+
+        # Values which are not known to the encoder cannot be in the index
+        if codes is None:
+            codes = self.encoder.encode_columns(frame, extend=False)
+        self._combine()
+
+        # Vectorized lookup of positions (-1 for keys which are not in the index)
+        positions = self.keys.get_indexer(self.encoder.combine(codes))
+        found = positions >= 0
+
+        out = self.row_ids[np.where(found, positions, 0)]
+        if not found.all():
+            out = np.where(found, out, np.nan)
+
+        return pd.Series(out, index=frame.index)
+
+    def _add(self, frame) -> None:
+        """Add new entries for the rows of the specified frame. Keys which already exist are skipped (first row wins)."""
+        new_codes = self.encoder.encode_columns(frame, extend=True)
+        self._combine()  # New values could change the layout of the keys
+
+        new_keys = self.encoder.combine(new_codes)
+        new_ids = frame.index.values.astype(np.int64)
+
+        mask = ~new_keys.duplicated()
+        if self.keys is not None and len(self.keys) > 0:
+            mask &= self.keys.get_indexer(new_keys) < 0
+        if not mask.all():
+            self.has_duplicates = True
+
+        if self.keys is None or len(self.keys) == 0:
+            self.keys = new_keys[mask]
+        else:
+            self.keys = self.keys.append(new_keys[mask])
+        self.codes = np.concatenate([self.codes, new_codes[mask]])
+        self.row_ids = np.concatenate([self.row_ids, new_ids[mask]])
+
+    def _combine(self) -> None:
+        """Combine the stored codes into keys again if the layout of the encoder has changed."""
+        if self.layout_no == self.encoder.layout_no:
+            return
+        if self.keys is not None:
+            self.keys = self.encoder.combine(self.codes)
+        self.layout_no = self.encoder.layout_no
+
+
+if __name__ == "__main__":
+    pass
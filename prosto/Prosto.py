@@ -95,7 +95,7 @@ def get_type_table(self, table_name, column_name) -> str:
                     if not type_table_name:
                         break
 
-            elif op.operation.lower().startswith("link"):
+            elif op.operation.lower().startswith("link") or op.operation.lower().startswith("buck"):
                 # Type is part of column definition (not operation) so we simply read it
                 pass
 
@@ -159,6 +159,19 @@ def get_type_tables(self, table_name, column_names) -> List[str]:
 
         return type_tables
 
+    def get_tables_for_path(self, table_name, column_names) -> List[Table]:
+        """
+        Get a sequence (list) of tables which are types of the specified column path.
+        Each table in this sequence is a type of the corresponding column segment and it is where the next segment is stored.
+        """
+        tables = []
+        for type_table_name in self.get_type_tables(table_name, column_names):
+            table = self.get_table(type_table_name)
+            if table is None:
+                raise ValueError("Type table '{}' for column path '{}' cannot be found.".format(type_table_name, column_names))
+            tables.append(table)
+        return tables
+
     def remove_table(self, table_name) -> Table:
         """
         Remove the specified table if it exists or return None otherwise.
@@ -246,6 +259,23 @@ def add_column(self, column: Column) -> Column:
         self.columns.append(column)
         return column
 
+    def _create_columns(self, names, table) -> List[Column]:
+        """Create and add a column definition for each of the specified names (one name or a list of names) of one table."""
+        if isinstance(names, str):
+            names = [names]
+
+        columns = []
+        for name in names:
+            definition = {
+                "id": name,
+                "table": table,
+            }
+            column = Column(self, definition)
+            self.add_column(column)
+            columns.append(column)
+
+        return columns
+
     #
     # Operations
     #
@@ -419,21 +449,18 @@ def compute(
             self,
             name, table,
             func, columns=None, model=None
-    ) -> Column:
+    ) -> Union[Column, List[Column]]:
         """
         Create a new calculate column.
 
         The output values are computed from the input values of the same row using the specified UDF.
         UDF is called one time and returns a new column with all the value computed from the input columns passed in the parameters.
+        If a list of names is specified, then UDF returns several columns (as a data frame, 2-d array, tuple or dict of columns)
+        and all of them are produced by this one operation. In this case, a list of column objects is returned.
         """
 
-        # Create a column definition
-        definition = {
-            "id": name,
-            "table": table,
-        }
-        column = Column(self, definition)
-        self.add_column(column)
+        # Create column definitions (one for each output)
+        columns_out = self._create_columns(name, table)
 
         # Create operation definition
         operation_def = {
@@ -441,7 +468,7 @@ def compute(
             "operation": "compute",
 
             "table": table,
-            "outputs": [name],
+            "outputs": [x.id for x in columns_out],
 
             "function": func,
             "columns": columns,
@@ -451,27 +478,24 @@ def compute(
         operation = ColumnOperation(self, operation_def)
         self.operations.append(operation)
 
-        return column
+        return columns_out[0] if isinstance(name, str) else columns_out
 
     def calculate(
             self,
             name, table,
             func, columns=None, model=None
-    ) -> Column:
+    ) -> Union[Column, List[Column]]:
         """
         Create a new calculate column.
 
         The output values are computed from the input values of the same row using the specified UDF.
         UDF is called as many times as there are input rows in the table and each time returns one value calculated from the input values passed in the parameters.
+        If a list of names is specified, then UDF returns several values for each row (as a tuple or dict)
+        and all output columns are produced by this one operation. In this case, a list of column objects is returned.
         """
 
-        # Create a column definition
-        definition = {
-            "id": name,
-            "table": table,
-        }
-        column = Column(self, definition)
-        self.add_column(column)
+        # Create column definitions (one for each output)
+        columns_out = self._create_columns(name, table)
 
         # Create operation definition
         operation_def = {
@@ -479,7 +503,7 @@ def calculate(
             "operation": "calculate",
 
             "table": table,
-            "outputs": [name],
+            "outputs": [x.id for x in columns_out],
 
             "function": func,
             "columns": columns,
@@ -489,18 +513,22 @@ def calculate(
         operation = ColumnOperation(self, operation_def)
         self.operations.append(operation)
 
-        return column
+        return columns_out[0] if isinstance(name, str) else columns_out
 
     def link(
             self,
             name, table, type,
-            columns, linked_columns=None
+            columns, linked_columns=None, match="exact"
     ) -> Column:
         """
         Create a new link column.
 
         The output values reference matching rows in another (linked) table.
-        Two rows match if their specified columns are equal.
+        Two rows match if their specified columns are equal (exact match).
+        For as-of match, the last columns are ordered (e.g., timestamps) and a row is linked to the row with the largest linked value
+        which is less than or equal to its value, while all previous columns (if any) have to be equal.
+        For interval match, the last two linked columns are the start and end of an interval [start, end) which has to contain the last column,
+        while all previous columns (if any) have to be equal. If several intervals contain the value, then the one with the largest start is used.
         """
 
         # Create a column definition
@@ -522,6 +550,7 @@ def link(
 
             "columns": columns,
             "linked_columns": linked_columns,
+            "match": match,
         }
         operation = ColumnOperation(self, operation_def)
         self.operations.append(operation)
@@ -568,12 +597,17 @@ def roll(
             self,
             name, table,
             window, link,
-            func, columns=None, model=None
+            func, columns=None, model=None,
+            data_type=None, on=None
     ) -> Column:
         """
         Create a new rolling aggregation column.
 
         Each output value is equal to one (aggregated) value computed from several rows (window) of this table.
+        The window is either the number of rows or a time interval specified as a pandas offset like "15min".
+        Time windows include rows with timestamps (in the "on" column) within this interval before the timestamp of the row.
+        UDF gets a window as a series (one column) or a data frame (several columns), or as an array if the data type is "ndarray".
+        If the data type is "tensor", then UDF gets one 3-d array with all windows (windows, rows, columns) and returns their values.
         """
 
         # Create a column definition
@@ -594,12 +628,14 @@ def roll(
 
             # How to group
             "window": window,
+            "on": on,
             "link": link,
 
             # How to aggregate
             "function": func,
             "columns": columns,
             "model": model,
+            "data_type": data_type,
             "input_length": "column",
         }
         operation = ColumnOperation(self, operation_def)
@@ -607,16 +643,78 @@ def roll(
 
         return column
 
+    def accumulate(
+            self,
+            name, table,
+            link,
+            func, columns=None, model=None,
+            initial_value=0.0
+    ) -> Column:
+        """
+        Create a new cumulative (expanding) column.
+
+        Each output value is computed from the values of this row and all previous rows of this table (in the same group
+        if the link column is specified). The function is either a name of a built-in function (sum, prod, max, min, count, first)
+        or an update function which gets the cumulative value of the previous row and the value (row) of this row,
+        and returns the cumulative value of this row. The update function gets the initial value for the first row of each group
+        (built-in functions start from the first value). In incremental mode, added rows continue from the last cumulative values.
+        """
+
+        # Create a column definition
+        definition = {
+            "id": name,
+            "table": table,
+        }
+        column = Column(self, definition)
+        self.add_column(column)
+
+        # Create operation definition
+        operation_def = {
+            "id": None,
+            "operation": "accumulate",
+
+            "table": table,
+            "outputs": [name],
+
+            # How to group
+            "link": link,
+
+            # How to accumulate
+            "function": func,
+            "columns": columns,
+            "model": model,
+            "input_length": "value",
+
+            "initial_value": initial_value,  # Pre-process like initial value
+        }
+        operation = ColumnOperation(self, operation_def)
+        self.operations.append(operation)
+
+        return column
+
     def aggregate(
             self,
             name, table,
             tables, link,
-            func, columns=None, model=None
+            func, columns=None, model=None,
+            input_length="column", retract=None,
+            shards=None, executor="thread",
+            where=None, initial_value=0.0
     ) -> Column:
         """
         Create a new aggregate column.
 
         Each output value is equal to one (aggregated) value computed from several rows (group) of another (fact) table.
+        If input length is "column", then UDF gets all values (rows) of a group and returns the aggregated value.
+        If input length is "value", then UDF is an update function which gets the current aggregated value and one value (row) of the group,
+        and returns the new aggregated value (starting from the initial value). In this case, only added rows are processed in incremental mode,
+        and removed rows are processed by the retract function (with the same arguments). If it is not specified, then groups are recomputed.
+        The function can be also a name of built-in function (sum, mean, count, min, max, var) or an aggregator object
+        with init, update, merge and finalize functions.
+        If the number of shards is specified, then facts are split into chunks which are aggregated in parallel by the executor
+        ("thread" or "process"). Aggregators merge partial states of the chunks, and UDFs are applied to different groups in each chunk.
+        If the where predicate is specified (name of a boolean column or an expression of the fact columns like "status == 'ok'"),
+        then only facts satisfying it are aggregated (without materializing a filtered table).
         """
 
         # Create a column definition
@@ -638,14 +736,20 @@ def aggregate(
             # How to group
             "tables": tables,
             "link": link,
+            "where": where,
 
             # How to aggregate
             "function": func,
+            "retract": retract,
             "columns": columns,
             "model": model,
-            "input_length": "column",
+            "input_length": input_length,
 
-            "initial_value": 0.0, # Pre-process like initial value
+            # How to parallelize
+            "shards": shards,
+            "executor": executor,
+
+            "initial_value": initial_value, # Pre-process like initial value
             "fillna_value": 0.0,  # Postprocess
         }
         operation = ColumnOperation(self, operation_def)
@@ -688,12 +792,80 @@ def discretize(
 
         return column
 
+    def bucket(
+            self,
+            name, table, type,
+            columns, linked_columns=None, model=None
+    ) -> Column:
+        """
+        Create a new bucket (link) column and its bucket table.
+
+        The input column is discretized into intervals (buckets) as specified in the model (like a discretize column).
+        The bucket table stores one row for each distinct bucket and the output column links rows of this table to their buckets.
+        It is equivalent to a discretize column followed by a projection and a link but the buckets are computed only once
+        and the bucket table is extended with only new buckets (existing rows are retained).
+        """
+
+        # Bucket table has one attribute with bucket values (by default, it has the name of the input column)
+        if linked_columns is None:
+            linked_columns = list(columns) if isinstance(columns, (list, tuple)) else [columns]
+
+        # Create a table definition
+        table_def = {
+            "id": type,
+            "attributes": linked_columns,
+        }
+        bucket_table = Table(self, table_def)
+        self.add_table(bucket_table)
+
+        # Create operation definition
+        operation_def = {  # Bucket table
+            "id": None,
+            "operation": "bucket_table",
+
+            "outputs": [type],
+            "linked_columns": linked_columns,
+
+            "tables": [table],
+            "columns": columns,
+            "model": model,
+        }
+        operation = TableOperation(self, operation_def)
+        self.operations.append(operation)
+
+        # Create a column definition
+        definition = {
+            "id": name,
+            "table": table,
+            "type": type,
+        }
+        column = Column(self, definition)
+        self.add_column(column)
+
+        # Create operation definition
+        operation_def = {
+            "id": None,
+            "operation": "bucket",
+
+            "table": table,
+            "outputs": [name],
+
+            "columns": columns,
+            "linked_columns": linked_columns,
+            "model": model,
+        }
+        operation = ColumnOperation(self, operation_def)
+        self.operations.append(operation)
+
+        return column
+
     #
     # Column-SQL
     #
 
     def column_sql(self, query: str, func=None, args=None):
         # Parse query and extract parameters
+        query, where_str = parse_where_clause(query)
         op, entries, func_str, args_str, win_str = parse_column_sql(query)
 
         if func is None:
@@ -713,21 +885,50 @@ def column_sql(self, query: str, func=None, args=None):
             table = entries[0][0]
             columns = entries[0][1:]
 
-            name = entries[1][0]
+            # Several output columns are specified as a comma separated list
+            names = [x for x in entries[1] if x]
+            name = names[0] if len(names) == 1 else names
 
             definition = self.calculate(
                 name, table,
                 func=func, columns=columns, model=None if not args else args
             )
+        elif op.lower().startswith("comp"):
+            table = entries[0][0]
+            columns = entries[0][1:]
+
+            # Several output columns are specified as a comma separated list
+            names = [x for x in entries[1] if x]
+            name = names[0] if len(names) == 1 else names
+
+            definition = self.compute(
+                name, table,
+                func=func, columns=columns, model=None if not args else args
+            )
         elif op.lower().startswith("roll"):
             table = entries[0][0]
             columns = entries[0][1:]
 
             name = entries[1][0]
 
+            # Time windows have a timestamp column. Example: WINDOW '15min' ON ts
+            window, on = parse_window_clause(win_str)
+
             definition = self.roll(
                 name=name, table=table,
-                window=win_str, link=None,
+                window=window, link=None,
+                func=func, columns=columns, model=None if not args else args,
+                on=on
+            )
+        elif op.lower().startswith("accu"):
+            table = entries[0][0]
+            columns = entries[0][1:]
+
+            name = entries[1][0]
+
+            definition = self.accumulate(
+                name=name, table=table,
+                link=None,
                 func=func, columns=columns, model=None if not args else args
             )
         elif op.lower().startswith("link"):
@@ -739,9 +940,12 @@ def column_sql(self, query: str, func=None, args=None):
             type_table = entries[-1][0]
             linked_columns = entries[-1][1:]
 
+            # Match type is an optional modifier of the operation like LINK ASOF or LINK INTERVAL
+            match = op.split()[1].lower() if len(op.split()) > 1 else "exact"
+
             definition = self.link(
                 name=name, table=table, type=type_table,
-                columns=columns, linked_columns=linked_columns
+                columns=columns, linked_columns=linked_columns, match=match
             )
         elif op.lower().startswith("proj"):
             table = entries[0][0]
@@ -762,6 +966,20 @@ def column_sql(self, query: str, func=None, args=None):
                 name=name, table=table, type=type_table,
                 columns=columns, linked_columns=linked_columns
             )
+        elif op.lower().startswith("buck"):
+            table = entries[0][0]
+            columns = entries[0][1:]
+
+            name = entries[1][0]
+
+            type_table = entries[-1][0]
+            linked_columns = entries[-1][1:]
+
+            # Discretization parameters are passed as a model. Example: BUCKET Events (Time) -> Hour -> Hours (Start)
+            definition = self.bucket(
+                name=name, table=table, type=type_table,
+                columns=columns, linked_columns=linked_columns if linked_columns else None, model=None if not args else args
+            )
         elif op.lower().startswith("aggr"):
             fact_table = entries[0][0]
             fact_columns = entries[0][1:]
@@ -774,7 +992,8 @@ def column_sql(self, query: str, func=None, args=None):
             definition = self.aggregate(
                 name=agg_column, table=group_table,
                 tables=fact_table, link=link_path,
-                func=func, columns=fact_columns, model=None if not args else args
+                func=func, columns=fact_columns, model=None if not args else args,
+                where=where_str if where_str else None
             )
         elif op.lower().startswith("filt"):
             table = entries[0][0]
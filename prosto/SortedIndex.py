@@ -0,0 +1,167 @@
+from typing import Union, Any, List, Set, Dict, Tuple, Optional
+
+from prosto.utils import *
+
+from prosto.Data import *
+
+
+class SortedIndex:
+    """
+    The class represents an index of one table with rows sorted by the values of an ordered key column.
+    Rows can be partitioned by equality key columns and then they are sorted within each partition.
+    It is used to find the last row with the key less than or equal to a probe value (as-of match) using binary search.
+    """
+
+    def __init__(self, table, columns, on):
+        """
+        Create a new (empty) sorted index.
+
+        :param table: Table object the indexed rows belong to
+        :param columns: List of partition (equality) key column names which can be empty
+        :param on: Name of the ordered key column
+        """
+
+        self.table = table
+        self.columns = list(columns)
+        self.on = on
+
+        # Data object, id range and column versions the index was built for
+        self.signature = None
+
+        # Partition key values (index or multi-index) where position is the partition code
+        self.partitions = None
+        # Sorted distinct values of the ordered key
+        self.values = None
+
+        # For all rows sorted by partition and key: composite codes combining partition and key, partition codes and row ids
+        self.codes = np.empty(0, dtype=np.int64)
+        self.partition_codes = np.empty(0, dtype=np.int64)
+        self.row_ids = np.empty(0, dtype=np.int64)
+
+    def __repr__(self):
+        return "[" + self.table.id + "(" + ", ".join(self.columns + [self.on]) + ")]"
+
+    def update(self) -> None:
+        """Sort the table rows again if the table data or its key columns have changed since the index was built."""
+        data = self.table.data
+
+        signature = (data.id, data.id_range()) + tuple(data.get_column_version(x) for x in self.columns + [self.on])
+        if signature == self.signature:
+            return
+
+        frame = data.get_full_slice(self.columns + [self.on])
+        frame = frame[frame[self.on].notna()]  # Rows with null keys are never matched
+
+        # Ordered key values are converted to codes which preserve the order
+        key_codes, self.values = pd.factorize(frame[self.on], sort=True)
+        key_codes = key_codes.astype(np.int64)
+
+        # Partition key values are converted to codes which are used as the first sort key
+        if self.columns:
+            partition_codes, self.partitions = self._make_keys(frame[self.columns]).factorize()
+            partition_codes = partition_codes.astype(np.int64)
+        else:
+            partition_codes = np.zeros(len(frame), dtype=np.int64)
+            self.partitions = None
+
+        order = np.lexsort((key_codes, partition_codes))
+
+        # Key code k in partition p is encoded as p*(n+1) + (k+1) where n is the number of distinct keys
+        self.codes = partition_codes[order] * (len(self.values) + 1) + key_codes[order] + 1
+        self.partition_codes = partition_codes[order]
+        self.row_ids = frame.index.values[order].astype(np.int64)
+
+        self.signature = signature
+
+    def probe(self, frame) -> pd.Series:
+        """
+        Find ids of the last rows with the key less than or equal to the probe value in the same partition.
+        The frame has partition columns followed by one value column (in the same order as the index columns).
+        Return a series with the index of the frame and ids of the matching rows or NaN if there is no match.
+        """
+        if len(frame.columns) != len(self.columns) + 1:
+            raise ValueError("Number of probe columns {} is not equal to the number of index columns {}.".format(len(frame.columns), len(self.columns) + 1))
+
+        if len(self.row_ids) == 0 or len(frame) == 0:
+            return pd.Series(np.nan, index=frame.index, dtype=float)
+
+        positions, valid = self._probe_positions(frame)
+
+        return self._make_ids(frame, positions, valid)
+
+    def probe_interval(self, frame, end) -> pd.Series:
+        """
+        Find ids of the rows with intervals [key, end) containing the probe value in the same partition.
+        Intervals may overlap and then the containing interval with the largest start (the innermost one for nested intervals) is returned.
+        The frame has partition columns followed by one value column and end is the name of the interval end column.
+        Return a series with the index of the frame and ids of the matching rows or NaN if there is no match.
+        """
+        if len(frame.columns) != len(self.columns) + 1:
+            raise ValueError("Number of probe columns {} is not equal to the number of index columns {}.".format(len(frame.columns), len(self.columns) + 1))
+
+        if len(self.row_ids) == 0 or len(frame) == 0:
+            return pd.Series(np.nan, index=frame.index, dtype=float)
+
+        positions, valid = self._probe_positions(frame)
+        values = frame[frame.columns[-1]].values
+
+        # Interval ends of the sorted rows and their running maximum within partitions
+        # If the running maximum does not exceed the value, then no earlier interval of the partition can contain it
+        ends = pd.Series(self.table.data.get_values_for_ids(end, self.row_ids)).infer_objects()  # Attribute columns may store objects
+        reach = ends.groupby(self.partition_codes).cummax().groupby(self.partition_codes).ffill().values
+        ends = ends.values
+
+        # Move back from the last interval starting before the value while some earlier interval can still contain it
+        found = valid & (ends[positions] > values)
+        pending = valid & ~found & (reach[positions] > values)
+        while pending.any():
+            positions = np.where(pending, positions - 1, positions)
+            found |= pending & (ends[positions] > values)
+            pending &= ~found & (reach[positions] > values)
+
+        return self._make_ids(frame, positions, found)
+
+    def _probe_positions(self, frame) -> Tuple[np.ndarray, np.ndarray]:
+        """Find positions of the last sorted rows with the key less than or equal to the probe value and a mask of found positions."""
+        values = frame[frame.columns[-1]]
+        valid = values.notna().values
+
+        # Partition code for each probe (-1 if there is no such partition)
+        if self.columns:
+            partition_codes = self.partitions.get_indexer(self._make_keys(frame[frame.columns[:-1]])).astype(np.int64)
+            valid &= partition_codes >= 0
+        else:
+            partition_codes = np.zeros(len(frame), dtype=np.int64)
+
+        # Number of distinct keys which are less than or equal to each (non-null) probe value
+        counts = np.zeros(len(frame), dtype=np.int64)
+        counts[valid] = self.values.searchsorted(values.values[valid], side="right")
+
+        # Binary search of the last composite code (partition, key) less than or equal to the probe code
+        codes = partition_codes * (len(self.values) + 1) + counts
+        positions = np.searchsorted(self.codes, codes, side="right") - 1
+
+        valid &= positions >= 0
+        positions = np.where(valid, positions, 0)
+        valid &= self.partition_codes[positions] == partition_codes  # Found row has to be in the same partition
+
+        return positions, valid
+
+    def _make_ids(self, frame, positions, valid) -> pd.Series:
+        """Return a series with the index of the frame and ids of the rows at the found positions or NaN."""
+        out = self.row_ids[positions]
+        if not valid.all():
+            out = np.where(valid, out, np.nan)
+
+        return pd.Series(out, index=frame.index)
+
+    def _make_keys(self, frame) -> pd.Index:
+        """Convert partition key columns of the frame to a (multi-)index."""
+        if len(frame.columns) == 1:
+            return pd.Index(frame[frame.columns[0]])
+        else:
+            return pd.MultiIndex.from_frame(frame)
+
+
+if __name__ == "__main__":
+    pass
@@ -6,6 +6,10 @@
 from prosto.Prosto import *
 from prosto.Column import *
 from prosto.Data import *
+from prosto.KeyEncoder import *
+from prosto.KeyIndex import *
+from prosto.SortedIndex import *
+from prosto.GroupIndex import *
 
 
 class Table:
@@ -34,8 +38,25 @@ def __init__(self, prosto, definition):
         # Here we store the real (physical) data for this table (all its attributes and columns)
         self.data = Data(self)
 
-        # A mapping from (link) column/attribute names to the corresponding groupby objects
-        self.groupby = {}
+        # A mapping from (link) column/attribute names to the corresponding group indexes
+        self.group_index = {}
+
+        # A mapping from tuples of key column names to the encoders of their values (can be shared with other tables)
+        self.key_encoder = {}
+        # A mapping from tuples of key column names to the codes of their values for all rows (with a signature of the data they were computed for)
+        self.key_codes = {}
+        # A mapping from tuples of key column names to the corresponding key (hash) indexes
+        self.key_index = {}
+        # A mapping from tuples of key column names (partition keys followed by ordered key) to the corresponding sorted indexes
+        self.sorted_index = {}
+
+        # A mapping from aggregate column names to the states of their aggregators (with a signature of the facts they were computed for)
+        self.aggregate_state = {}
+
+        # Link paths (tuples of link column names) starting from this table which are shared by several merge operations
+        self.shared_link_paths = set()
+        # A mapping from shared link paths to the row ids they (composed) lead to for each row of this table
+        self.link_path_ids = {}
 
 
     def __repr__(self):
@@ -117,34 +138,104 @@ def evaluate(self) -> None:
         tab_ops = self.prosto.get_table_operations(self.id)
         tab_ops[0].evaluate()
 
-    def _get_or_create_groupby(self, link_column_name):
+    def get_key_encoder(self, columns) -> KeyEncoder:
+        """Return an encoder of the values of the specified key columns of this table (create if it does not exist)."""
+        encoder = self.key_encoder.get(tuple(columns))
+        if encoder is None:
+            encoder = KeyEncoder(len(columns))
+            self.key_encoder[tuple(columns)] = encoder
+
+        return encoder
+
+    def set_key_encoder(self, columns, encoder) -> None:
+        """Use the specified encoder for the key columns of this table, for example, in order to share it with another table."""
+        if self.key_encoder.get(tuple(columns)) is encoder:
+            return
+        self.key_encoder[tuple(columns)] = encoder
+        self.key_codes.pop(tuple(columns), None)
+
+    def get_key_codes(self, columns) -> pd.DataFrame:
         """
-        For each link column or attribute, this table object stores a pandas groupby object which is built when this link column is first time used.
-        Return or build such a groupby object for the (already evaluated) link column/attribute.
-        Currently, link columns/attributes are used in such operations as aggregation and grouped rolling aggregation.
+        Return codes of the values of the specified key columns for all rows of this table (row ids are in the index).
+        The codes are computed by the encoder of these columns and then reused until the table or its key columns change.
         """
-        gb = self.groupby.get(link_column_name)
-        if gb is not None:
-            return gb
+        data = self.data
+        encoder = self.get_key_encoder(columns)
+        signature = (data.id, data.id_range(), id(encoder)) + tuple(data.get_column_version(x) for x in columns)
 
-        # Use link column (with target row ids) to build a groupby object (it will build a group for each target row id)
-        try:
-            # Option 1:
-            gb = self.get_df().groupby(link_column_name, sort=False, as_index=True)
-            # Option 2:
-            #gb = self.get_data().groupby([link_column_name], sort=False, as_index=False)
-            # Option 3: group by index - grouping column will be retained via index
-            #gb = self.get_data().set_index(link_column_name, append=True).groupby(level=1)
+        cached = self.key_codes.get(tuple(columns))
+        if cached is not None and cached[0] == signature:
+            return cached[1]
 
-            # Alternatively, we could use target keys or main keys
-        except Exception as e:
-            raise ValueError("Error grouping input table using the specified column(s). Exception: {}".format(e))
+        frame = data.get_full_slice(columns)
+        codes = pd.DataFrame(encoder.encode_columns(frame, extend=True), index=frame.index, columns=columns)
 
-        # TODO: We might want to remove a group for null value (if it is created by the groupby constructor)
+        self.key_codes[tuple(columns)] = (signature, codes)
 
-        self.groupby[link_column_name] = gb
+        return codes
 
-        return gb
+    def get_key_index(self, columns) -> KeyIndex:
+        """
+        Return a key index which maps values of the specified columns to row ids of this table.
+        The index is built when it is first time used and then updated incrementally by adding new rows and deleting removed rows.
+        Currently, key indexes are used to find target rows when link columns referencing this table are evaluated.
+        """
+        index = self.key_index.get(tuple(columns))
+        if index is None:
+            index = KeyIndex(self, columns)
+            self.key_index[tuple(columns)] = index
+
+        index.update()
+
+        return index
+
+    def get_sorted_index(self, columns, on) -> SortedIndex:
+        """
+        Return an index with rows of this table sorted by the values of the ordered column within partitions defined by the (equality) columns.
+        The index is built when it is first time used and it is sorted again only if the table or its key columns change.
+        Currently, sorted indexes are used to find target rows when as-of and interval link columns referencing this table are evaluated.
+        """
+        index = self.sorted_index.get(tuple(columns) + (on,))
+        if index is None:
+            index = SortedIndex(self, columns, on)
+            self.sorted_index[tuple(columns) + (on,)] = index
+
+        index.update()
+
+        return index
+
+    def get_group_index(self, column) -> GroupIndex:
+        """
+        Return an index of groups of rows with the same value of the specified (link) column or attribute.
+        The index is built when it is first time used and then it is extended with new rows or rebuilt if the column changes.
+        Currently, group indexes are used in such operations as aggregation and grouped rolling aggregation.
+        """
+        index = self.group_index.get(column)
+        if index is None:
+            if column not in self.get_df().columns:
+                raise ValueError("Cannot group table '{}' using column '{}' which does not exist.".format(self.id, column))
+            index = GroupIndex(self, column)
+            self.group_index[column] = index
+
+        index.update()
+
+        return index
+
+    def get_link_path_ids(self, path, signature) -> Optional[pd.Series]:
+        """
+        Return row ids of the target table for each row of this table which are computed by following the specified link path.
+        The ids are returned only if they were cached for this path with the same signature (versions of all links in the path), and otherwise None.
+        """
+        entry = self.link_path_ids.get(tuple(path))
+        if entry is None or entry[0] != signature:
+            return None
+        return entry[1]
+
+    def set_link_path_ids(self, path, signature, ids) -> None:
+        """Cache row ids computed by following the specified link path if it is shared by several operations."""
+        if tuple(path) not in self.shared_link_paths:
+            return
+        self.link_path_ids[tuple(path)] = (signature, ids)
 
 
 if __name__ == "__main__":
@@ -3,6 +3,7 @@
 
 from prosto.utils import *
 from prosto.resolve import *
+from prosto.discretization import *
 
 from prosto.Prosto import *
 from prosto.Table import *
@@ -16,6 +17,9 @@ class TableOperation(Operation):
     def __init__(self, prosto, definition):
         super(TableOperation, self).__init__(prosto, definition)
 
+        # Product table: data object of the output table and data objects with id ranges of the input tables the product was generated for
+        self.product_ranges = None
+
     def get_dependencies_names(self) -> dict:
         """
         Get all dependencies represented by names like table names and column names as they are specified in the definition.
@@ -75,6 +79,11 @@ def get_dependencies_names(self) -> dict:
             source_keys = self.get_columns()  # OR definition.get("columns")
             dependencies[source_table_name].extend(source_keys)
 
+        elif operation.lower().startswith("buck"):
+            # Source table column with values to be discretized
+            source_table_name = tables[0]
+            dependencies[source_table_name].extend(self.get_columns())
+
         else:
             raise ValueError("Unknown operation type '{}' in the definition of column '{}'.".format(operation, self.id))
 
@@ -106,7 +115,12 @@ def evaluate(self) -> None:
                 raise ValueError("Unknown input_type parameter '{}'.".format(input_length))
 
         elif operation.lower().startswith("prod"):
-            new_data = self._evaluate_product()
+            # In incremental mode, the existing product is changed by adding and removing only combinations with changed input rows
+            if self.prosto.incremental and self._update_product():
+                new_data = None
+            else:
+                new_data = self._evaluate_product()
+            self._set_product_ranges()
 
         elif operation.lower().startswith("filt"):
             new_data = self._evaluate_filter()
@@ -114,6 +128,13 @@ def evaluate(self) -> None:
         elif operation.lower().startswith("proj"):
             new_data = self._evaluate_project()
 
+        elif operation.lower().startswith("buck"):
+            # New buckets are appended to the existing rows (rather than replacing them)
+            bucket_data = self._evaluate_bucket()
+            if len(bucket_data) > 0:
+                output_table.data.add(bucket_data)
+            new_data = None
+
         else:
             raise ValueError("Unknown operation type '{}' in the definition of table '{}'.".format(operation, self.id))
 
@@ -214,21 +235,103 @@ def _evaluate_product(self):
             raise ValueError("Number of input tables must be equal to the number of attributes in product table definition.".format())
 
         tables = self.prosto.get_tables(tables)
-        table_datas = [x.get_df() for x in tables]
 
         #
-        # Compute Cartesian product of all tables on their indexes
+        # Compute Cartesian product of all tables on their (not removed) row ids
         #
+        indexes = [np.arange(x.data.id_range().start, x.data.id_range().end, dtype=np.int64) for x in tables]
+
+        return self._get_product(indexes)
+
+    def _get_product(self, indexes) -> pd.DataFrame:
+        """
+        Product table. Return all combinations of the specified ids of the input tables (the last table changes fastest).
+        Ids are broadcast directly into the output array (each id is repeated and then the whole sequence is repeated)
+        without intermediate codes of the combinations.
+        """
+        outputs = self.get_outputs()
+        output_table = self.prosto.get_table(outputs[0])
 
-        table_indexes = [x.index for x in table_datas]
+        attributes = output_table.definition.get("attributes", [])
 
-        # Compute cartesian product
-        index = pd.MultiIndex.from_product(iterables=table_indexes, names=attributes)
+        sizes = [len(x) for x in indexes]
 
-        out = pd.DataFrame(index=index)
-        out.reset_index(inplace=True)
+        out = np.empty((int(np.prod(sizes)), len(sizes)), dtype=np.int64)
+        for i, index in enumerate(indexes):
+            inner = int(np.prod(sizes[i + 1:]))  # Number of rows with the same id
+            outer = int(np.prod(sizes[:i]))  # Number of repetitions of the whole sequence
+            out[:, i].reshape(outer, sizes[i], inner)[:] = np.asarray(index, dtype=np.int64)[None, :, None]
 
-        return out
+        return pd.DataFrame(out, columns=attributes, copy=False)
+
+    def _set_product_ranges(self) -> None:
+        """Product table. Remember the input rows the current product has been generated for."""
+        output_table = self.prosto.get_table(self.get_outputs()[0])
+        tables = self.prosto.get_tables(self.get_tables())
+
+        self.product_ranges = (output_table.data.id, [(x.data.id, x.data.id_range()) for x in tables])
+
+    def _update_product(self) -> bool:
+        """
+        Product table (incremental). Remove rows which reference removed input rows and append combinations with added input rows.
+        Return false if the product cannot be changed and has to be generated again, for example, if the input tables were reset
+        or the removed rows are not the oldest rows of the product.
+        """
+        if self.product_ranges is None:
+            return False
+
+        outputs = self.get_outputs()
+        output_table = self.prosto.get_table(outputs[0])
+
+        attributes = output_table.definition.get("attributes", [])
+
+        tables = self.prosto.get_tables(self.get_tables())
+
+        output_data_id, old_ranges = self.product_ranges
+        if output_data_id != output_table.data.id or len(old_ranges) != len(tables):
+            return False
+        if any(x.data.id != data_id for x, (data_id, _) in zip(tables, old_ranges)):
+            return False
+
+        old_ranges = [r for _, r in old_ranges]
+        ranges = [x.data.id_range() for x in tables]
+
+        #
+        # Product rows which reference removed input rows. Only the oldest rows of a table can be removed
+        #
+        data = output_table.data.get_full_slice(attributes)
+
+        retract = np.zeros(len(data), dtype=bool)
+        for attr, id_range, old_range in zip(attributes, ranges, old_ranges):
+            if id_range.start > old_range.start:
+                retract |= pd.to_numeric(data[attr]).values < id_range.start
+
+        count = int(retract.sum())
+        if not retract[:count].all():
+            return False
+
+        #
+        # New combinations are unions of products of retained rows of previous tables, added rows of one table and all rows of next tables
+        # These products do not overlap
+        #
+        retained = [np.arange(r.start, max(r.start, min(o.end, r.end)), dtype=np.int64) for r, o in zip(ranges, old_ranges)]
+        added = [np.arange(max(r.start, o.end), r.end, dtype=np.int64) for r, o in zip(ranges, old_ranges)]
+        full = [np.arange(r.start, r.end, dtype=np.int64) for r in ranges]
+
+        frames = []
+        for k in range(len(tables)):
+            indexes = retained[:k] + [added[k]] + full[k + 1:]
+            size = int(np.prod([len(x) for x in indexes]))
+            if size == 0:
+                continue
+            frames.append(self._get_product(indexes))
+
+        if count > 0:
+            output_table.data.remove(count)
+        if frames:
+            output_table.data.add(pd.concat(frames, ignore_index=True))
+
+        return True
 
     def _evaluate_filter(self):
         """A new (filtered) table is generated by using a boolen column to select rows."""
@@ -246,8 +349,6 @@ def _evaluate_filter(self):
         tables = self.prosto.get_tables(tables)
         base_table = tables[0]
 
-        base_table_data = base_table.get_df()
-
         #
         # Stage 2. Find filter column
         #
@@ -268,8 +369,9 @@ def _evaluate_filter(self):
 
         #
         # Stage 4. Apply filter
+        # Only the filter column itself is selected because the base table rows are not copied to this table
         #
-        out = base_table_data[filter_column]
+        out = filter_column[filter_column]
 
         #
         # Stage 5. Convert base index into a "super" link attribute
@@ -322,12 +424,20 @@ def _evaluate_project(self):
         df = df.groupby(by=["C1", "C2", "C3"], as_index=False).first()  # Using groupby
         np.unique(df[["col1", "col2"]], axis=0)  # Not for object data (error for object types)
         """
-        out = source_table.data.get_df().drop_duplicates(subset=source_keys)  # Really do projection
+        out = source_table.data.get_full_slice(source_keys)  # Only key columns are copied (not the whole source table)
+
+        # Rows are de-duplicated using integer codes of the key values (rather than hashing tuples of objects)
+        # The codes are cached by the source table and can be reused by the link column to the projected table
+        codes = source_table.get_key_codes(source_keys)
+        encoder = source_table.get_key_encoder(source_keys)
+        out = out[~encoder.combine(codes.values).duplicated()]  # Really do projection
+
+        # The projected table has the same key values so it uses the same encoder for its attributes
+        output_table.set_key_encoder(attributes, encoder)
 
         #
         # Stage 5. Index and renamings
         #
-        out = out[source_keys]  # Leave only project columns (de-duplicate will return *all* source columns)
 
         # Rename to attribute names (de-duplicate will return source table columns)
         rename_dict = dict(zip(source_keys, attributes))  # # source_keys (keys) -> attribute_names (values)
@@ -337,6 +447,57 @@ def _evaluate_project(self):
 
         return out
 
+    def _evaluate_bucket(self):
+        """Find buckets (discretized values) of the input column which are not in the bucket table yet and return them as new rows."""
+        definition = self.definition
+
+        outputs = self.get_outputs()
+        output_table = self.prosto.get_table(outputs[0])
+
+        model = definition.get("model")
+
+        #
+        # Stage 1. Prepare input data
+        #
+        tables = self.get_tables()
+        if not tables:
+            raise ValueError("Bucket operation must specify one input table in the 'tables' field".format())
+        tables = self.prosto.get_tables(tables)
+        source_table = tables[0]
+
+        columns = self.get_columns()
+        if len(columns) != 1:
+            raise ValueError("Bucket operation expects only one input column to be discretized.".format())
+        if not all_columns_exist(columns, source_table.get_df()):
+            raise ValueError("Not all input columns available in the bucket table definition.".format())
+
+        attributes = output_table.definition.get("attributes", [])
+        if len(attributes) != 1:
+            raise ValueError("Bucket table must declare one attribute for the bucket values.".format())
+
+        # Buckets are never removed so only added rows can produce new buckets (unless the bucket table is empty, e.g., after reset)
+        if self.prosto.incremental and output_table.data.length() > 0:
+            data = source_table.data.get_added_slice(columns)
+        else:
+            data = source_table.data.get_full_slice(columns)
+
+        #
+        # Stage 2. Discretize and find distinct buckets
+        #
+        values = discretize_values(data[columns[0]], model)
+        values = values[values.notna()].drop_duplicates().sort_values()
+
+        out = pd.DataFrame({attributes[0]: values.values})
+
+        #
+        # Stage 3. Retain only buckets which do not exist in the bucket table
+        #
+        if output_table.data.length() > 0:
+            index = output_table.get_key_index(attributes)
+            out = out[index.probe(out).isna().values]
+
+        return out
+
 
 if __name__ == "__main__":
     pass
@@ -39,6 +39,11 @@ def translate(self) -> None:
 
         all_operations = [x for x in self.prosto.operations]
 
+        #
+        # Find link paths which are shared by several merge operations so that they are composed only once
+        #
+        self.find_shared_link_paths(all_operations)
+
         # Empty collection of already processed elements (they can be simultaneously removed from all)
         done = []
 
@@ -90,6 +95,11 @@ def translate(self) -> None:
             layers.append(layer)
             done.extend(layer)
 
+        #
+        # Aggregations of the same facts in one layer are fused into one operation which reads the facts only once
+        #
+        layers = [self.fuse_aggregations(layer) for layer in layers]
+
         # Layers of operations
         self.layers = layers
 
@@ -105,8 +115,10 @@ def translate(self) -> None:
                     elem_layer.extend(tables)
 
                     # Allocate/initialize data and other resources
-                    for tab in tables:
-                        tab.data = Data(tab)
+                    # In incremental mode, the data is retained so that the changes can be propagated to the existing data
+                    if not self.prosto.incremental:
+                        for tab in tables:
+                            tab.data = Data(tab)
 
                 elif isinstance(op, ColumnOperation):  # Find column
                     table_name = op.definition.get("table")
@@ -116,6 +128,81 @@ def translate(self) -> None:
 
         self.elem_layers = elem_layers
 
+    def fuse_aggregations(self, layer) -> list:
+        """
+        Replace aggregate operations of one layer which have the same fact table, link column and output table
+        with one (batch) aggregate operation having them as its member operations and producing all their outputs.
+        Accumulations are not fused because they maintain their own state.
+        """
+        groups = {}
+        for op in layer:
+            if not isinstance(op, ColumnOperation) or not op.operation.lower().startswith("aggr"):
+                continue
+            if op.definition.get("input_length") != "column" or op.definition.get("operations"):
+                continue
+
+            definition = op.definition
+            key = (definition.get("table"), tuple(op.get_tables()), definition.get("link"), definition.get("fillna_value"))
+            groups.setdefault(key, []).append(op)
+
+        for (table, tables, link, fillna_value), ops in groups.items():
+            if len(ops) < 2:
+                continue
+
+            # Input columns are used as dependencies (they are resolved against the fact data during evaluation)
+            columns = []
+            for op in ops:
+                columns.extend([x for x in op.get_columns() + op.get_where_columns() if x not in columns])
+
+            operation_def = {
+                "id": None,
+                "operation": "aggregate",
+
+                "table": table,
+                "outputs": [op.get_outputs()[0] for op in ops],
+
+                "tables": list(tables),
+                "link": link,
+
+                "columns": columns,
+                "input_length": "column",
+                "operations": ops,
+
+                "fillna_value": fillna_value,
+            }
+            batch = ColumnOperation(self.prosto, operation_def)
+
+            # The batch operation is placed where its first member was
+            layer = [batch if x is ops[0] else x for x in layer if x is ops[0] or x not in ops]
+
+        return layer
+
+    def find_shared_link_paths(self, all_operations) -> None:
+        """
+        Find prefixes of link paths (with at least two links) which are used by several merge operations of one table.
+        Row ids composed for these prefixes will be cached by the table and reused by all merge operations extending them.
+        """
+        counts = {}
+        for op in all_operations:
+            if not isinstance(op, ColumnOperation) or not op.operation.lower().startswith("merg"):
+                continue
+
+            segments = list()
+            for column_name in op.get_columns():
+                segments.extend(column_name.split(pr.Prosto.column_path_separator))
+
+            # The last segment is a merged column and all previous segments are links
+            table_name = op.definition.get("table")
+            for k in range(2, len(segments)):
+                key = (table_name, tuple(segments[:k]))
+                counts[key] = counts.get(key, 0) + 1
+
+        for table in self.prosto.tables:
+            table.shared_link_paths = {path for (table_name, path), count in counts.items() if table_name == table.id and count > 1}
+
+            # Cached ids of paths which are not shared anymore are not needed
+            table.link_path_ids = {path: ids for path, ids in table.link_path_ids.items() if path in table.shared_link_paths}
+
     def augment(self, all_operations) -> None:
         """
         Process all operations by resolving ambiguities, making optimizations and solving other problems.
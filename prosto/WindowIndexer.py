@@ -0,0 +1,33 @@
+from typing import Union, Any, List, Set, Dict, Tuple, Optional
+
+from pandas.api.indexers import BaseIndexer
+
+from prosto.utils import *
+
+
+class WindowIndexer(BaseIndexer):
+    """
+    The class represents windows of rows with explicitly specified bounds which are passed to pandas rolling objects.
+    Each row has one window which starts at the start position (inclusive) and ends at the end position (exclusive).
+    It is used for windows which are computed by prosto, for example, windows within groups or time windows.
+    """
+
+    def __init__(self, starts, ends):
+        """
+        Create windows with the specified bounds.
+
+        :param starts: Array with the first position of the window of each row
+        :param ends: Array with the position after the last row of the window of each row
+        """
+        super(WindowIndexer, self).__init__(starts=np.asarray(starts, dtype=np.int64), ends=np.asarray(ends, dtype=np.int64))
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None) -> tuple:
+        """Return start and end positions of the windows of all rows."""
+        if num_values != len(self.starts):
+            raise ValueError("Number of rows {} is not equal to the number of windows {}.".format(num_values, len(self.starts)))
+
+        return self.starts, self.ends
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,513 @@
+from typing import Union, Any, List, Set, Dict, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+from prosto.resolve import *
+
+
+"""
+Built-in aggregate functions.
+They get group codes (positions of the target rows or -1 for rows without group) and values of the fact rows,
+and compute the aggregated values of all groups directly into an array without building any groupby object.
+Null values are skipped and groups without rows get null values.
+Approximate functions (distinct count, quantiles, top values) maintain sketches which are also mergeable.
+"""
+
+
+class Aggregator:
+    """
+    Aggregate function represented by a state which is an array (or tuple of arrays) with an element for each group.
+    Facts can be split into chunks which are aggregated independently and then their states are merged.
+    The update function gets only rows with group codes in the range and non-null values.
+    Values are converted to floats for numeric aggregators, and otherwise they are passed as objects.
+    """
+
+    numeric = True
+
+    def init(self, size):
+        """Return an initial (empty) state for the specified number of groups."""
+        raise NotImplementedError()
+
+    def update(self, state, codes, values):
+        """Add the values to the state of their groups and return the new state."""
+        raise NotImplementedError()
+
+    def merge(self, state, other):
+        """Combine two states computed for different rows and return the new state."""
+        raise NotImplementedError()
+
+    def finalize(self, state) -> np.ndarray:
+        """Return the aggregated value of each group."""
+        raise NotImplementedError()
+
+
+class SumAggregator(Aggregator):
+    """Sum of the values."""
+
+    def init(self, size):
+        return np.zeros(size)
+
+    def update(self, state, codes, values):
+        return state + np.bincount(codes, weights=values, minlength=len(state))
+
+    def merge(self, state, other):
+        return state + other
+
+    def finalize(self, state) -> np.ndarray:
+        return state
+
+
+class CountAggregator(Aggregator):
+    """Number of (non-null) values or rows if there are no values."""
+
+    def init(self, size):
+        return np.zeros(size)
+
+    def update(self, state, codes, values):
+        return state + np.bincount(codes, minlength=len(state))
+
+    def merge(self, state, other):
+        return state + other
+
+    def finalize(self, state) -> np.ndarray:
+        return state
+
+
+class MeanAggregator(Aggregator):
+    """Mean of the values computed from their sum and count."""
+
+    def init(self, size):
+        return np.zeros(size), np.zeros(size)
+
+    def update(self, state, codes, values):
+        sums, counts = state
+        return sums + np.bincount(codes, weights=values, minlength=len(sums)), counts + np.bincount(codes, minlength=len(sums))
+
+    def merge(self, state, other):
+        return state[0] + other[0], state[1] + other[1]
+
+    def finalize(self, state) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return state[0] / state[1]
+
+
+class MinAggregator(Aggregator):
+    """Minimum of the values."""
+
+    def init(self, size):
+        return np.full(size, np.inf), np.zeros(size)
+
+    def update(self, state, codes, values):
+        mins, counts = state
+        mins = mins.copy()
+        np.minimum.at(mins, codes, values)
+        return mins, counts + np.bincount(codes, minlength=len(mins))
+
+    def merge(self, state, other):
+        return np.minimum(state[0], other[0]), state[1] + other[1]
+
+    def finalize(self, state) -> np.ndarray:
+        return np.where(state[1] > 0, state[0], np.nan)
+
+
+class MaxAggregator(Aggregator):
+    """Maximum of the values."""
+
+    def init(self, size):
+        return np.full(size, -np.inf), np.zeros(size)
+
+    def update(self, state, codes, values):
+        maxs, counts = state
+        maxs = maxs.copy()
+        np.maximum.at(maxs, codes, values)
+        return maxs, counts + np.bincount(codes, minlength=len(maxs))
+
+    def merge(self, state, other):
+        return np.maximum(state[0], other[0]), state[1] + other[1]
+
+    def finalize(self, state) -> np.ndarray:
+        return np.where(state[1] > 0, state[0], np.nan)
+
+
+class VarAggregator(Aggregator):
+    """Sample variance (with one degree of freedom) computed from count, mean and sum of squared deviations of each chunk."""
+
+    def init(self, size):
+        return np.zeros(size), np.zeros(size), np.zeros(size)
+
+    def update(self, state, codes, values):
+        size = len(state[0])
+        counts = np.bincount(codes, minlength=size).astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.nan_to_num(np.bincount(codes, weights=values, minlength=size) / counts)
+        squares = np.bincount(codes, weights=(values - means[codes]) ** 2, minlength=size)
+        return self.merge(state, (counts, means, squares))
+
+    def merge(self, state, other):
+        n1, mean1, m1 = state
+        n2, mean2, m2 = other
+        n = n1 + n2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = mean2 - mean1
+            mean = np.where(n > 0, mean1 + delta * n2 / n, 0.0)
+            m = m1 + m2 + np.where(n > 0, delta ** 2 * n1 * n2 / n, 0.0)
+        return n, mean, m
+
+    def finalize(self, state) -> np.ndarray:
+        n, mean, m = state
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > 1, m / (n - 1), np.nan)
+
+
+class DistinctCountAggregator(Aggregator):
+    """
+    Approximate number of distinct values computed by the HyperLogLog sketch.
+    Each group has 2^precision registers storing the maximum rank of hashes of its values, and states are merged by maximum.
+    """
+
+    numeric = False
+
+    def __init__(self, precision=10):
+        self.precision = precision
+
+    def init(self, size):
+        return np.zeros((size, 1 << self.precision), dtype=np.uint8)
+
+    def update(self, state, codes, values):
+        p = self.precision
+        hashes = pd.util.hash_array(np.asarray(values, dtype=object))
+
+        # The first bits of the hash select a register and the position of the first one bit in other bits is its rank
+        registers = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = (hashes << np.uint64(p)) | np.uint64(1 << (p - 1))
+        ranks = (64 - np.floor(np.log2(rest.astype(float)))).clip(1, 64 - p + 1).astype(np.uint8)
+
+        state = state.copy()
+        np.maximum.at(state, (codes, registers), ranks)
+        return state
+
+    def merge(self, state, other):
+        return np.maximum(state, other)
+
+    def finalize(self, state) -> np.ndarray:
+        m = state.shape[1]
+        alpha = 0.7213 / (1 + 1.079 / m)
+
+        estimate = alpha * m * m / np.sum(np.power(2.0, -state.astype(float)), axis=1)
+
+        # Linear counting is more precise for small cardinalities
+        zeros = np.count_nonzero(state == 0, axis=1)
+        with np.errstate(divide="ignore"):
+            small = m * np.log(m / zeros)
+        return np.where((estimate <= 2.5 * m) & (zeros > 0), small, estimate)
+
+
+class QuantileAggregator(Aggregator):
+    """
+    Approximate quantile computed by the KLL sketch.
+    Each group has levels of sorted items where an item of level i represents 2^i values. If a level has more than k items,
+    then every other item (with random offset) is promoted to the next level. States are merged by concatenating their levels.
+    """
+
+    def __init__(self, q=0.5, k=200, seed=0):
+        self.q = q
+        self.k = k
+        self.rng = np.random.default_rng(seed)
+
+    def init(self, size):
+        return np.full(size, None, dtype=object)
+
+    def update(self, state, codes, values):
+        state = state.copy()
+
+        order = np.argsort(codes, kind="stable")
+        codes = codes[order]
+        values = values[order]
+
+        groups, starts = np.unique(codes, return_index=True)
+        ends = np.append(starts[1:], len(codes))
+        for group, start, end in zip(groups, starts, ends):
+            state[group] = self._compact(self._combine(state[group], [values[start:end]]))
+
+        return state
+
+    def merge(self, state, other):
+        state = state.copy()
+        for group in [i for i, x in enumerate(other) if x is not None]:
+            state[group] = self._compact(self._combine(state[group], other[group]))
+        return state
+
+    def finalize(self, state) -> np.ndarray:
+        out = np.full(len(state), np.nan)
+        for group in [i for i, x in enumerate(state) if x is not None]:
+            levels = state[group]
+            items = np.concatenate(levels)
+            weights = np.concatenate([np.full(len(x), 2.0 ** i) for i, x in enumerate(levels)])
+
+            order = np.argsort(items)
+            cumulative = np.cumsum(weights[order])
+            position = np.searchsorted(cumulative, self.q * cumulative[-1], side="left")
+            out[group] = items[order][min(position, len(items) - 1)]
+        return out
+
+    def _combine(self, levels, other):
+        if levels is None:
+            return list(other)
+        size = max(len(levels), len(other))
+        levels = levels + [np.empty(0)] * (size - len(levels))
+        return [np.concatenate([levels[i], other[i]]) if i < len(other) else levels[i] for i in range(size)]
+
+    def _compact(self, levels):
+        i = 0
+        while i < len(levels):
+            if len(levels[i]) > self.k:
+                items = np.sort(levels[i])
+                even = len(items) - len(items) % 2
+                promoted = items[:even][self.rng.integers(2)::2]
+                levels[i] = items[even:]  # Odd item remains on this level
+                if i + 1 == len(levels):
+                    levels.append(np.empty(0))
+                levels[i + 1] = np.concatenate([levels[i + 1], promoted])
+            i += 1
+        return levels
+
+
+class TopAggregator(Aggregator):
+    """
+    Approximate most frequent values computed by the count-min sketch.
+    Each group has a count-min table (depth rows of width counters) and k candidate values with largest estimated counts.
+    Tables are merged by addition and candidates of both states are estimated again.
+    """
+
+    numeric = False
+
+    def __init__(self, k=10, width=256, depth=4, seed=0):
+        self.k = k
+        self.width = width
+        self.depth = depth
+
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 1 << 31, size=depth, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 1 << 31, size=depth, dtype=np.uint64)
+
+    def init(self, size):
+        return np.zeros((size, self.depth, self.width), dtype=np.int64), np.full(size, None, dtype=object)
+
+    def update(self, state, codes, values):
+        counters, candidates = state[0].copy(), state[1].copy()
+
+        values = np.asarray(values, dtype=object)
+        columns = self._get_columns(self._hash(values))
+        for j in range(self.depth):
+            np.add.at(counters, (codes, j, columns[j]), 1)
+
+        self._select(counters, candidates, codes, values)
+
+        return counters, candidates
+
+    def merge(self, state, other):
+        counters = state[0] + other[0]
+        candidates = state[1].copy()
+
+        groups = [i for i, x in enumerate(other[1]) if x is not None]
+        if groups:
+            codes = np.repeat(groups, [len(other[1][i]) for i in groups])
+            values = np.concatenate([np.asarray(other[1][i], dtype=object) for i in groups])
+            self._select(counters, candidates, codes, values)
+
+        return counters, candidates
+
+    def finalize(self, state) -> np.ndarray:
+        out = np.full(len(state[1]), None, dtype=object)
+        for group in [i for i, x in enumerate(state[1]) if x is not None]:
+            out[group] = list(state[1][group])
+        return out
+
+    def _hash(self, values):
+        """Hash values as 64 bit integers."""
+        return pd.util.hash_array(np.asarray(values, dtype=object))
+
+    def _get_columns(self, hashes):
+        """Map hashes of values into one counter of each row of the table."""
+        return [(((hashes * self.a[j] + self.b[j]) >> np.uint64(32)) % np.uint64(self.width)).astype(np.int64) for j in range(self.depth)]
+
+    def _select(self, counters, candidates, codes, values) -> None:
+        """
+        Estimate counts of the old candidates and the new values of the groups (with the specified codes)
+        and store k of them with largest counts (in descending order) as new candidates of these groups.
+        All groups are processed together by sorting the (group, value) pairs rather than group by group.
+        """
+        if len(codes) == 0:
+            return
+
+        # Old candidates precede new values so that they win if estimates are equal
+        groups = [g for g in np.unique(codes) if candidates[g] is not None]
+        if groups:
+            codes = np.concatenate([np.repeat(groups, [len(candidates[g]) for g in groups]), codes])
+            values = np.concatenate([np.asarray(candidates[g], dtype=object) for g in groups] + [values])
+        codes = np.asarray(codes, dtype=np.int64)
+        hashes = self._hash(values)
+
+        # Distinct values of each group (the first occurrence is retained)
+        order = np.lexsort((np.arange(len(codes)), hashes, codes))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (codes[order][1:] != codes[order][:-1]) | (hashes[order][1:] != hashes[order][:-1])
+        order = order[first]
+
+        columns = self._get_columns(hashes[order])
+        estimates = np.min([counters[codes[order], j, columns[j]] for j in range(self.depth)], axis=0)
+
+        # Largest estimates of each group first (and earlier occurrences for equal estimates)
+        order = order[np.lexsort((order, -estimates, codes[order]))]
+        codes, values = codes[order], values[order]
+
+        starts = np.flatnonzero(np.concatenate([[True], codes[1:] != codes[:-1]]))
+        ranks = np.arange(len(codes)) - np.repeat(starts, np.diff(np.append(starts, len(codes))))
+        codes, values = codes[ranks < self.k], values[ranks < self.k]
+
+        bounds = np.flatnonzero(np.concatenate([[True], codes[1:] != codes[:-1], [True]]))
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            candidates[codes[start]] = values[start:end]
+
+
+aggregators = {
+    "sum": SumAggregator,
+    "mean": MeanAggregator,
+    "count": CountAggregator,
+    "min": MinAggregator,
+    "max": MaxAggregator,
+    "var": VarAggregator,
+    "distinct": DistinctCountAggregator,
+    "quantile": QuantileAggregator,
+    "top": TopAggregator,
+}
+
+
+def is_aggregator(obj) -> bool:
+    """Check if the object (or class) declares init, update, merge and finalize functions."""
+    return all(callable(getattr(obj, x, None)) for x in ["init", "update", "merge", "finalize"])
+
+
+def get_aggregator(func, model=None) -> Optional[Aggregator]:
+    """
+    Return an aggregator for the name of a built-in function, an aggregator object or class, and otherwise None.
+    New aggregators are created with the model (dict) as keyword arguments, for example, quantile q or the number of top values k.
+    """
+    if isinstance(func, str):
+        cls = aggregators.get(func.strip().lower())
+        return cls(**(model or {})) if cls else None
+    elif isinstance(func, type) and is_aggregator(func):
+        return func(**(model or {}))
+    elif is_aggregator(func):
+        return func
+    return None
+
+
+def aggregate_state(aggregator, codes, values, size, shards=1, executor="thread") -> tuple:
+    """
+    Compute the number of rows and the state of the aggregator for each of the specified number of groups.
+    The result can be merged with states computed for other rows and then finalized.
+    """
+    if values is None and not isinstance(aggregator, CountAggregator):
+        raise ValueError("Aggregate function '{}' requires an input column.".format(type(aggregator).__name__))
+
+    codes = np.asarray(codes, dtype=np.int64)
+    if values is not None:
+        values = np.asarray(values, dtype=float) if getattr(aggregator, "numeric", True) else np.asarray(values, dtype=object)
+
+    # Split rows into chunks of (almost) equal length
+    shards = max(1, min(shards or 1, len(codes)))
+    bounds = np.linspace(0, len(codes), shards + 1).astype(np.int64)
+    chunks = [
+        (aggregator, codes[start:end], values[start:end] if values is not None else None, size)
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+
+    if shards == 1:
+        results = [_aggregate_chunk(*chunks[0])]
+    else:
+        pool = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+        with pool(max_workers=shards) as ex:
+            results = list(ex.map(_aggregate_chunk, *zip(*chunks)))
+
+    # Partial states of the chunks are combined in one state
+    rows, state = results[0]
+    for chunk_rows, chunk_state in results[1:]:
+        rows = rows + chunk_rows
+        state = aggregator.merge(state, chunk_state)
+
+    return rows, state
+
+
+def resize_state(aggregator, rows, state, size) -> tuple:
+    """Extend the number of rows and the state of the aggregator with (empty) groups so that it has the specified number of groups."""
+    if len(rows) == size:
+        return rows, state
+
+    def resize(old, new):
+        if isinstance(old, tuple):
+            return tuple(resize(o, n) for o, n in zip(old, new))
+        new[:len(old)] = old
+        return new
+
+    rows = resize(rows, np.zeros(size, dtype=rows.dtype))
+    state = resize(state, aggregator.init(size))
+
+    return rows, state
+
+
+def finalize_state(aggregator, rows, state) -> np.ndarray:
+    """Return aggregated values of all groups computed from their states. Groups without rows get null values."""
+    out = np.asarray(aggregator.finalize(state))
+
+    if out.dtype.kind == "f":
+        out = out.copy()
+        out[rows == 0] = np.nan  # Groups without rows get the default value
+    else:
+        out = out.astype(object)
+        out[rows == 0] = None
+
+    return out
+
+
+def aggregate_groups(func, keys, data, offsets, model) -> list:
+    """
+    Apply the UDF to each group of the data where rows of one group are stored consecutively and start at the specified offsets.
+    The function can be specified by its name or definition, which is resolved here (e.g., in another process).
+    """
+    if isinstance(func, str):
+        func = resolve_full_name(func)
+
+    values = []
+    for i in range(len(keys)):
+        g = data.iloc[offsets[i] - offsets[0]:offsets[i + 1] - offsets[0]]
+
+        # Invoke depending on the model type
+        if model is None:
+            value = func(g)  # No model
+        elif isinstance(model, (list, tuple)):
+            value = func(g, *model)  # Model as positional arguments
+        elif isinstance(model, dict):
+            value = func(g, **model)  # Model as keyword arguments
+        else:
+            value = func(g, model)  # Model as an arbitrary object
+
+        values.append(value)
+
+    return values
+
+
+def _aggregate_chunk(aggregator, codes, values, size):
+    """Compute the number of rows and the (partial) state for each group from one chunk of rows."""
+    valid = (codes >= 0) & (codes < size)
+    rows = np.bincount(codes[valid], minlength=size)
+
+    if values is not None:
+        valid &= ~pd.isna(values)
+        values = values[valid]
+
+    state = aggregator.update(aggregator.init(size), codes[valid], values)
+
+    return rows, state
@@ -1,3 +1,5 @@
+import re
+
 from prosto.Prosto import *
 
 
@@ -9,6 +11,12 @@ def parse_column_sql(query: str):
     op = op.strip()
     query = query.strip()
 
+    # Operation modifier. Example: LINK ASOF table(col1) -> ...
+    modifier = query.split(maxsplit=1)
+    if op.upper() == "LINK" and len(modifier) > 1 and modifier[0].upper() in ("ASOF", "INTERVAL"):
+        op = op + " " + modifier[0]
+        query = modifier[1].strip()
+
     #
     # FUNC, ARGS, WINDOW
     #
@@ -89,3 +97,39 @@ def parse_column_sql(query: str):
         entries.append(entry)
 
     return op, entries, func_str, args_str, win_str
+
+
+def parse_where_clause(query: str):
+    """
+    Extract the WHERE clause (a predicate of the input table) from the query and return the query without it and the predicate.
+    Example: AGGREGATE facts(col1) -> link -> groups(col2) WHERE col3 > 0 FUNC sum
+    Only the aggregate operation has this clause and it has to precede other clauses (so that function code is not parsed).
+    """
+    if not query.strip().upper().startswith("AGGR"):
+        return query, ""
+
+    # The predicate ends where the next clause starts
+    end_match = re.search(r"\b(FUNC|ARGS|WINDOW)\b", query, re.IGNORECASE)
+    where_end = end_match.start() if end_match else len(query)
+
+    where_match = re.search(r"\bWHERE\b", query[:where_end], re.IGNORECASE)
+    if where_match is None:
+        return query, ""
+
+    where_str = query[where_match.end():where_end].strip()
+    query = query[:where_match.start()] + " " + query[where_end:]
+
+    return query.strip(), where_str
+
+
+def parse_window_clause(win_str: str):
+    """
+    Split the WINDOW clause into the window (without quotes) and the timestamp column (or None).
+    Example: WINDOW '15min' ON ts
+    """
+    parts = re.split(r"\s+ON\s+", win_str.strip(), maxsplit=1, flags=re.IGNORECASE)
+
+    window = parts[0].strip().strip("'\"")
+    on = parts[1].strip() if len(parts) > 1 else None
+
+    return window, on
@@ -0,0 +1,120 @@
+from typing import Union, Any, List, Set, Dict, Tuple, Optional
+
+import pandas as pd
+import numpy as np
+
+
+"""
+Discretization of values (numbers or timestamps) into intervals.
+Intervals have equal length (step) starting from some origin or they are specified by explicit borders.
+All values are processed at once by array operations (floor division or binary search of the borders).
+"""
+
+
+def discretize_values(ser, model) -> pd.Series:
+    """Return interval numbers or interval borders (depending on the model) for the values of the series."""
+    # Discretization model
+    # Model example: {
+    #   "origin/base/ancor": 1, (default is 0) - value the steps are started from (also negative). it is always label no 0 (but can represent left/negative or right/positive interval).
+    #   "step/freq/rule": 10, - length of one whole interval (unit of the raster). For timestamps, it is a time interval like "1h"
+    #   "bins": [0, 10, 100], - alternatively, explicit (sorted) borders of the intervals
+    #   "label/label_end/border": "left/right" (return left or right border as id, default is left),
+    #   "closed": "left/right" (default left),
+    #   "label_value": "step/border" (default step_no, interval_no) - return intervla number or border value (note that returning float value is a bad idea because floats are bad representatives for discrete groups, also step/interval_no are continuous)
+    #   }
+
+    # ----0---------1---------2---------3--- label_no
+    #    )[        )[        )[        )[ closed left - either left or right label
+    #     ](        ](        ](        ]( closed right - either left or right label
+
+    if model is None:
+        raise ValueError("Discretize expects non-empty model.")
+    elif not isinstance(model, dict):
+        raise ValueError("Discretize expects a model as a dictionary with discretization parameters.")
+
+    # Get parameters
+    origin = model.get("origin", 0)
+    step = model.get("step", 1)
+    bins = model.get("bins")
+    label = model.get("label", "left")
+    closed = model.get("closed", "left")
+    label_value = model.get("label_value", "interval")
+
+    # Timestamps are discretized as integer numbers of nanoseconds
+    is_datetime = pd.api.types.is_datetime64_any_dtype(ser)
+    if is_datetime:
+        tz = getattr(ser.dt, "tz", None)
+        nulls = ser.isna().values
+        values = ser.values.astype("datetime64[ns]").view(np.int64).astype(float)
+        values[nulls] = np.nan
+    else:
+        values = pd.to_numeric(ser, errors="coerce").values.astype(float)
+
+    if bins is not None:
+        #
+        # Explicit borders. Interval number i is the interval between borders i and i+1
+        #
+        edges = pd.to_datetime(pd.Series(bins)).values.astype("datetime64[ns]").view(np.int64) if is_datetime else np.asarray(bins, dtype=float)
+        if (np.diff(edges) <= 0).any():
+            raise ValueError("Borders of intervals have to be strictly increasing.")
+
+        left_border_no = np.searchsorted(edges, values, side="right" if closed == "left" else "left") - 1
+        right_border_no = left_border_no + 1
+
+        label_no = left_border_no if label == "left" else right_border_no
+        label_no = np.where(np.isnan(values), np.nan, label_no)
+
+        if label_value == "interval":
+            out = label_no
+        else:
+            valid = (label_no >= 0) & (label_no < len(edges))
+            out = np.where(valid, edges[np.where(valid, label_no, 0).astype(np.int64)], np.nan)
+    else:
+        #
+        # Intervals of equal length. How many whole steps from origin till this point (floor division) and what is the remainder
+        #
+        if is_datetime:
+            step = pd.Timedelta(step).value
+            origin = pd.Timestamp(origin, tz=tz).value if not isinstance(origin, (int, float)) else origin
+
+        if step <= 0:
+            raise ValueError("Discretization step {} has to be positive.".format(step))
+
+        steps, remainder = np.divmod(values - origin, step)
+
+        # Value exactly on the border belongs either to the right interval (closed left) or to the left interval (closed right)
+        left_border_no = steps
+        if closed != "left":
+            left_border_no = np.where(remainder == 0, steps - 1, steps)
+        right_border_no = left_border_no + 1
+
+        #
+        # Determine label for this interval
+        #
+        label_no = left_border_no if label == "left" else right_border_no
+
+        if label_value == "interval":
+            out = label_no
+        elif is_datetime:
+            out = label_no * step + origin
+        else:
+            out = label_no * step
+
+    #
+    # Labels are integers unless there are nulls, and borders have the type of the values
+    #
+    if is_datetime and label_value != "interval":
+        out = pd.to_datetime(pd.Series(out, index=ser.index), utc=tz is not None)
+        out = out.dt.tz_convert(tz) if tz is not None else out
+    elif label_value == "interval" or np.issubdtype(ser.dtype, np.integer):
+        out = pd.Series(out, index=ser.index)
+        if not out.isna().any():
+            out = out.astype(np.int64)
+    else:
+        out = pd.Series(out, index=ser.index)
+
+    return out
+
+
+if __name__ == "__main__":
+    pass
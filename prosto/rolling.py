@@ -0,0 +1,204 @@
+from typing import Union, Any, List, Set, Dict, Tuple, Optional
+
+import pandas as pd
+import numpy as np
+
+from prosto.WindowIndexer import *
+
+
+"""
+Built-in window functions.
+They are computed by the rolling kernels of pandas which add and remove rows of the moving windows
+so that the work per row does not depend on the window size (min and max use a monotonic deque).
+The exponentially weighted mean (ewm) does not have windows and its state (for each group) is updated by each new row.
+Cumulative functions (running sum, max etc.) are computed for all rows of each group in one pass
+and can be continued from the last value of each group.
+"""
+
+window_functions = ["sum", "mean", "std", "var", "min", "max", "count"]
+
+
+def is_window_function(func) -> bool:
+    """Determine if the function is a name of a built-in window function."""
+    return isinstance(func, str) and (func in window_functions or func == "ewm")
+
+
+def roll_kernel(func, values, bounds, model=None) -> pd.Series:
+    """Compute the built-in window function for the windows with the specified bounds (starts, ends and minimum number of rows)."""
+    starts, ends, min_periods = bounds
+
+    rl = pd.to_numeric(values, errors="coerce").rolling(WindowIndexer(starts, ends), min_periods=min_periods)
+
+    return getattr(rl, func)(**(model or {}))
+
+
+#
+# Exponentially weighted mean
+#
+
+def ewm_options(model) -> tuple:
+    """
+    Return smoothing factor, adjust flag, ignore null flag and minimum number of observations from the model with the same parameters as in pandas.
+    The smoothing factor is specified by one of the parameters: alpha, span, com or halflife.
+    """
+    model = dict(model or {})
+
+    if model.get("alpha") is not None:
+        alpha = float(model["alpha"])
+    elif model.get("span") is not None:
+        alpha = 2.0 / (float(model["span"]) + 1.0)
+    elif model.get("com") is not None:
+        alpha = 1.0 / (float(model["com"]) + 1.0)
+    elif model.get("halflife") is not None:
+        alpha = 1.0 - np.exp(-np.log(2.0) / float(model["halflife"]))
+    else:
+        raise ValueError("Exponentially weighted mean requires one of the parameters alpha, span, com or halflife.")
+
+    if not 0.0 < alpha <= 1.0:
+        raise ValueError("Smoothing factor {} of exponentially weighted mean has to be in (0, 1].".format(alpha))
+
+    return alpha, model.get("adjust", True), model.get("ignore_na", False), model.get("min_periods", 0) or 0
+
+
+def ewm_roll(values, offsets, model) -> tuple:
+    """
+    Compute exponentially weighted mean of the values sorted by group (with start positions of the groups) in one pass.
+    Return the means and the state of each group which is a tuple of arrays (current mean, weight of old values, number of observations).
+    """
+    alpha, adjust, ignore_na, min_periods = ewm_options(model)
+    beta = 1.0 - alpha
+
+    values = pd.to_numeric(pd.Series(np.asarray(values)), errors="coerce").astype(float).reset_index(drop=True)
+    sizes = np.diff(offsets)
+    groups = np.repeat(np.arange(len(sizes)), sizes)
+
+    means = values.groupby(groups, sort=False).ewm(alpha=alpha, adjust=adjust, ignore_na=ignore_na).mean()
+    means = means.reset_index(level=0, drop=True).sort_index().values if len(values) else np.empty(0)
+
+    # Number of observations (non-null values) up to each row in its group
+    observed = values.notna().values
+    counts = np.cumsum(observed)
+    counts = counts - np.concatenate([[0], counts])[offsets[:-1]][groups] if len(values) else counts
+
+    #
+    # State after the last row of each group
+    #
+    count = len(sizes)
+    nobs = np.bincount(groups[observed], minlength=count)
+
+    weighted = np.full(count, np.nan)
+    old_wt = np.ones(count)
+
+    if len(values):
+        last = offsets[1:] - 1
+        non_empty = sizes > 0
+        weighted[non_empty] = means[last[non_empty]]
+
+        # Weight of old values decays by each following row (or each following observation if nulls are ignored)
+        steps = counts - 1 if ignore_na else np.arange(len(values)) - offsets[:-1][groups]
+        last_steps = nobs - 1 if ignore_na else sizes - 1
+        decays = beta ** (last_steps[groups] - steps).astype(float)
+
+        if adjust:
+            sums = np.bincount(groups[observed], weights=decays[observed], minlength=count)
+            old_wt = np.where(nobs > 0, sums, 1.0)
+        else:
+            last_observed = np.full(count, -1)
+            np.maximum.at(last_observed, groups[observed], np.flatnonzero(observed))
+            has_observed = last_observed >= 0
+            old_wt[has_observed] = decays[last_observed[has_observed]]
+
+    out = np.where(counts >= max(min_periods, 1), means, np.nan)
+
+    return out, (weighted, old_wt, nobs)
+
+
+def ewm_update(values, offsets, state, model) -> tuple:
+    """
+    Continue exponentially weighted mean of each group from its state with new values sorted by group (with start positions of the groups).
+    The work per row does not depend on the number of old rows. Return the means of the new rows and the new state of the groups.
+    """
+    alpha, adjust, ignore_na, min_periods = ewm_options(model)
+    beta = 1.0 - alpha
+    new_wt = 1.0 if adjust else alpha
+
+    values = pd.to_numeric(pd.Series(np.asarray(values)), errors="coerce").astype(float).values
+    weighted, old_wt, nobs = (np.array(x, dtype=float) for x in state)
+
+    out = np.full(len(values), np.nan)
+    for g in range(len(offsets) - 1):
+        w, o, n = weighted[g], old_wt[g], nobs[g]
+        for i in range(offsets[g], offsets[g + 1]):
+            cur = values[i]
+            is_observation = cur == cur
+            n += is_observation
+            if w == w:
+                if is_observation or not ignore_na:
+                    o *= beta
+                    if is_observation:
+                        if w != cur:
+                            w = (o * w + new_wt * cur) / (o + new_wt)
+                        o = o + new_wt if adjust else 1.0
+            elif is_observation:
+                w = cur
+            out[i] = w if n >= max(min_periods, 1) else np.nan
+        weighted[g], old_wt[g], nobs[g] = w, o, n
+
+    return out, (weighted, old_wt, nobs)
+
+
+#
+# Cumulative functions
+#
+
+cumulative_functions = ["sum", "prod", "max", "min", "count", "first"]
+
+
+def is_cumulative_function(func) -> bool:
+    """Determine if the function is a name of a built-in cumulative function."""
+    return isinstance(func, str) and func in cumulative_functions
+
+
+def accumulate_kernel(func, values, offsets, state=None) -> tuple:
+    """
+    Compute the cumulative function of the values sorted by group (with start positions of the groups) in one pass.
+    If the state (last cumulative value of each group or null) is specified, then groups continue from it.
+    Null values get null results (except for count which is the number of non-null values). Return the results and the new state.
+    """
+    values = pd.to_numeric(pd.Series(np.asarray(values)), errors="coerce").astype(float).reset_index(drop=True)
+    sizes = np.diff(offsets)
+    groups = np.repeat(np.arange(len(sizes)), sizes)
+
+    gb = values.groupby(groups, sort=False)
+    if func == "count":
+        out = values.notna().astype(float).groupby(groups, sort=False).cumsum()
+    elif func == "first":
+        seen = values.notna().groupby(groups, sort=False).cumsum() > 0
+        out = gb.transform("first").where(seen)
+    else:
+        out = getattr(gb, "cum" + func)()
+    out = out.values.astype(float)
+
+    if state is not None:
+        old = np.asarray(state, dtype=float)[groups]
+        if func in ("sum", "count"):
+            out = out + np.nan_to_num(old, nan=0.0)
+        elif func == "prod":
+            out = out * np.nan_to_num(old, nan=1.0)
+        elif func == "max":
+            out = np.where(np.isnan(out), np.nan, np.fmax(out, old))
+        elif func == "min":
+            out = np.where(np.isnan(out), np.nan, np.fmin(out, old))
+        elif func == "first":
+            out = np.where(np.isnan(old), out, old)
+
+    # The new state of each group is its last non-null result
+    last = pd.Series(out).groupby(groups, sort=False).last().reindex(np.arange(len(sizes))).values
+    if state is not None:
+        last = np.where(np.isnan(last), np.asarray(state, dtype=float), last)
+
+    return out, last
+
+
+if __name__ == "__main__":
+    pass
@@ -108,5 +108,23 @@ def all_columns_exist(names, df) -> bool:
     return True
 
 
+#
+# Windows
+#
+
+def sliding_windows(values, size) -> np.ndarray:
+    """
+    Return a read-only view of the array with all windows of the specified number of rows (windows x rows x other dimensions).
+    The windows share memory with the array. Strides are used directly (rather than sliding_window_view) to support older numpy versions.
+    """
+    values = np.asarray(values)
+    count = max(len(values) - size + 1, 0)
+
+    shape = (count, size) + values.shape[1:]
+    strides = (values.strides[0], values.strides[0]) + values.strides[1:]
+
+    return np.lib.stride_tricks.as_strided(values, shape=shape, strides=strides, writeable=False)
+
+
 if __name__ == "__main__":
     pass
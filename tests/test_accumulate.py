@@ -0,0 +1,70 @@
+import pytest
+
+from prosto.Prosto import *
+from prosto.column_sql import *
+
+
+def test_accumulate_builtin():
+    ctx = Prosto("My Prosto")
+
+    tbl = ctx.populate(
+        table_name="My table", attributes=["G", "A"],
+        func="lambda **m: pd.DataFrame({'G': [1, 2, 1, 1, 2], 'A': [1.0, 5.0, 3.0, 2.0, 4.0]})", tables=[]
+    )
+
+    ctx.accumulate(
+        name="Sum", table=tbl.id,
+        link=None,
+        func="sum", columns=["A"]
+    )
+    ctx.accumulate(
+        name="Max", table=tbl.id,
+        link="G",
+        func="max", columns=["A"]
+    )
+    ctx.accumulate(
+        name="First", table=tbl.id,
+        link="G",
+        func="first", columns=["A"]
+    )
+
+    ctx.run()
+
+    assert list(tbl.get_series("Sum")) == [1.0, 6.0, 9.0, 11.0, 15.0]
+    assert list(tbl.get_series("Max")) == [1.0, 5.0, 3.0, 3.0, 5.0]
+    assert list(tbl.get_series("First")) == [1.0, 5.0, 1.0, 1.0, 5.0]
+
+
+def test_accumulate_udf():
+    ctx = Prosto("My Prosto")
+
+    tbl = ctx.populate(
+        table_name="My table", attributes=["G", "A", "B"],
+        func="lambda **m: pd.DataFrame({'G': [1, 2, 1, 2], 'A': [1.0, 2.0, 3.0, 4.0], 'B': [1.0, 1.0, 2.0, 2.0]})", tables=[]
+    )
+
+    # Update function gets the previous cumulative value and one row
+    ctx.accumulate(
+        name="Accumulate", table=tbl.id,
+        link="G",
+        func="lambda v, x, w: v + x['A'] * x['B'] * w", columns=["A", "B"], model={"w": 10.0}
+    )
+
+    ctx.run()
+
+    assert list(tbl.get_series("Accumulate")) == [10.0, 20.0, 70.0, 100.0]
+
+
+def test_accumulate_csql():
+    ctx = Prosto("My Prosto")
+
+    df = pd.DataFrame({'A': [1.0, 2.0, 3.0]})
+
+    ctx.column_sql("TABLE  My_table (A)", lambda **m: df)
+    ctx.column_sql("ACCUMULATE  My_table (A) -> new_column FUNC sum")
+
+    assert ctx.get_column("My_table", "new_column")
+
+    ctx.run()
+
+    assert list(ctx.get_table("My_table").get_series('new_column')) == [1.0, 3.0, 6.0]
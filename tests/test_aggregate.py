@@ -145,3 +145,318 @@ def test_aggregate_csql():
     ctx.run()
 
     assert list(ctx.get_table("Groups").get_series('Aggregate')) == [3.0, 7.0, 0.0]
+
+
+def test_group_index():
+    ctx = Prosto("My Prosto")
+
+    f_tbl = ctx.create_table(
+        table_name="Facts", attributes=["G", "M"],
+    )
+    f_tbl.data.add(pd.DataFrame({'G': [1, 2, 1, None], 'M': [1.0, 2.0, 3.0, 4.0]}))
+
+    index = f_tbl.get_group_index("G")
+    assert index.get_sizes().to_dict() == {1: 2, 2: 1}  # Null group values are excluded
+    assert [g.to_list() for k, g in index.get_groups(f_tbl.data.get_full_slice(["M"])["M"])] == [[1.0, 3.0], [2.0]]
+
+    # Appended rows extend the existing groups
+    f_tbl.data.add(pd.DataFrame({'G': [2, 3], 'M': [5.0, 6.0]}))
+    assert f_tbl.get_group_index("G") is index
+    assert index.get_sizes().to_dict() == {1: 2, 2: 2, 3: 1}
+    assert [g.to_list() for k, g in index.get_groups(f_tbl.data.get_full_slice(["M"])["M"])] == [[1.0, 3.0], [2.0, 5.0], [6.0]]
+
+    # Changing old group values rebuilds the index
+    f_tbl.data.set_column_values_for_ids(pd.DataFrame({'G': [3]}, index=[0]))
+    assert f_tbl.get_group_index("G").get_sizes().to_dict() == {3: 2, 2: 2, 1: 1}
+
+
+def test_accumulate():
+    ctx = Prosto("My Prosto")
+
+    f_tbl = ctx.populate(
+        table_name="Facts", attributes=["A", "M"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'a', 'b', 'b'], 'M': [1.0, 2.0, 3.0, 4.0]})", tables=[]
+    )
+
+    g_tbl = ctx.populate(
+        table_name="Groups", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b', 'c']})", tables=[]
+    )
+
+    ctx.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    # Update function gets the current value and one fact value
+    ctx.aggregate(
+        name="Aggregate", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="lambda v, x, bias: v + x + bias", columns=["M"], model={"bias": 1.0},
+        input_length="value"
+    )
+
+    ctx.run()
+
+    assert list(g_tbl.get_series("Aggregate")) == [5.0, 9.0, 0.0]
+
+
+def test_aggregate_kernels():
+    ctx = Prosto("My Prosto")
+
+    f_tbl = ctx.populate(
+        table_name="Facts", attributes=["A", "M"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'a', 'b', 'b', 'd'], 'M': [1.0, 2.0, None, 4.0, 5.0]})", tables=[]
+    )
+
+    g_tbl = ctx.populate(
+        table_name="Groups", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b', 'c']})", tables=[]
+    )
+
+    ctx.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    for func in ["sum", "mean", "count", "min", "max"]:
+        ctx.aggregate(
+            name=func, table=g_tbl.id,
+            tables=["Facts"], link="Link",
+            func=func, columns=["M"]
+        )
+
+    # Without input columns, rows are counted (including rows with null values)
+    ctx.aggregate(
+        name="rows", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="count"
+    )
+
+    ctx.run()
+
+    assert list(g_tbl.get_series("rows")) == [2.0, 2.0, 0.0]
+
+    # Null values are skipped, and groups without facts get the default value
+    assert list(g_tbl.get_series("sum")) == [3.0, 4.0, 0.0]
+    assert list(g_tbl.get_series("mean")) == [1.5, 4.0, 0.0]
+    assert list(g_tbl.get_series("count")) == [2.0, 1.0, 0.0]
+    assert list(g_tbl.get_series("min")) == [1.0, 4.0, 0.0]
+    assert list(g_tbl.get_series("max")) == [2.0, 4.0, 0.0]
+
+
+def test_aggregate_batch():
+    ctx = Prosto("My Prosto")
+
+    f_tbl = ctx.populate(
+        table_name="Facts", attributes=["A", "M", "N"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'a', 'b', 'b'], 'M': [1.0, 2.0, 3.0, 4.0], 'N': [4.0, 3.0, 2.0, 1.0]})", tables=[]
+    )
+
+    g_tbl = ctx.populate(
+        table_name="Groups", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b', 'c']})", tables=[]
+    )
+
+    ctx.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    ctx.aggregate(
+        name="Sum", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="sum", columns=["M"]
+    )
+    ctx.aggregate(
+        name="Max", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="max", columns=["N"]
+    )
+    ctx.aggregate(
+        name="Diff", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="lambda x, bias: x['M'].sum() - x['N'].sum() + bias", columns=["M", "N"], model={"bias": 1.0}
+    )
+
+    ctx.run()
+
+    # All aggregations are fused into one operation
+    layers = ctx.topology.layers
+    assert len(layers[-1]) == 1
+    assert layers[-1][0].get_outputs() == ["Sum", "Max", "Diff"]
+
+    assert list(g_tbl.get_series("Sum")) == [3.0, 7.0, 0.0]
+    assert list(g_tbl.get_series("Max")) == [4.0, 2.0, 0.0]
+    assert list(g_tbl.get_series("Diff")) == [-3.0, 5.0, 0.0]
+
+
+def test_aggregate_shards():
+    ctx = Prosto("My Prosto")
+
+    f_tbl = ctx.populate(
+        table_name="Facts", attributes=["A", "M"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b', 'c'] * 10, 'M': [float(i % 7) for i in range(30)]})", tables=[]
+    )
+
+    g_tbl = ctx.populate(
+        table_name="Groups", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b', 'c', 'd']})", tables=[]
+    )
+
+    ctx.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    # Partial states of aggregators are merged
+    ctx.aggregate(
+        name="Var", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="var", columns=["M"], shards=4
+    )
+    ctx.aggregate(
+        name="Mean", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="mean", columns=["M"], shards=3, executor="process"
+    )
+
+    # Groups are processed by UDF in different threads or processes
+    ctx.aggregate(
+        name="Sum", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="lambda x, bias: x.sum() + bias", columns=["M"], model={"bias": 1.0}, shards=2
+    )
+    ctx.aggregate(
+        name="Sum2", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="lambda x, bias: x.sum() + bias", columns=["M"], model={"bias": 1.0}, shards=2, executor="process"
+    )
+
+    ctx.run()
+
+    df = f_tbl.get_df()
+    expected = df.groupby("A")["M"]
+
+    assert np.allclose(g_tbl.get_series("Var")[:3], expected.var().values)
+    assert g_tbl.get_series("Var")[3] == 0.0  # No facts
+    assert np.allclose(g_tbl.get_series("Mean")[:3], expected.mean().values)
+    assert list(g_tbl.get_series("Sum")) == list(expected.sum().values + 1.0) + [0.0]
+    assert list(g_tbl.get_series("Sum2")) == list(g_tbl.get_series("Sum"))
+
+
+def test_aggregate_sketches():
+    ctx = Prosto("My Prosto")
+
+    f_tbl = ctx.populate(
+        table_name="Facts", attributes=["A", "M", "S"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b'] * 500, 'M': [float(i) for i in range(1000)], 'S': [str(i % 20) if i < 500 else 'x' for i in range(1000)]})", tables=[]
+    )
+
+    g_tbl = ctx.populate(
+        table_name="Groups", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b', 'c']})", tables=[]
+    )
+
+    ctx.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    ctx.aggregate(
+        name="Distinct", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="distinct", columns=["M"], shards=2
+    )
+    ctx.aggregate(
+        name="Median", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="quantile", columns=["M"], model={"q": 0.5, "k": 50}
+    )
+    ctx.aggregate(
+        name="Top", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="top", columns=["S"], model={"k": 1}
+    )
+
+    ctx.run()
+
+    distinct = g_tbl.get_series("Distinct")
+    assert abs(distinct[0] - 500) < 50
+    assert abs(distinct[1] - 500) < 50
+
+    median = g_tbl.get_series("Median")
+    assert abs(median[0] - 500) < 50
+
+    top = g_tbl.get_series("Top")
+    assert list(top[0]) == ['x']
+    assert list(top[1]) == ['x']
+
+
+def test_aggregate_where():
+    ctx = Prosto("My Prosto")
+
+    f_tbl = ctx.populate(
+        table_name="Facts", attributes=["A", "M", "S"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'a', 'b', 'b', 'a'], 'M': [1.0, 2.0, 3.0, 4.0, 5.0], 'S': ['ok', 'no', 'ok', 'ok', 'ok']})", tables=[]
+    )
+
+    g_tbl = ctx.populate(
+        table_name="Groups", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b', 'c']})", tables=[]
+    )
+
+    ctx.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    # Predicate as a boolean column
+    ctx.calculate(
+        name="Big", table=f_tbl.id,
+        func="lambda x: x > 2.0", columns=["M"]
+    )
+
+    # Built-in function and UDF are fused into one operation with different predicates
+    ctx.aggregate(
+        name="Sum", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="sum", columns=["M"], where="S == 'ok'"
+    )
+    ctx.aggregate(
+        name="Max", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="lambda x: x.max()", columns=["M"], where="Big"
+    )
+    ctx.aggregate(
+        name="Acc", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="lambda v, x: v + x", columns=["M"], where="S == 'ok' and M < 5",
+        input_length="value"
+    )
+
+    ctx.run()
+
+    assert list(g_tbl.get_series("Sum")) == [6.0, 7.0, 0.0]
+    assert list(g_tbl.get_series("Max")) == [5.0, 4.0, 0.0]
+    assert list(g_tbl.get_series("Acc")) == [1.0, 7.0, 0.0]
+
+    # Predicate columns are dependencies of the aggregation
+    assert "Big" in ctx.get_column_operations("Groups", "Max")[0].get_dependencies_names()["Facts"]
+
+
+def test_aggregate_where_csql():
+    ctx = Prosto("My Prosto")
+
+    facts_df = pd.DataFrame({'A': ['a', 'a', 'b', 'b'], 'M': [1.0, 2.0, 3.0, 4.0], 'S': ['ok', 'no', 'ok', 'no']})
+    groups_df = pd.DataFrame({'A': ['a', 'b', 'c']})
+
+    ctx.column_sql("TABLE  Facts (A, M, S)", lambda **m: facts_df)
+    ctx.column_sql("TABLE  Groups (A)", lambda **m: groups_df)
+
+    ctx.column_sql("LINK  Facts (A) -> new_column -> Groups (A)")
+    ctx.column_sql("AGGREGATE  Facts (M) -> new_column -> Groups (Aggregate) WHERE S == 'ok' FUNC sum")
+
+    ctx.run()
+
+    assert list(ctx.get_table("Groups").get_series('Aggregate')) == [1.0, 3.0, 0.0]
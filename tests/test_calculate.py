@@ -145,3 +145,105 @@ def test_calc_csql():
     ctx.run()
 
     assert list(ctx.get_table("My_table").get_series('new_column')) == [1.0, 2.0, 3.0]
+
+
+def test_calc_csql_where_function():
+    # Function code with "where" is not treated as a WHERE clause
+    ctx = Prosto("My Prosto")
+
+    ctx.column_sql("TABLE  My_table (A) FUNC lambda **m: pd.DataFrame({'A': [1, 2, 3]})")
+    ctx.column_sql("CALCULATE  My_table (A) -> new_column FUNC lambda x: float(np.where(x > 1, x, 0))")
+
+    ctx.run()
+
+    assert list(ctx.get_table("My_table").get_series('new_column')) == [0.0, 2.0, 3.0]
+
+
+def test_calculate_multiple_outputs():
+    ctx = Prosto("My Prosto")
+
+    tbl = ctx.populate(
+        table_name="My table", attributes=["A", "B"],
+        func="lambda **m: pd.DataFrame({'A': [1, 2, 3], 'B': [3, 2, 1]})", tables=[]
+    )
+
+    # UDF returns a tuple for each row
+    clms = ctx.calculate(
+        name=["Sum", "Diff"], table=tbl.id,
+        func="lambda x: (x['A'] + x['B'], x['A'] - x['B'])", columns=["A", "B"], model=None
+    )
+    assert [x.id for x in clms] == ["Sum", "Diff"]
+
+    # UDF returns a dict for each row with keys equal to the output names (in a different order)
+    clms2 = ctx.calculate(
+        name=["Double", "Square"], table=tbl.id,
+        func="lambda x: {'Square': x * x, 'Double': x + x}", columns=["A"], model=None
+    )
+
+    ctx.run()
+
+    assert tbl.get_series('Sum').to_list() == [4, 4, 4]
+    assert tbl.get_series('Diff').to_list() == [-2, 0, 2]
+    assert tbl.get_series('Double').to_list() == [2, 4, 6]
+    assert tbl.get_series('Square').to_list() == [1, 4, 9]
+
+    #
+    # Test topology: one operation produces several columns in one layer
+    #
+    topology = Topology(ctx)
+    topology.translate()
+    layers = topology.layers
+
+    assert len(layers) == 2
+    assert len(layers[1]) == 2
+    assert set([x.id for x in topology.elem_layers[1]]) == {"Sum", "Diff", "Double", "Square"}
+
+
+def test_compute_multiple_outputs():
+    ctx = Prosto("My Prosto")
+
+    tbl = ctx.populate(
+        table_name="My table", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': [1.0, 2.0, 3.0]})", tables=[]
+    )
+
+    # UDF returns a 2-d array with one column for each output
+    ctx.compute(
+        name=["Next", "Prev"], table=tbl.id,
+        func="lambda x: np.column_stack([x.shift(-1).values, x.shift(1).values])", columns=["A"], model=None
+    )
+
+    # UDF returns a data frame
+    ctx.compute(
+        name=["Min", "Max"], table=tbl.id,
+        func="lambda x, **m: pd.DataFrame({'Max': x.cummax(), 'Min': x.cummin()})", columns=["A"], model={}
+    )
+
+    ctx.run()
+
+    assert tbl.get_series('Next').to_list()[:2] == [2.0, 3.0]
+    assert pd.isna(tbl.get_series('Next')[2])
+    assert pd.isna(tbl.get_series('Prev')[0])
+    assert tbl.get_series('Prev').to_list()[1:] == [1.0, 2.0]
+
+    assert tbl.get_series('Min').to_list() == [1.0, 1.0, 1.0]
+    assert tbl.get_series('Max').to_list() == [1.0, 2.0, 3.0]
+
+
+def test_calc_csql_multiple_outputs():
+    ctx = Prosto("My Prosto")
+
+    df = pd.DataFrame({'A': [1, 2, 3]})
+
+    ctx.column_sql("TABLE  My_table (A)", df)
+    ctx.column_sql("CALCULATE  My_table (A) -> plus, minus", lambda x: (x + 1, x - 1))
+    ctx.column_sql("COMPUTE  My_table (A) -> total", lambda x: x.cumsum())
+
+    assert ctx.get_column("My_table", "plus")
+    assert ctx.get_column("My_table", "minus")
+
+    ctx.run()
+
+    assert list(ctx.get_table("My_table").get_series('plus')) == [2, 3, 4]
+    assert list(ctx.get_table("My_table").get_series('minus')) == [0, 1, 2]
+    assert list(ctx.get_table("My_table").get_series('total')) == [1, 3, 6]
@@ -20,4 +20,15 @@ def test_parser():
     assert func == "func_fn"
     assert args == "{'key': 'value'}"
 
+    # Modifiers are recognized only for links so that tables can have such names
+    table_csql = " TABLE  Interval ( A, B ) "
+    op, entries, func, args, win = parse_column_sql(table_csql)
+    assert op == "TABLE"
+    assert entries == [['Interval', 'A', 'B']]
+
+    link_csql = " LINK ASOF table ( col1 ) -> link -> target ( col2 ) "
+    op, entries, func, args, win = parse_column_sql(link_csql)
+    assert op == "LINK ASOF"
+    assert entries == [['table', 'col1'], ['link'], ['target', 'col2']]
+
     pass
@@ -43,3 +43,75 @@ def test_integers2():
 
     clm_data = tbl.get_series('My column')
     assert list(clm_data) == [-1, -1, 0, 0, 0, 1, 1, 1, 2]
+
+
+def test_bins():
+    ctx = Prosto("My Prosto")
+
+    tbl = ctx.populate(
+        table_name="My table", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': [-1.0, 0.0, 5.0, 10.0, 50.0, None, 100.0, 200.0]})", tables=[]
+    )
+
+    clm = ctx.discretize(
+        name="Number", table=tbl.id,
+        columns=["A"], model={"bins": [0, 10, 100]}
+    )
+    clm = ctx.discretize(
+        name="Border", table=tbl.id,
+        columns=["A"], model={"bins": [0, 10, 100], "closed": "right", "label": "right", "label_value": "border"}
+    )
+
+    ctx.run()
+
+    assert list(tbl.get_series('Number').fillna(-9)) == [-1, 0, 0, 1, 1, -9, 2, 2]
+    assert list(tbl.get_series('Border').fillna(-9)) == [0, 0, 10, 10, 100, -9, 100, -9]
+
+
+def test_timestamps():
+    ctx = Prosto("My Prosto")
+
+    tbl = ctx.populate(
+        table_name="My table", attributes=["T"],
+        func="lambda **m: pd.DataFrame({'T': pd.to_datetime(['2020-01-01 00:00', '2020-01-01 00:30', '2020-01-01 01:00', '2020-01-01 02:59'])})", tables=[]
+    )
+
+    clm = ctx.discretize(
+        name="Hour", table=tbl.id,
+        columns=["T"], model={"step": "1h", "label_value": "border"}
+    )
+    clm = ctx.discretize(
+        name="Number", table=tbl.id,
+        columns=["T"], model={"origin": "2020-01-01", "step": "1h"}
+    )
+
+    ctx.run()
+
+    assert pd.api.types.is_datetime64_any_dtype(tbl.get_series('Hour'))
+    assert list(tbl.get_series('Hour')) == [pd.Timestamp('2020-01-01 00:00'), pd.Timestamp('2020-01-01 00:00'), pd.Timestamp('2020-01-01 01:00'), pd.Timestamp('2020-01-01 02:00')]
+    assert list(tbl.get_series('Number')) == [0, 0, 1, 2]
+
+
+def test_bucket():
+    ctx = Prosto("My Prosto")
+
+    tbl = ctx.populate(
+        table_name="Facts", attributes=["A", "M"],
+        func="lambda **m: pd.DataFrame({'A': [1.0, 2.0, 7.0, 12.0, None, 3.0], 'M': [1, 2, 3, 4, 5, 6]})", tables=[]
+    )
+
+    ctx.column_sql("BUCKET Facts (A) -> Bucket -> Buckets (Start)", args={"step": 5, "label_value": "border"})
+
+    ctx.aggregate(
+        name="Total", table="Buckets",
+        tables=["Facts"], link="Bucket",
+        func="sum", columns=["M"], model={}
+    )
+
+    ctx.run()
+
+    buckets = ctx.get_table("Buckets")
+    assert list(buckets.get_series("Start")) == [0, 5, 10]
+    assert list(buckets.get_series("Total")) == [9, 3, 4]
+
+    assert list(tbl.get_series("Bucket").fillna(-1)) == [0, 0, 1, 2, -1, 0]
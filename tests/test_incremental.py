@@ -67,3 +67,491 @@ def test_calculate_value():
     assert tbl.data.added_range.end == 3
     assert tbl.data.removed_range.start == 3
     assert tbl.data.removed_range.end == 3
+
+
+def test_link_incremental():
+    ctx = Prosto("My Prosto")
+    ctx.incremental = True
+
+    f_tbl = ctx.create_table(
+        table_name="Facts", attributes=["A"],
+    )
+    g_tbl = ctx.create_table(
+        table_name="Groups", attributes=["A"],
+    )
+
+    l_clm = ctx.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    g_tbl.data.add(pd.DataFrame({'A': ['a', 'b']}))
+    f_tbl.data.add(pd.DataFrame({'A': ['a', 'b', 'c']}))
+
+    ctx.run()
+
+    l_data = f_tbl.get_series("Link")
+    assert l_data[0] == 0
+    assert l_data[1] == 1
+    assert pd.isna(l_data[2])
+
+    # Only added rows are linked. Old rows are not linked again because the target table has not changed
+    f_tbl.get_df()['A'][0] = 'b'  # Prosto does not see this change
+    f_tbl.data.add({'A': 'b'})
+
+    ctx.run()
+
+    l_data = f_tbl.get_series("Link")
+    assert l_data[0] == 0
+    assert l_data[3] == 1
+    assert pd.isna(l_data[2])
+
+    # New target rows are used to link old rows which have not been linked before
+    g_tbl.data.add({'A': 'c'})
+
+    ctx.run()
+
+    l_data = f_tbl.get_series("Link")
+    assert l_data[0] == 0
+    assert l_data[2] == 2
+
+    # Links to removed target rows are linked again (the first fact now has key 'b')
+    g_tbl.data.remove(1)  # Oldest target row 'a' is removed
+
+    ctx.run()
+
+    l_data = f_tbl.get_series("Link")
+    assert l_data[0] == 1
+    assert l_data[1] == 1
+    assert l_data[2] == 2
+
+
+def test_link_rewritten_incremental():
+    ctx = Prosto("My Prosto")
+    ctx.incremental = True
+
+    g_tbl = ctx.create_table(
+        table_name="G", attributes=["A"],
+    )
+    h_tbl = ctx.create_table(
+        table_name="H", attributes=["B"],
+    )
+    f_tbl = ctx.create_table(
+        table_name="F", attributes=["GID"],
+    )
+
+    # Facts are linked using the target link column which is rewritten when its own target changes
+    ctx.link(
+        name="HL", table=h_tbl.id, type=g_tbl.id,
+        columns=["B"], linked_columns=["A"]
+    )
+    ctx.link(
+        name="Link", table=f_tbl.id, type=h_tbl.id,
+        columns=["GID"], linked_columns=["HL"]
+    )
+
+    h_tbl.data.add(pd.DataFrame({'B': ['x']}))
+    f_tbl.data.add(pd.DataFrame({'GID': [0.0]}))
+
+    ctx.run()
+
+    assert pd.isna(h_tbl.get_series("HL")[0])
+    assert pd.isna(f_tbl.get_series("Link")[0])
+
+    g_tbl.data.add(pd.DataFrame({'A': ['x']}))
+
+    ctx.run()
+
+    assert h_tbl.get_series("HL")[0] == 0
+    assert f_tbl.get_series("Link")[0] == 0
+
+
+def test_accumulate_incremental():
+    ctx = Prosto("My Prosto")
+    ctx.incremental = True
+
+    f_tbl = ctx.create_table(
+        table_name="Facts", attributes=["A", "M"],
+    )
+    g_tbl = ctx.create_table(
+        table_name="Groups", attributes=["A"],
+    )
+
+    l_clm = ctx.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    a_clm = ctx.aggregate(
+        name="Sum", table=g_tbl.id,
+        tables=[f_tbl.id], link="Link",
+        func="lambda v, x: v + x", retract="lambda v, x: v - x", columns=["M"], model=None,
+        input_length="value"
+    )
+
+    g_tbl.data.add(pd.DataFrame({'A': ['a', 'b']}))
+    f_tbl.data.add(pd.DataFrame({'A': ['a', 'b', 'a'], 'M': [1.0, 2.0, 3.0]}))
+
+    ctx.run()
+
+    assert list(g_tbl.get_series("Sum")) == [4.0, 2.0]
+
+    # Only added facts are folded into the existing values (an old fact is changed but Prosto does not see it)
+    f_tbl.get_df()['M'][0] = 10.0
+    f_tbl.data.add(pd.DataFrame({'A': ['b', 'c'], 'M': [5.0, 6.0]}))
+    g_tbl.data.add({'A': 'c'})
+
+    ctx.run()
+
+    assert list(g_tbl.get_series("Sum")) == [4.0, 7.0, 6.0]
+
+    # Removed facts are retracted (the old fact has value 10 now)
+    f_tbl.data.remove(1)
+
+    ctx.run()
+
+    assert list(g_tbl.get_series("Sum")) == [-6.0, 7.0, 6.0]
+
+    # Groups without facts start from the initial value (rather than from the default output value)
+    ctx = Prosto("My Prosto")
+    ctx.incremental = True
+
+    f_tbl = ctx.create_table(
+        table_name="Facts", attributes=["A", "M"],
+    )
+    g_tbl = ctx.create_table(
+        table_name="Groups", attributes=["A"],
+    )
+
+    l_clm = ctx.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    a_clm = ctx.aggregate(
+        name="Product", table=g_tbl.id,
+        tables=[f_tbl.id], link="Link",
+        func="lambda v, x: v * x", columns=["M"], model=None,
+        input_length="value", initial_value=1.0
+    )
+
+    g_tbl.data.add(pd.DataFrame({'A': ['a', 'b']}))
+    f_tbl.data.add(pd.DataFrame({'A': ['a'], 'M': [2.0]}))
+
+    ctx.run()
+
+    assert list(g_tbl.get_series("Product")) == [2.0, 0.0]
+
+    f_tbl.data.add(pd.DataFrame({'A': ['b'], 'M': [5.0]}))
+
+    ctx.run()
+
+    assert list(g_tbl.get_series("Product")) == [2.0, 5.0]
+
+
+def test_aggregate_state_incremental():
+    ctx = Prosto("My Prosto")
+    ctx.incremental = True
+
+    f_tbl = ctx.create_table(
+        table_name="Facts", attributes=["A", "M"],
+    )
+    g_tbl = ctx.create_table(
+        table_name="Groups", attributes=["A"],
+    )
+
+    ctx.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    ctx.aggregate(
+        name="Distinct", table=g_tbl.id,
+        tables=[f_tbl.id], link="Link",
+        func="distinct", columns=["M"]
+    )
+
+    g_tbl.data.add(pd.DataFrame({'A': ['a', 'b']}))
+    f_tbl.data.add(pd.DataFrame({'A': ['a', 'b', 'a'], 'M': [1, 2, 3]}))
+
+    ctx.run()
+
+    assert list(g_tbl.get_series("Distinct").round()) == [2.0, 1.0]
+
+    # Only new facts are added to the stored sketches (an old fact is changed but Prosto does not see it)
+    f_tbl.get_df()['M'][0] = 10
+    f_tbl.data.add(pd.DataFrame({'A': ['a', 'b', 'c'], 'M': [1, 4, 5]}))
+    g_tbl.data.add({'A': 'c'})
+
+    ctx.run()
+
+    assert list(g_tbl.get_series("Distinct").round()) == [2.0, 2.0, 1.0]
+
+    # Removed facts cannot be subtracted from sketches so all facts are aggregated again
+    f_tbl.data.remove(1)
+
+    ctx.run()
+
+    assert list(g_tbl.get_series("Distinct").round()) == [2.0, 2.0, 1.0]
+
+
+def test_roll_incremental():
+    ctx = Prosto("My Prosto")
+    ctx.incremental = True
+
+    tbl = ctx.create_table(
+        table_name="My table", attributes=["G", "A"],
+    )
+
+    ctx.roll(
+        name="Roll", table=tbl.id,
+        window="2", link=None,
+        func="lambda x: x.sum()", columns=["A"], model={}
+    )
+    ctx.roll(
+        name="Group Roll", table=tbl.id,
+        window="2", link="G",
+        func="lambda x: x['A'].sum() + x['G'].sum()", columns=["G", "A"], model={}
+    )
+
+    tbl.data.add(pd.DataFrame({'G': [1, 2, 1], 'A': [1.0, 2.0, 3.0]}))
+
+    ctx.run()
+
+    assert list(tbl.get_series("Roll").fillna(-1)) == [-1, 3.0, 5.0]
+    assert list(tbl.get_series("Group Roll").fillna(-1)) == [-1, -1, 6.0]
+
+    # Only windows of added rows are computed (an old row outside these windows is changed but Prosto does not see it)
+    tbl.get_df()['A'][0] = 10.0
+    tbl.data.add(pd.DataFrame({'G': [2, 1], 'A': [4.0, 5.0]}))
+
+    ctx.run()
+
+    assert list(tbl.get_series("Roll").fillna(-1)) == [-1, 3.0, 5.0, 7.0, 9.0]
+    assert list(tbl.get_series("Group Roll").fillna(-1)) == [-1, -1, 6.0, 10.0, 10.0]
+
+
+def test_roll_time_incremental():
+    ctx = Prosto("My Prosto")
+    ctx.incremental = True
+
+    tbl = ctx.create_table(
+        table_name="My table", attributes=["G", "T", "A"],
+    )
+
+    ctx.roll(
+        name="Roll", table=tbl.id,
+        window="10min", link="G",
+        func="lambda x: x.sum()", columns=["A"],
+        on="T"
+    )
+
+    tbl.data.add(pd.DataFrame({'G': [1, 2, 1], 'T': pd.to_datetime(["2021-01-01 00:00", "2021-01-01 00:01", "2021-01-01 00:05"]), 'A': [1.0, 2.0, 3.0]}))
+
+    ctx.run()
+
+    assert list(tbl.get_series("Roll")) == [1.0, 2.0, 4.0]
+
+    # Only windows of added rows are computed from the rows of the last 10 minutes (in the same group)
+    tbl.get_df()['A'][1] = 20.0
+    tbl.data.add(pd.DataFrame({'G': [1, 2], 'T': pd.to_datetime(["2021-01-01 00:12", "2021-01-01 00:20"]), 'A': [4.0, 5.0]}))
+
+    ctx.run()
+
+    assert list(tbl.get_series("Roll")) == [1.0, 2.0, 4.0, 7.0, 5.0]
+
+
+def test_roll_ewm_incremental():
+    ctx = Prosto("My Prosto")
+    ctx.incremental = True
+
+    tbl = ctx.create_table(
+        table_name="My table", attributes=["G", "A"],
+    )
+
+    ctx.roll(
+        name="Mean", table=tbl.id,
+        window=None, link="G",
+        func="ewm", columns=["A"], model={"alpha": 0.5, "adjust": False}
+    )
+
+    tbl.data.add(pd.DataFrame({'G': [1, 2, 1], 'A': [1.0, 2.0, 3.0]}))
+
+    ctx.run()
+
+    assert list(tbl.get_series("Mean")) == [1.0, 2.0, 2.0]
+
+    # Added rows continue the state of their groups (an old row is changed but Prosto does not see it)
+    tbl.get_df()['A'][0] = 10.0
+    tbl.data.add(pd.DataFrame({'G': [1, 3, 2], 'A': [4.0, 5.0, 4.0]}))
+
+    ctx.run()
+
+    assert list(tbl.get_series("Mean")) == [1.0, 2.0, 2.0, 3.0, 5.0, 3.0]
+
+
+def test_roll_ewm_empty_incremental():
+    ctx = Prosto("My Prosto")
+    ctx.incremental = True
+
+    tbl = ctx.create_table(
+        table_name="My table", attributes=["G", "A"],
+    )
+
+    ctx.roll(
+        name="Mean", table=tbl.id,
+        window=None, link="G",
+        func="ewm", columns=["A"], model={"alpha": 0.5, "adjust": False}
+    )
+
+    ctx.run()  # Inference on empty data
+
+    tbl.data.add(pd.DataFrame({'G': [1, 2, 1], 'A': [1.0, 2.0, 3.0]}))
+
+    ctx.run()
+
+    assert list(tbl.get_series("Mean")) == [1.0, 2.0, 2.0]
+
+    tbl.data.add(pd.DataFrame({'G': [2], 'A': [4.0]}))
+
+    ctx.run()
+
+    assert list(tbl.get_series("Mean")) == [1.0, 2.0, 2.0, 3.0]
+
+
+def test_cumulative_incremental():
+    ctx = Prosto("My Prosto")
+    ctx.incremental = True
+
+    tbl = ctx.create_table(
+        table_name="My table", attributes=["G", "A"],
+    )
+
+    ctx.accumulate(
+        name="Sum", table=tbl.id,
+        link="G",
+        func="sum", columns=["A"]
+    )
+    ctx.accumulate(
+        name="Count", table=tbl.id,
+        link="G",
+        func="lambda v, x: v + 1", columns=["A"]
+    )
+
+    tbl.data.add(pd.DataFrame({'G': [1, 2, 1], 'A': [1.0, 2.0, 3.0]}))
+
+    ctx.run()
+
+    assert list(tbl.get_series("Sum")) == [1.0, 2.0, 4.0]
+
+    # Added rows continue from the last values of their groups (an old row is changed but Prosto does not see it)
+    tbl.get_df()['A'][0] = 10.0
+    tbl.data.add(pd.DataFrame({'G': [1, 3, 2], 'A': [4.0, 5.0, 6.0]}))
+
+    ctx.run()
+
+    assert list(tbl.get_series("Sum")) == [1.0, 2.0, 4.0, 8.0, 5.0, 8.0]
+    assert list(tbl.get_series("Count")) == [1.0, 1.0, 2.0, 3.0, 1.0, 2.0]
+
+
+def test_bucket_incremental():
+    ctx = Prosto("My Prosto")
+    ctx.incremental = True
+
+    tbl = ctx.create_table(
+        table_name="Facts", attributes=["A"],
+    )
+
+    clm = ctx.bucket(
+        name="Bucket", table=tbl.id, type="Buckets",
+        columns=["A"], model={"step": 10}
+    )
+
+    tbl.data.add(pd.DataFrame({"A": [1, 15, 3]}))
+    ctx.run()
+
+    buckets = ctx.get_table("Buckets")
+    assert list(buckets.get_series("A")) == [0, 1]
+    assert list(tbl.get_series("Bucket")) == [0, 1, 0]
+
+    # Only the unseen bucket is appended and old buckets retain their ids
+    tbl.data.add(pd.DataFrame({"A": [12, 25]}))
+    ctx.run()
+
+    assert list(buckets.get_series("A")) == [0, 1, 2]
+    assert buckets.data.id_range().start == 0
+    assert list(tbl.get_series("Bucket")) == [0, 1, 0, 1, 2]
+
+
+def test_product_incremental():
+    ctx = Prosto("My Prosto")
+    ctx.incremental = True
+
+    t1 = ctx.create_table(
+        table_name="Table 1", attributes=["A"],
+    )
+    t2 = ctx.create_table(
+        table_name="Table 2", attributes=["B"],
+    )
+
+    product = ctx.product(
+        table_name="Product", attributes=["t1", "t2"],
+        tables=["Table 1", "Table 2"]
+    )
+
+    t1.data.add(pd.DataFrame({"A": [1.0, 2.0]}))
+    t2.data.add(pd.DataFrame({"B": ["x", "y"]}))
+    ctx.run()
+
+    assert product.data.id_range() == Range(0, 4)
+
+    # Only combinations with the new row are appended
+    t2.data.add(pd.DataFrame({"B": ["z"]}))
+    ctx.run()
+
+    assert product.data.id_range() == Range(0, 6)
+    assert list(zip(product.get_series("t1"), product.get_series("t2"))) == [(0, 0), (0, 1), (1, 0), (1, 1), (0, 2), (1, 2)]
+
+    # Combinations with the removed row are retracted
+    t1.data.remove(1)
+    t1.data.add(pd.DataFrame({"A": [3.0]}))
+    ctx.run()
+
+    rows = product.data.get_full_slice(["t1", "t2"])
+    assert sorted(zip(rows["t1"], rows["t2"])) == [(1, 0), (1, 1), (1, 2), (2, 0), (2, 1), (2, 2)]
+
+
+def test_cumulative_empty_incremental():
+    ctx = Prosto("My Prosto")
+    ctx.incremental = True
+
+    tbl = ctx.create_table(
+        table_name="My table", attributes=["G", "A"],
+    )
+
+    ctx.accumulate(
+        name="Sum", table=tbl.id,
+        link="G",
+        func="sum", columns=["A"]
+    )
+    ctx.accumulate(
+        name="Product", table=tbl.id,
+        link="G",
+        func="lambda v, x: v * x", columns=["A"], initial_value=1.0
+    )
+
+    ctx.run()  # Inference on empty data
+
+    tbl.data.add(pd.DataFrame({'G': [1, 2, 1], 'A': [2.0, 3.0, 4.0]}))
+
+    ctx.run()
+
+    assert list(tbl.get_series("Sum")) == [2.0, 3.0, 6.0]
+    assert list(tbl.get_series("Product")) == [2.0, 3.0, 8.0]
+
+    tbl.data.add(pd.DataFrame({'G': [2, 3], 'A': [5.0, 6.0]}))
+
+    ctx.run()
+
+    assert list(tbl.get_series("Sum")) == [2.0, 3.0, 6.0, 8.0, 6.0]
+    assert list(tbl.get_series("Product")) == [2.0, 3.0, 8.0, 15.0, 6.0]
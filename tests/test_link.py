@@ -127,3 +127,169 @@ def test_link_csql():
     ctx.run()
 
     assert list(ctx.get_table("Facts").get_series('new_column')) == [0, 0, 1, 1]
+
+
+def test_key_index():
+    ctx = Prosto("My Prosto")
+
+    g_tbl = ctx.create_table(
+        table_name="Groups", attributes=["A", "B"],
+    )
+    g_tbl.data.add(pd.DataFrame({'A': ['a', 'b', 'a'], 'B': [1, 2, 1]}))
+
+    # Duplicate keys are mapped to the first row
+    index = g_tbl.get_key_index(["A", "B"])
+    out = index.probe(pd.DataFrame({'X': ['b', 'a', 'c'], 'Y': [2, 1, 1]}))
+    assert out[0] == 1
+    assert out[1] == 0
+    assert pd.isna(out[2])
+
+    # The index is reused and extended with added rows
+    g_tbl.data.add({'A': 'c', 'B': 1})
+    assert g_tbl.get_key_index(["A", "B"]) is index
+
+    out = index.probe(pd.DataFrame({'X': ['c'], 'Y': [1]}))
+    assert out[0] == 3
+
+    # Removed rows disappear from the index and their duplicates become visible
+    g_tbl.data.remove(1)
+    g_tbl.get_key_index(["A", "B"])
+
+    out = index.probe(pd.DataFrame({'X': ['a', 'b'], 'Y': [1, 2]}))
+    assert out[0] == 2
+    assert out[1] == 1
+
+    # Rewritten keys of old rows are indexed again
+    g_tbl.data.set_column_values_for_ids(pd.DataFrame({'A': ['d'], 'B': [5]}, index=[2]))
+    g_tbl.get_key_index(["A", "B"])
+
+    out = index.probe(pd.DataFrame({'X': ['d', 'a', 'c'], 'Y': [5, 1, 1]}))
+    assert out[0] == 2
+    assert pd.isna(out[1])
+    assert out[2] == 3
+
+    # The table frame is not modified by indexing
+    assert g_tbl.get_df().columns.to_list() == ["A", "B"]
+
+
+def test_link_asof():
+    ctx = Prosto("My Prosto")
+
+    # Facts
+    f_tbl = ctx.populate(
+        table_name="Facts", attributes=["A", "T"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'a', 'b', 'b', 'c'], 'T': [5, 1, 3, 10, 5]})", tables=[]
+    )
+
+    # Quotes (not sorted)
+    q_tbl = ctx.populate(
+        table_name="Quotes", attributes=["A", "T"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b', 'a', 'b'], 'T': [4, 2, 2, 7]})", tables=[]
+    )
+
+    # Interval
+    i_tbl = ctx.populate(
+        table_name="Intervals", attributes=["Start", "End"],
+        func="lambda **m: pd.DataFrame({'Start': [0, 4], 'End': [2, 8]})", tables=[]
+    )
+
+    ctx.link(
+        name="Quote", table=f_tbl.id, type=q_tbl.id,
+        columns=["A", "T"], linked_columns=["A", "T"], match="asof"
+    )
+    ctx.link(
+        name="Interval", table=f_tbl.id, type=i_tbl.id,
+        columns=["T"], linked_columns=["Start", "End"], match="interval"
+    )
+
+    ctx.run()
+
+    l_data = f_tbl.get_series("Quote")
+    assert l_data[0] == 0  # Last quote with T <= 5 for 'a'
+    assert pd.isna(l_data[1])  # No earlier quote
+    assert l_data[2] == 1
+    assert l_data[3] == 3
+    assert pd.isna(l_data[4])  # No such partition
+
+    i_data = f_tbl.get_series("Interval")
+    assert i_data[0] == 1
+    assert i_data[1] == 0
+    assert pd.isna(i_data[2])  # Between intervals
+    assert pd.isna(i_data[3])  # After the last interval
+    assert i_data[4] == 1
+
+
+def test_link_interval_overlap():
+    ctx = Prosto("My Prosto")
+
+    f_tbl = ctx.populate(
+        table_name="Facts", attributes=["T"],
+        func="lambda **m: pd.DataFrame({'T': [5, 2.5, 1, 12, 13]})", tables=[]
+    )
+
+    # Nested intervals [0, 10) and [2, 3) and one more interval [11, 14) overlapping with [12, 13)
+    i_tbl = ctx.populate(
+        table_name="Intervals", attributes=["Start", "End"],
+        func="lambda **m: pd.DataFrame({'Start': [0, 2, 11, 12], 'End': [10, 3, 14, 13]})", tables=[]
+    )
+
+    ctx.link(
+        name="Interval", table=f_tbl.id, type=i_tbl.id,
+        columns=["T"], linked_columns=["Start", "End"], match="interval"
+    )
+
+    ctx.run()
+
+    i_data = f_tbl.get_series("Interval")
+    assert i_data[0] == 0  # Inside the outer interval only
+    assert i_data[1] == 1  # Inside both intervals
+    assert i_data[2] == 0
+    assert i_data[3] == 3
+    assert i_data[4] == 2  # The inner interval ends before the value
+
+
+def test_link_asof_csql():
+    ctx = Prosto("My Prosto")
+
+    facts_df = pd.DataFrame({'T': [1.5, 3.0, 0.5]})
+    quotes_df = pd.DataFrame({'T': [1.0, 2.0, 3.0]})
+
+    ctx.column_sql("TABLE  Facts (T)", lambda **m: facts_df)
+    ctx.column_sql("TABLE  Quotes (T)", lambda **m: quotes_df)
+    ctx.column_sql("LINK ASOF  Facts (T) -> new_column -> Quotes (T)")
+
+    assert ctx.get_column_operations("Facts", "new_column")[0].definition.get("match") == "asof"
+
+    ctx.run()
+
+    l_data = ctx.get_table("Facts").get_series('new_column')
+    assert l_data[0] == 0
+    assert l_data[1] == 2
+    assert pd.isna(l_data[2])
+
+
+def test_key_encoder():
+    encoder = KeyEncoder(2)
+
+    keys = encoder.encode(pd.DataFrame({'A': ['a', 'b', 'a'], 'B': [1, 1, 1]}))
+    assert keys[0] == keys[2]
+    assert keys[0] != keys[1]
+
+    # Many new values change the layout and the stored codes have to be combined again
+    layout_no = encoder.layout_no
+    codes = encoder.encode_columns(pd.DataFrame({'A': ['a'], 'B': [1]}))
+    encoder.encode(pd.DataFrame({'A': [str(i) for i in range(1000)], 'B': list(range(1000))}))
+    assert encoder.layout_no > layout_no
+    assert encoder.encode(pd.DataFrame({'A': ['a'], 'B': [1]}))[0] == encoder.combine(codes)[0]
+
+    # Unknown values are not added and they do not match known keys
+    keys = encoder.encode(pd.DataFrame({'A': ['a', 'x'], 'B': [1, 1]}), extend=False)
+    assert keys[0] == encoder.combine(codes)[0]
+    assert keys[1] not in set(encoder.encode(pd.DataFrame({'A': ['a', 'b'], 'B': [1, 1]})))
+    assert len(encoder.levels[0]) == 1002  # a, b and 1000 numbers
+
+    # Key columns which do not fit into 62 bits are combined into a multi-index of codes
+    encoder.bits = [40, 40]
+    keys = encoder.encode(pd.DataFrame({'A': ['a', 'b', 'a'], 'B': [1, 1, 1]}))
+    assert isinstance(keys, pd.MultiIndex)
+    assert keys[0] == keys[2]
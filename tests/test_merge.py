@@ -176,3 +176,87 @@ def test_merge_path2():
 
     m_data = f_tbl.get_series("Merge")
     assert m_data.to_list() == ['x', 'x', 'y', 'y']
+
+
+def test_merge_offset():
+    """Merge has to find target values by position for link values which do not start from 0 and can be null."""
+    ctx = Prosto("My Prosto")
+
+    f_tbl = ctx.create_table(
+        table_name="Facts", attributes=["A"],
+    )
+    g_tbl = ctx.create_table(
+        table_name="Groups", attributes=["A", "B"],
+    )
+
+    l_clm = ctx.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+    m_clm = ctx.merge("Merge", f_tbl.id, ["Link::B"])
+
+    f_tbl.data.add(pd.DataFrame({'A': ['a', 'b', 'c', 'b']}))
+    g_tbl.data.add(pd.DataFrame({'A': ['x', 'y', 'b', 'a'], 'B': [1, 2, 3, 4]}))
+
+    # Physically delete the first target rows so that row ids are different from positions
+    g_tbl.data.remove(2)
+    g_tbl.data.clear_change_status()
+    g_tbl.data.gc()
+    assert g_tbl.data._get_start_offset() == 2
+
+    ctx.run()
+
+    assert f_tbl.get_series("Link").to_list()[:2] == [3, 2]
+
+    m_data = f_tbl.get_series("Merge")
+    assert m_data[0] == 4
+    assert m_data[1] == 3
+    assert pd.isna(m_data[2])
+    assert m_data[3] == 3
+
+
+def test_merge_shared_path():
+    """Several merge operations share one link path prefix which is composed only once and then reused."""
+    ctx = Prosto("My Prosto")
+
+    f_tbl = ctx.populate(
+        table_name="Facts", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'a', 'b', 'c']})", tables=[]
+    )
+    g_tbl = ctx.populate(
+        table_name="Groups", attributes=["A", "B"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b', 'c'], 'B': [2.0, 3.0, 5.0]})", tables=[]
+    )
+    ctx.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+    sg_tbl = ctx.populate(
+        table_name="SuperGroups", attributes=["B", "C", "D"],
+        func="lambda **m: pd.DataFrame({'B': [2.0, 3.0, 4.0], 'C': ['x', 'y', 'z'], 'D': [1, 2, 3]})", tables=[]
+    )
+    ctx.link(
+        name="SuperLink", table=g_tbl.id, type=sg_tbl.id,
+        columns=["B"], linked_columns=["B"]
+    )
+
+    ctx.merge("Merge C", f_tbl.id, ["Link::SuperLink::C"])
+    ctx.merge("Merge D", f_tbl.id, ["Link::SuperLink::D"])
+
+    ctx.run()
+
+    assert f_tbl.shared_link_paths == {("Link", "SuperLink")}
+    assert list(f_tbl.link_path_ids.keys()) == [("Link", "SuperLink")]
+
+    assert f_tbl.get_series("Merge C").to_list()[:3] == ['x', 'x', 'y']
+    assert pd.isna(f_tbl.get_series("Merge C")[3])
+    assert f_tbl.get_series("Merge D").to_list()[:3] == [1, 1, 2]
+    assert pd.isna(f_tbl.get_series("Merge D")[3])
+
+    # Cached ids are not used if a link in the path changes
+    cached = f_tbl.link_path_ids[("Link", "SuperLink")]
+    g_tbl.data.set_column_values_for_ids(pd.DataFrame({"SuperLink": [2]}, index=[2]))
+    ctx.get_column_operations(f_tbl.id, "Merge D")[0].evaluate()
+
+    assert f_tbl.link_path_ids[("Link", "SuperLink")] is not cached
+    assert f_tbl.get_series("Merge D").to_list() == [1, 1, 2, 3]
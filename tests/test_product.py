@@ -90,3 +90,28 @@ def test_product_csql():
     assert len(product.get_df()) == 9
 
     assert product.get_df().columns.to_list() == ["t1", "t2"]
+
+
+def test_product_order():
+    ctx = Prosto("My Prosto")
+
+    t1 = ctx.populate(
+        table_name="Table 1", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': [1.0, 2.0]})", tables=[]
+    )
+
+    t2 = ctx.populate(
+        table_name="Table 2", attributes=["B"],
+        func="lambda **m: pd.DataFrame({'B': ['x', 'y', 'z']})", tables=[]
+    )
+
+    product = ctx.product(
+        table_name="Product", attributes=["t1", "t2"],
+        tables=["Table 1", "Table 2"]
+    )
+
+    ctx.run()
+
+    # The last table changes fastest
+    assert product.get_series("t1").to_list() == [0, 0, 0, 1, 1, 1]
+    assert product.get_series("t2").to_list() == [0, 1, 2, 0, 1, 2]
@@ -130,3 +130,30 @@ def test_csql_project():
     assert len(ctx.get_table("Groups").get_df()) == 2
     assert len(ctx.get_table("Groups").get_df().columns) == 1
     assert list(ctx.get_table("Facts").get_series('new_column')) == [0, 0, 1, 1]
+
+
+def test_project_shared_encoder():
+    ctx = Prosto("My Prosto")
+
+    f_tbl = ctx.populate(
+        table_name="Facts", attributes=["A", "B"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b', 'a', 'b'], 'B': [1, 1, 1, 2]})", tables=[]
+    )
+
+    g_tbl = ctx.project(
+        table_name="Groups", attributes=["X", "Y"],
+        tables=["Facts"], columns=["A", "B"]
+    )
+
+    ctx.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A", "B"], linked_columns=["X", "Y"]
+    )
+
+    ctx.run()
+
+    assert g_tbl.get_df().values.tolist() == [['a', 1], ['b', 1], ['b', 2]]
+    assert list(f_tbl.get_series("Link")) == [0, 1, 0, 2]
+
+    # Projected table encodes its attributes with the encoder of the source keys
+    assert g_tbl.get_key_encoder(["X", "Y"]) is f_tbl.get_key_encoder(["A", "B"])
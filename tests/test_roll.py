@@ -133,3 +133,138 @@ def test_roll_csql():
     ctx.run()
 
     assert list(ctx.get_table("My_table").get_series('new_column')) == [None, 3.0, 5.0]
+
+
+def test_roll_window_views():
+    ctx = Prosto("My Prosto")
+
+    tbl = ctx.populate(
+        table_name="My table", attributes=["A", "B"],
+        func="lambda **m: pd.DataFrame({'A': [1.0, 2.0, 3.0, 4.0], 'B': [4.0, 3.0, 2.0, 1.0]})", tables=[]
+    )
+
+    # Each window is an array (rows, columns)
+    ctx.roll(
+        name="Array", table=tbl.id,
+        window="3", link=None,
+        func="lambda x, w: (x[:, 0] * w).sum() - x[:, 1].sum()", columns=["A", "B"], model={"w": 2.0},
+        data_type="ndarray"
+    )
+
+    # All windows are one array (windows, rows, columns)
+    ctx.roll(
+        name="Tensor", table=tbl.id,
+        window="3", link=None,
+        func="lambda x: x[:, :, 0].max(axis=1) + x[:, :, 1].min(axis=1)", columns=["A", "B"],
+        data_type="tensor"
+    )
+
+    ctx.run()
+
+    assert list(tbl.get_series("Array").fillna(-1)) == [-1, -1, 3.0, 12.0]
+    assert list(tbl.get_series("Tensor").fillna(-1)) == [-1, -1, 5.0, 5.0]
+
+
+def test_groll_vectorized():
+    ctx = Prosto("My Prosto")
+
+    tbl = ctx.populate(
+        table_name="My table", attributes=["G", "A", "B"],
+        func="lambda **m: pd.DataFrame({'G': [1, 2, 1, 1, 2, None, 2], 'A': [1, 2, 3, 4, 5, 6, 7], 'B': [1, 1, 1, 1, 1, 1, 1]})", tables=[]
+    )
+
+    # Single column with model
+    ctx.roll(
+        name="Roll", table=tbl.id,
+        window="2", link="G",
+        func="lambda x, bias: x.sum() + bias", columns=["A"], model={"bias": 10.0}
+    )
+
+    # All windows of all groups are passed to UDF at once (windows crossing groups are excluded)
+    ctx.roll(
+        name="Tensor", table=tbl.id,
+        window="2", link="G",
+        func="lambda x: x[:, :, 0].sum(axis=1) - x[:, :, 1].sum(axis=1)", columns=["A", "B"],
+        data_type="tensor"
+    )
+
+    ctx.run()
+
+    assert list(tbl.get_series("Roll").fillna(-1)) == [-1, -1, 14.0, 17.0, 17.0, -1, 22.0]
+    assert list(tbl.get_series("Tensor").fillna(-1)) == [-1, -1, 2.0, 5.0, 5.0, -1, 10.0]
+
+
+def test_roll_time_window():
+    ctx = Prosto("My Prosto")
+
+    ts = pd.to_datetime(["2021-01-01 00:00", "2021-01-01 00:10", "2021-01-01 00:12", "2021-01-01 00:40", "2021-01-01 00:50"])
+    df = pd.DataFrame({'G': [1, 2, 1, 1, 2], 'T': ts, 'A': [1.0, 2.0, 3.0, 4.0, 5.0]})
+
+    tbl = ctx.populate(
+        table_name="My_table", attributes=["G", "T", "A"],
+        func=lambda **m: df, tables=[]
+    )
+
+    # Window includes rows within 15 minutes before this row (excluding the start)
+    ctx.roll(
+        name="Roll", table=tbl.id,
+        window="15min", link=None,
+        func="lambda x: x.sum()", columns=["A"],
+        on="T"
+    )
+
+    ctx.roll(
+        name="Group Roll", table=tbl.id,
+        window="15min", link="G",
+        func="lambda x: x['A'].sum() * len(x)", columns=["A", "T"],
+        on="T"
+    )
+
+    ctx.column_sql("ROLL  My_table (A) -> CSQL_Roll WINDOW '10min' ON T", lambda x: x.sum())
+
+    ctx.run()
+
+    assert list(tbl.get_series("Roll")) == [1.0, 3.0, 6.0, 4.0, 9.0]
+    assert list(tbl.get_series("Group Roll")) == [1.0, 2.0, 8.0, 4.0, 5.0]
+    assert list(tbl.get_series("CSQL_Roll")) == [1.0, 2.0, 5.0, 4.0, 5.0]
+
+
+def test_roll_window_functions():
+    ctx = Prosto("My Prosto")
+
+    df = pd.DataFrame({'G': [1, 2, 1, 1, 2, 1], 'A': [1.0, 2.0, 3.0, None, 5.0, 6.0]})
+
+    tbl = ctx.populate(
+        table_name="My table", attributes=["G", "A"],
+        func=lambda **m: df, tables=[]
+    )
+
+    for func in ["sum", "mean", "min", "max", "count"]:
+        ctx.roll(
+            name=func, table=tbl.id,
+            window="2", link="G",
+            func=func, columns=["A"]
+        )
+    ctx.roll(
+        name="std", table=tbl.id,
+        window="3", link=None,
+        func="std", columns=["A"], model={"ddof": 0}
+    )
+    ctx.roll(
+        name="ewm", table=tbl.id,
+        window=None, link="G",
+        func="ewm", columns=["A"], model={"alpha": 0.5}
+    )
+
+    ctx.run()
+
+    # The results are the same as those of pandas
+    expected = df.groupby("G")["A"].rolling(2)
+    for func in ["sum", "mean", "min", "max"]:
+        assert np.allclose(tbl.get_series(func).astype(float), getattr(expected, func)().reset_index(level=0, drop=True).sort_index(), equal_nan=True)
+
+    # Incomplete windows are null for all functions
+    assert list(tbl.get_series("count").fillna(-1)) == [-1, -1, 2.0, 1.0, 2.0, 1.0]
+
+    assert np.allclose(tbl.get_series("std").astype(float), df["A"].rolling(3).std(ddof=0), equal_nan=True)
+    assert np.allclose(tbl.get_series("ewm").astype(float), df.groupby("G")["A"].ewm(alpha=0.5).mean().reset_index(level=0, drop=True).sort_index(), equal_nan=True)